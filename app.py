@@ -1,232 +1,464 @@
-import sys, os
-from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QPushButton, QLabel,
-    QListWidget, QFileDialog, QMessageBox, QLineEdit, QHBoxLayout
-)
-from PyQt5.QtGui import QFont, QDropEvent, QDragEnterEvent
-from PyQt5.QtCore import Qt
-
-from pdf_utils import PDFUtils
-from preview import get_metadata_preview
-from storage import RecentStorage
-
-
-class PDFToolkit(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("📑 PDF Toolkit Plus")
-        self.showMaximized()  # 🔹 open fullscreen but with title bar (min/max/close buttons)
-
-        # Utils
-        self.pdf_utils = PDFUtils()
-        self.storage = RecentStorage()
-
-        # Themes
-        self.is_dark = False
-        self.light_theme = """
-            QWidget { background-color: #ffffff; color: #000000; font-size: 14px; }
-            QPushButton { background-color: #000000; color: #ffffff; border-radius: 6px; padding: 8px; }
-            QPushButton:hover { background-color: #444444; }
-            QListWidget, QLineEdit { border: 1px solid #000000; padding: 5px; }
-        """
-        self.dark_theme = """
-            QWidget { background-color: #000000; color: #ffffff; font-size: 14px; }
-            QPushButton { background-color: #ffffff; color: #000000; border-radius: 6px; padding: 8px; }
-            QPushButton:hover { background-color: #cccccc; }
-            QListWidget, QLineEdit { border: 1px solid #ffffff; padding: 5px; background: #111111; color: #ffffff; }
-        """
-        self.setStyleSheet(self.light_theme)
-
-        # Enable drag & drop
-        self.setAcceptDrops(True)
-
-        # Layout
-        layout = QVBoxLayout()
-
-        # Title
-        title = QLabel("PDF Toolkit Plus")
-        title.setFont(QFont("Arial", 18, QFont.Bold))
-        layout.addWidget(title)
-
-        # Upload and clear buttons
-        top_buttons = QHBoxLayout()
-        self.upload_btn = QPushButton("Upload PDF(s)")
-        self.upload_btn.clicked.connect(self.upload_files)
-        self.clear_btn = QPushButton("Clear All")
-        self.clear_btn.clicked.connect(self.clear_files)
-        top_buttons.addWidget(self.upload_btn)
-        top_buttons.addWidget(self.clear_btn)
-        layout.addLayout(top_buttons)
-
-        # File List
-        self.file_list = QListWidget()
-        self.file_list.currentItemChanged.connect(self.show_metadata)
-        layout.addWidget(self.file_list)
-
-        # File management buttons
-        file_buttons = QHBoxLayout()
-        self.remove_btn = QPushButton("Remove Selected")
-        self.remove_btn.clicked.connect(self.remove_file)
-        self.up_btn = QPushButton("Move Up")
-        self.up_btn.clicked.connect(self.move_up)
-        self.down_btn = QPushButton("Move Down")
-        self.down_btn.clicked.connect(self.move_down)
-        file_buttons.addWidget(self.remove_btn)
-        file_buttons.addWidget(self.up_btn)
-        file_buttons.addWidget(self.down_btn)
-        layout.addLayout(file_buttons)
-
-        # Metadata label
-        self.meta_label = QLabel("Select a file to see metadata")
-        layout.addWidget(self.meta_label)
-
-        # Merge Button
-        self.merge_btn = QPushButton("Merge PDFs")
-        self.merge_btn.setEnabled(False)
-        self.merge_btn.clicked.connect(self.merge_pdfs)
-        layout.addWidget(self.merge_btn)
-
-        # Split PDF
-        split_layout = QHBoxLayout()
-        self.split_input = QLineEdit()
-        self.split_input.setPlaceholderText("Page range (e.g., 1-3)")
-        self.split_btn = QPushButton("Split PDF")
-        self.split_btn.clicked.connect(self.split_pdf)
-        split_layout.addWidget(self.split_input)
-        split_layout.addWidget(self.split_btn)
-        layout.addLayout(split_layout)
-
-        # Extract PDF
-        extract_layout = QHBoxLayout()
-        self.extract_input = QLineEdit()
-        self.extract_input.setPlaceholderText("Pages (e.g., 1,3,5)")
-        self.extract_btn = QPushButton("Extract Pages")
-        self.extract_btn.clicked.connect(self.extract_pages)
-        extract_layout.addWidget(self.extract_input)
-        extract_layout.addWidget(self.extract_btn)
-        layout.addLayout(extract_layout)
-
-        # Watermark
-        self.watermark_btn = QPushButton("Add Watermark")
-        self.watermark_btn.clicked.connect(self.add_watermark)
-        layout.addWidget(self.watermark_btn)
-
-        # Rotate PDF
-        rotate_layout = QHBoxLayout()
-        self.rotate_btn = QPushButton("Rotate 90°")
-        self.rotate_btn.clicked.connect(lambda: self.rotate_pdf(90))
-        self.rotate180_btn = QPushButton("Rotate 180°")
-        self.rotate180_btn.clicked.connect(lambda: self.rotate_pdf(180))
-        rotate_layout.addWidget(self.rotate_btn)
-        rotate_layout.addWidget(self.rotate180_btn)
-        layout.addLayout(rotate_layout)
-
-        # Dark/Light mode toggle
-        self.theme_btn = QPushButton("🌙 Toggle Dark/Light Mode")
-        self.theme_btn.clicked.connect(self.toggle_theme)
-        layout.addWidget(self.theme_btn)
-
-        self.setLayout(layout)
-
-    # Drag & Drop events
-    def dragEnterEvent(self, event: QDragEnterEvent):
-        if event.mimeData().hasUrls():
-            event.acceptProposedAction()
-
-    def dropEvent(self, event: QDropEvent):
-        for url in event.mimeData().urls():
-            file_path = url.toLocalFile()
-            if file_path.lower().endswith(".pdf"):
-                self.file_list.addItem(file_path)
-                self.storage.save_recent(file_path)
-        if self.file_list.count() >= 2:
-            self.merge_btn.setEnabled(True)
-
-    # File operations
-    def upload_files(self):
-        files, _ = QFileDialog.getOpenFileNames(self, "Select PDF files", "", "PDF Files (*.pdf)")
-        if files:
-            self.file_list.addItems(files)
-            for f in files:
-                self.storage.save_recent(f)
-            if self.file_list.count() >= 2:
-                self.merge_btn.setEnabled(True)
-
-    def clear_files(self):
-        self.file_list.clear()
-        self.merge_btn.setEnabled(False)
-        self.meta_label.setText("Select a file to see metadata")
-
-    def remove_file(self):
-        selected = self.file_list.currentRow()
-        if selected >= 0:
-            self.file_list.takeItem(selected)
-            if self.file_list.count() < 2:
-                self.merge_btn.setEnabled(False)
-
-    def move_up(self):
-        row = self.file_list.currentRow()
-        if row > 0:
-            item = self.file_list.takeItem(row)
-            self.file_list.insertItem(row - 1, item)
-            self.file_list.setCurrentItem(item)
-
-    def move_down(self):
-        row = self.file_list.currentRow()
-        if row < self.file_list.count() - 1:
-            item = self.file_list.takeItem(row)
-            self.file_list.insertItem(row + 1, item)
-            self.file_list.setCurrentItem(item)
-
-    def show_metadata(self):
-        item = self.file_list.currentItem()
-        if item:
-            file = item.text()
-            self.meta_label.setText(get_metadata_preview(file))
-
-    # PDF operations using utils
-    def merge_pdfs(self):
-        files = [self.file_list.item(i).text() for i in range(self.file_list.count())]
-        self.pdf_utils.merge(files)
-
-    def split_pdf(self):
-        file = self.get_selected_file()
-        if file:
-            self.pdf_utils.split(file, self.split_input.text())
-
-    def extract_pages(self):
-        file = self.get_selected_file()
-        if file:
-            self.pdf_utils.extract(file, self.extract_input.text())
-
-    def add_watermark(self):
-        file = self.get_selected_file()
-        if file:
-            self.pdf_utils.watermark(file)
-
-    def rotate_pdf(self, angle):
-        file = self.get_selected_file()
-        if file:
-            self.pdf_utils.rotate(file, angle)
-
-    def get_selected_file(self):
-        item = self.file_list.currentItem()
-        if not item:
-            QMessageBox.warning(self, "Error", "Please select a PDF first!")
-            return None
-        return item.text()
-
-    def toggle_theme(self):
-        if self.is_dark:
-            self.setStyleSheet(self.light_theme)
-            self.is_dark = False
-        else:
-            self.setStyleSheet(self.dark_theme)
-            self.is_dark = True
-
-
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = PDFToolkit()
-    window.show()
-    sys.exit(app.exec_())
+import sys, os
+from PyQt5.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QPushButton, QLabel,
+    QListWidget, QListWidgetItem, QFileDialog, QMessageBox, QLineEdit, QHBoxLayout, QCheckBox,
+    QTreeView, QAbstractItemView, QHeaderView
+)
+from PyQt5.QtGui import QFont, QDropEvent, QDragEnterEvent
+from PyQt5.QtCore import Qt, QTimer
+
+import linearize
+from file_model import FileListModel, NAME
+from ingest import ingest
+from pdf_utils import PDFUtils
+from meta_index import MetadataIndex
+from preview import get_metadata_preview
+from search_index import SearchIndex
+from storage import RecentStorage
+from workers import JobQueue, Relay, RUNNING
+
+
+class PDFToolkit(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("📑 PDF Toolkit Plus")
+        self.showMaximized()  # 🔹 open fullscreen but with title bar (min/max/close buttons)
+
+        # Utils
+        self.jobs = JobQueue(parent=self)
+        self.jobs.changed.connect(self.update_job)
+        self.pdf_utils = PDFUtils(self.jobs)
+        self.storage = RecentStorage()
+        self.meta_index = MetadataIndex()
+        self.search_index = SearchIndex()
+
+        # Themes
+        self.is_dark = False
+        self.light_theme = """
+            QWidget { background-color: #ffffff; color: #000000; font-size: 14px; }
+            QPushButton { background-color: #000000; color: #ffffff; border-radius: 6px; padding: 8px; }
+            QPushButton:hover { background-color: #444444; }
+            QListWidget, QTreeView, QLineEdit { border: 1px solid #000000; padding: 5px; }
+        """
+        self.dark_theme = """
+            QWidget { background-color: #000000; color: #ffffff; font-size: 14px; }
+            QPushButton { background-color: #ffffff; color: #000000; border-radius: 6px; padding: 8px; }
+            QPushButton:hover { background-color: #cccccc; }
+            QListWidget, QTreeView, QLineEdit { border: 1px solid #ffffff; padding: 5px; background: #111111; color: #ffffff; }
+        """
+        self.setStyleSheet(self.light_theme)
+
+        # Enable drag & drop
+        self.setAcceptDrops(True)
+
+        # Layout
+        layout = QVBoxLayout()
+
+        # Title
+        title = QLabel("PDF Toolkit Plus")
+        title.setFont(QFont("Arial", 18, QFont.Bold))
+        layout.addWidget(title)
+
+        # Upload and clear buttons
+        top_buttons = QHBoxLayout()
+        self.upload_btn = QPushButton("Upload PDF(s)")
+        self.upload_btn.clicked.connect(self.upload_files)
+        self.upload_folder_btn = QPushButton("Upload Folder…")
+        self.upload_folder_btn.clicked.connect(self.upload_folder)
+        self.clear_btn = QPushButton("Clear All")
+        self.clear_btn.clicked.connect(self.clear_files)
+        top_buttons.addWidget(self.upload_btn)
+        top_buttons.addWidget(self.upload_folder_btn)
+        top_buttons.addWidget(self.clear_btn)
+        layout.addLayout(top_buttons)
+
+        # File List: merge order is the row order; clicking a header sorts by that column
+        self.file_model = FileListModel(self)
+        self.file_list = QTreeView()
+        self.file_list.setModel(self.file_model)
+        self.file_list.setRootIsDecorated(False)
+        self.file_list.setUniformRowHeights(True)  # lets the view skip measuring 100k rows
+        self.file_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.file_list.setSelectionBehavior(QAbstractItemView.SelectRows)
+        header = self.file_list.header()
+        header.setSectionResizeMode(NAME, QHeaderView.Stretch)
+        header.setStretchLastSection(False)
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(-1, Qt.AscendingOrder)
+        header.sortIndicatorChanged.connect(self.file_model.sort)
+        self.file_list.selectionModel().currentRowChanged.connect(self.show_metadata)
+        layout.addWidget(self.file_list)
+
+        # File management buttons
+        file_buttons = QHBoxLayout()
+        self.remove_btn = QPushButton("Remove Selected")
+        self.remove_btn.clicked.connect(self.remove_file)
+        self.up_btn = QPushButton("Move Up")
+        self.up_btn.clicked.connect(self.move_up)
+        self.down_btn = QPushButton("Move Down")
+        self.down_btn.clicked.connect(self.move_down)
+        file_buttons.addWidget(self.remove_btn)
+        file_buttons.addWidget(self.up_btn)
+        file_buttons.addWidget(self.down_btn)
+        layout.addLayout(file_buttons)
+
+        # Metadata label
+        self.meta_label = QLabel("Select a file to see metadata")
+        layout.addWidget(self.meta_label)
+
+        # Full-text search
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search text in loaded and recent PDFs…")
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.search_input.returnPressed.connect(self.run_search)
+        layout.addWidget(self.search_input)
+        self.search_results = QListWidget()
+        self.search_results.setMaximumHeight(140)
+        self.search_results.itemDoubleClicked.connect(self.open_search_hit)
+        layout.addWidget(self.search_results)
+
+        # Output option shared by every operation
+        self.linearize_check = QCheckBox("Fast web view (linearize saved PDFs)")
+        self.linearize_check.setToolTip("Lay out every saved PDF so page 1 shows before the download finishes "
+                                        "(needs pikepdf)")
+        self.linearize_check.setEnabled(linearize.pikepdf is not None)
+        self.linearize_check.toggled.connect(lambda on: setattr(self.pdf_utils, "linearize", on))
+        layout.addWidget(self.linearize_check)
+
+        # Merge Button
+        self.merge_btn = QPushButton("Merge PDFs")
+        self.merge_btn.setEnabled(False)
+        self.merge_btn.clicked.connect(self.merge_pdfs)
+        self.dedupe_check = QCheckBox("Store shared fonts/images once")
+        self.dedupe_check.setToolTip("Write each identical font, image or colour profile once across all merged files")
+        merge_layout = QHBoxLayout()
+        merge_layout.addWidget(self.merge_btn, 1)
+        merge_layout.addWidget(self.dedupe_check)
+        layout.addLayout(merge_layout)
+
+        # Split PDF
+        split_layout = QHBoxLayout()
+        self.split_input = QLineEdit()
+        self.split_input.setPlaceholderText("Page range(s) (e.g., 1-3 or 1-3,4-9 or every 10 or bookmarks)")
+        self.split_btn = QPushButton("Split PDF")
+        self.split_btn.clicked.connect(self.split_pdf)
+        split_layout.addWidget(self.split_input)
+        split_layout.addWidget(self.split_btn)
+        layout.addLayout(split_layout)
+
+        # Extract PDF
+        extract_layout = QHBoxLayout()
+        self.extract_input = QLineEdit()
+        self.extract_input.setPlaceholderText("Pages (e.g., 1,3,5)")
+        self.extract_btn = QPushButton("Extract Pages")
+        self.extract_btn.clicked.connect(self.extract_pages)
+        extract_layout.addWidget(self.extract_input)
+        extract_layout.addWidget(self.extract_btn)
+        layout.addLayout(extract_layout)
+
+        # Watermark
+        self.watermark_btn = QPushButton("Add Watermark")
+        self.watermark_btn.clicked.connect(self.add_watermark)
+        layout.addWidget(self.watermark_btn)
+
+        # Rotate PDF
+        rotate_layout = QHBoxLayout()
+        self.rotate_btn = QPushButton("Rotate 90°")
+        self.rotate_btn.clicked.connect(lambda: self.rotate_pdf(90))
+        self.rotate180_btn = QPushButton("Rotate 180°")
+        self.rotate180_btn.clicked.connect(lambda: self.rotate_pdf(180))
+        rotate_layout.addWidget(self.rotate_btn)
+        rotate_layout.addWidget(self.rotate180_btn)
+        layout.addLayout(rotate_layout)
+
+        # Batch
+        compress_layout = QHBoxLayout()
+        self.compress_btn = QPushButton("Compress Selected…")
+        self.compress_btn.clicked.connect(self.compress_selected)
+        self.compress_all_btn = QPushButton("Compress All Files…")
+        self.compress_all_btn.clicked.connect(self.compress_all)
+        compress_layout.addWidget(self.compress_btn)
+        compress_layout.addWidget(self.compress_all_btn)
+        layout.addLayout(compress_layout)
+
+        self.properties_btn = QPushButton("Edit Properties / Bookmarks…")
+        self.properties_btn.clicked.connect(self.edit_properties)
+        layout.addWidget(self.properties_btn)
+
+        self.pipeline_btn = QPushButton("Run Pipeline on Selected…")
+        self.pipeline_btn.clicked.connect(self.run_pipeline)
+        layout.addWidget(self.pipeline_btn)
+
+        self.batch_btn = QPushButton("Batch Process All Files…")
+        self.batch_btn.clicked.connect(self.batch_process)
+        layout.addWidget(self.batch_btn)
+
+        # Job queue
+        layout.addWidget(QLabel("Jobs"))
+        self.job_list = QListWidget()
+        self.job_list.setMaximumHeight(120)
+        layout.addWidget(self.job_list)
+        job_buttons = QHBoxLayout()
+        self.cancel_job_btn = QPushButton("Cancel Job")
+        self.cancel_job_btn.clicked.connect(self.cancel_job)
+        self.clear_jobs_btn = QPushButton("Clear Finished")
+        self.clear_jobs_btn.clicked.connect(self.clear_jobs)
+        job_buttons.addWidget(self.cancel_job_btn)
+        job_buttons.addWidget(self.clear_jobs_btn)
+        layout.addLayout(job_buttons)
+        self.job_items = {}
+
+        # Dark/Light mode toggle
+        self.theme_btn = QPushButton("🌙 Toggle Dark/Light Mode")
+        self.theme_btn.clicked.connect(self.toggle_theme)
+        layout.addWidget(self.theme_btn)
+
+        self.setLayout(layout)
+
+        # keep the search index current for recent files too
+        self.index_files(self.storage.get_recent(), metadata=False)
+
+    # Drag & Drop events
+    def dragEnterEvent(self, event: QDragEnterEvent):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event: QDropEvent):
+        # files and whole folders; the header check decides what is a PDF
+        self.add_paths([url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()])
+
+    # File operations
+    def upload_files(self):
+        files, _ = QFileDialog.getOpenFileNames(self, "Select PDF files", "", "PDF Files (*.pdf)")
+        self.add_paths(files)
+
+    def upload_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select a folder of PDFs (searched recursively)")
+        if folder:
+            self.add_paths([folder])
+
+    def add_paths(self, paths):
+        # scan folders, check headers and probe page counts off the GUI thread;
+        # rows are added batch by batch as the workers finish them
+        if not paths:
+            return
+        added, unprobed = [], []
+        relay = Relay(self)
+        relay.emitted.connect(lambda records: self.add_records(records, added, unprobed))
+
+        def finished(result):
+            relay.deleteLater()
+            st = result.stats
+            text = f"Added {st['added']} PDF(s) in {result.seconds:.1f}s"
+            if st["rejected"]:
+                text += f"; skipped {st['rejected']} file(s) without a PDF header"
+            self.meta_label.setText(text)
+            self.storage.save_many(added)
+            self.index_files(added, metadata=False)
+            if unprobed:
+                self.jobs.submit(f"Index {len(unprobed)} files", self.meta_index.refresh, unprobed,
+                                 on_finished=lambda _: self.fill_metadata(unprobed))
+
+        self.jobs.submit(f"Add {len(paths)} path(s)", ingest, list(paths), relay.emitted.emit,
+                         workers=os.cpu_count(), on_finished=finished,
+                         on_failed=lambda err: QMessageBox.warning(self, "Error", f"Adding files failed: {err}"))
+
+    def add_records(self, records, added, unprobed):
+        ok = [r for r in records if not r["error"]]
+        self.file_model.append(ok)
+        # the probe already read what the metadata index needs, except for encrypted info
+        self.meta_index.store([r for r in ok if r["pages"] is not None and not r["encrypted"]])
+        unprobed.extend(r["path"] for r in ok if r["pages"] is None or r["encrypted"])
+        added.extend(r["path"] for r in ok)
+        if self.file_model.rowCount() >= 2:
+            self.merge_btn.setEnabled(True)
+
+    def fill_metadata(self, paths):
+        for path in paths:
+            meta = self.meta_index.get(path)
+            if meta is not None:
+                self.file_model.set_metadata(path, pages=meta["pages"])
+        self.show_metadata()
+
+    def clear_files(self):
+        self.file_model.clear()
+        self.merge_btn.setEnabled(False)
+        self.meta_label.setText("Select a file to see metadata")
+
+    def selected_rows(self):
+        return [index.row() for index in self.file_list.selectionModel().selectedRows()]
+
+    def remove_file(self):
+        self.file_model.remove_rows(self.selected_rows())
+        if self.file_model.rowCount() < 2:
+            self.merge_btn.setEnabled(False)
+
+    def move_rows(self, step):
+        # a manual order replaces the column sort
+        self.file_list.header().setSortIndicator(-1, Qt.AscendingOrder)
+        self.file_model.move_rows(self.selected_rows(), step)
+        self.file_list.scrollTo(self.file_list.currentIndex())
+
+    def move_up(self):
+        self.move_rows(-1)
+
+    def move_down(self):
+        self.move_rows(1)
+
+    def show_metadata(self):
+        index = self.file_list.currentIndex()
+        if index.isValid():
+            file = self.file_model.path(index.row())
+            self.meta_label.setText(get_metadata_preview(file, self.meta_index))
+
+    def index_files(self, files, metadata=True):
+        # parse page counts/info and page text in the background; the metadata
+        # label and the search box read the indexes
+        if not files:
+            return
+        if metadata:
+            self.jobs.submit(f"Index {len(files)} files", self.meta_index.refresh, list(files),
+                             on_finished=lambda _: self.show_metadata())
+        self.jobs.submit(f"Search-index {len(files)} files", self.search_index.refresh, list(files),
+                         on_finished=lambda _: self.run_search())
+
+    # Full-text search
+    def run_search(self):
+        self.search_timer.stop()
+        self.search_results.clear()
+        phrase = self.search_input.text()
+        if not phrase.strip():
+            return
+        for path, page, snippet in self.search_index.search(phrase):
+            item = QListWidgetItem(f"{os.path.basename(path)} — p. {page}: {' '.join(snippet.split())}")
+            item.setToolTip(path)
+            item.setData(Qt.UserRole, path)
+            self.search_results.addItem(item)
+
+    def open_search_hit(self, hit):
+        path = hit.data(Qt.UserRole)
+        row = self.file_model.find(path)
+        if row < 0:
+            meta = self.meta_index.get(path) or {}
+            self.file_model.append([{"path": path, "pages": meta.get("pages"), "size": meta.get("size")}])
+            row = self.file_model.rowCount() - 1
+            if row >= 1:
+                self.merge_btn.setEnabled(True)
+        self.file_list.setCurrentIndex(self.file_model.index(row, NAME))
+        self.file_list.scrollTo(self.file_list.currentIndex())
+
+    # PDF operations using utils
+    def merge_pdfs(self):
+        files = self.file_model.paths()
+        self.storage.save_many(files)
+        self.pdf_utils.merge(files, dedupe=self.dedupe_check.isChecked())
+
+    def split_pdf(self):
+        file = self.get_selected_file()
+        if file:
+            self.pdf_utils.split(file, self.split_input.text())
+
+    def extract_pages(self):
+        file = self.get_selected_file()
+        if file:
+            self.pdf_utils.extract(file, self.extract_input.text())
+
+    def add_watermark(self):
+        file = self.get_selected_file()
+        if file:
+            self.pdf_utils.watermark(file)
+
+    def rotate_pdf(self, angle):
+        file = self.get_selected_file()
+        if file:
+            self.pdf_utils.rotate(file, angle)
+
+    def compress_selected(self):
+        file = self.get_selected_file()
+        if file:
+            self.pdf_utils.compress([file])
+
+    def compress_all(self):
+        files = self.file_model.paths()
+        if not files:
+            QMessageBox.warning(self, "Error", "Please add some PDFs first!")
+            return
+        self.pdf_utils.compress(files)
+
+    def edit_properties(self):
+        file = self.get_selected_file()
+        if file:
+            self.pdf_utils.edit_properties(file)
+
+    def run_pipeline(self):
+        file = self.get_selected_file()
+        if file:
+            self.pdf_utils.pipeline(file)
+
+    def batch_process(self):
+        files = self.file_model.paths()
+        if not files:
+            QMessageBox.warning(self, "Error", "Please add some PDFs first!")
+            return
+        self.pdf_utils.batch(files)
+
+    def get_selected_file(self):
+        index = self.file_list.currentIndex()
+        if not index.isValid():
+            QMessageBox.warning(self, "Error", "Please select a PDF first!")
+            return None
+        file = self.file_model.path(index.row())
+        self.storage.save_recent(file)  # counts as a use
+        return file
+
+    # Job queue panel
+    def update_job(self, job):
+        item = self.job_items.get(job.id)
+        if item is None:
+            item = QListWidgetItem()
+            item.setData(Qt.UserRole, job.id)
+            self.job_list.addItem(item)
+            self.job_items[job.id] = item
+        text = f"#{job.id} {job.label} — {job.state}"
+        if job.state == RUNNING and job.total:
+            text += f" {100 * job.done // job.total}%"
+        elif job.error:
+            text += f": {job.error}"
+        item.setText(text)
+
+    def cancel_job(self):
+        item = self.job_list.currentItem()
+        if item:
+            self.jobs.cancel(item.data(Qt.UserRole))
+
+    def clear_jobs(self):
+        self.jobs.clear_finished()
+        for job_id in [i for i in self.job_items if i not in self.jobs.jobs]:
+            self.job_list.takeItem(self.job_list.row(self.job_items.pop(job_id)))
+
+    def closeEvent(self, event):
+        for job in self.jobs.active():
+            self.jobs.cancel(job.id)
+        self.jobs.wait()
+        self.storage.close()
+        super().closeEvent(event)
+
+    def toggle_theme(self):
+        if self.is_dark:
+            self.setStyleSheet(self.light_theme)
+            self.is_dark = False
+        else:
+            self.setStyleSheet(self.dark_theme)
+            self.is_dark = True
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    window = PDFToolkit()
+    window.show()
+    sys.exit(app.exec_())
@@ -0,0 +1,563 @@
+"""
+Benchmarks for the PDF engine on synthetic corpora.
+
+Usage:
+    python bench.py merge [--files 2000] [--pages 3] [--workers 1,2,4,8]
+    python bench.py stream-merge [--counts 50,200,800] [--pages 20] [--tolerance-mb 8]
+    python bench.py watermark [--pages 1000]
+    python bench.py rotate [--pages 2000] [--rotate 3,7-9]
+    python bench.py dedupe [--files 300] [--resource-kb 200]
+    python bench.py mmap [--size-mb 1100] [--pages 500] [--touch 50]
+    python bench.py linearize [--pages 500]
+    python bench.py probe [--files 10000] [--pages 5,50,500] [--dir DIR]
+    python bench.py ingest [--files 10000] [--depth 3] [--workers 1,2,4] [--dir DIR]
+    python bench.py filelist [--rows 100000]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+
+import ingest
+import linearize
+import pdf_engine
+import probe
+import sources
+
+
+def make_pdf(path, pages, label="Page"):
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for i in range(pages):
+        writer.add_blank_page(612, 792)
+        page = writer.pages[-1]
+        content = DecodedStreamObject()
+        lines = " T* ".join(f"({label} page {i + 1} line {n}) Tj" for n in range(40))
+        content.set_data(f"BT /F1 11 Tf 14 TL 72 740 Td {lines} ET".encode())
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+        page[NameObject("/Contents")] = writer._add_object(content)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+def make_corpus(folder, files, pages):
+    paths = []
+    for i in range(files):
+        path = os.path.join(folder, f"doc{i:05d}.pdf")
+        make_pdf(path, pages, label=f"Doc {i}")
+        paths.append(path)
+    return paths
+
+
+def _workers(spec):
+    return [int(x) for x in spec.split(",") if x.strip()]
+
+
+def bench_merge(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_corpus(tmp, args.files, args.pages)
+        print(f"merge: {args.files} files x {args.pages} pages, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+        baseline = None
+        for workers in _workers(args.workers):
+            output = os.path.join(tmp, f"merged_{workers}.pdf")
+            started = time.perf_counter()
+            pdf_engine.merge(files, output, workers=workers)
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {baseline / elapsed:>7.2f}x")
+
+
+def _peak_rss_kb():
+    import resource  # Unix only
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _merge_peak_rss(files, output, streaming):
+    pdf_engine.merge(files, output, streaming=streaming)
+    return _peak_rss_kb()
+
+
+def bench_stream_merge(args):
+    # streaming must keep peak memory flat: the largest count may use at most
+    # --tolerance-mb more than the smallest, or the run exits non-zero
+    counts = sorted(_workers(args.counts))
+    streamed = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_corpus(tmp, max(counts), args.pages)
+        print(f"peak RSS while merging N files x {args.pages} pages (fresh process per run)")
+        print(f"{'files':>8} {'PdfMerger MB':>13} {'streaming MB':>13}")
+        for count in counts:
+            row = []
+            for streaming in (False, True):
+                output = os.path.join(tmp, "merged.pdf")
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    row.append(pool.submit(_merge_peak_rss, files[:count], output, streaming).result() / 1024)
+            print(f"{count:>8} {row[0]:>13.1f} {row[1]:>13.1f}")
+            streamed[count] = row[1]
+    growth = streamed[counts[-1]] - streamed[counts[0]]
+    verdict = "ok" if growth <= args.tolerance_mb else "FAILED"
+    print(f"streaming peak grew {growth:.1f} MB from {counts[0]} to {counts[-1]} files "
+          f"(tolerance {args.tolerance_mb} MB): {verdict}")
+    if growth > args.tolerance_mb:
+        raise SystemExit(1)
+
+
+def bench_watermark(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.pdf")
+        stamp = os.path.join(tmp, "stamp.pdf")
+        make_pdf(source, args.pages)
+        make_pdf(stamp, 1, label="CONFIDENTIAL")
+        print(f"watermark: {args.pages} pages")
+        print(f"{'mode':>12} {'seconds':>9} {'size KB':>9}")
+        for label, shared in (("merge_page", False), ("xobject", True)):
+            output = os.path.join(tmp, f"{label}.pdf")
+            started = time.perf_counter()
+            pdf_engine.watermark(source, stamp, output, shared=shared)
+            elapsed = time.perf_counter() - started
+            print(f"{label:>12} {elapsed:>9.2f} {os.path.getsize(output) / 1024:>9.0f}")
+
+
+def make_template_pdf(path, label, resource):
+    """A one-page document drawing a (shared) embedded image, like a letterhead template."""
+    writer = PdfWriter()
+    writer.add_blank_page(612, 792)
+    page = writer.pages[-1]
+    logo = DecodedStreamObject()
+    logo.set_data(resource)
+    side = int((len(resource) // 3) ** 0.5)
+    logo.update({NameObject("/Type"): NameObject("/XObject"), NameObject("/Subtype"): NameObject("/Image"),
+                 NameObject("/Width"): NumberObject(side), NameObject("/Height"): NumberObject(side),
+                 NameObject("/ColorSpace"): NameObject("/DeviceRGB"),
+                 NameObject("/BitsPerComponent"): NumberObject(8)})
+    content = DecodedStreamObject()
+    content.set_data(f"q 200 0 0 200 72 500 cm /Logo Do Q % {label}".encode())
+    page[NameObject("/Resources")] = DictionaryObject({
+        NameObject("/XObject"): DictionaryObject({NameObject("/Logo"): writer._add_object(logo)}),
+    })
+    page[NameObject("/Contents")] = writer._add_object(content)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+def bench_dedupe(args):
+    resource = os.urandom(args.resource_kb * 1024)
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for i in range(args.files):
+            files.append(os.path.join(tmp, f"doc_{i:05d}.pdf"))
+            make_template_pdf(files[-1], f"document {i}", resource)
+        print(f"dedupe: {args.files} files sharing a {args.resource_kb} KB image")
+        print(f"{'mode':>10} {'seconds':>9} {'size KB':>10} {'saved KB':>10}")
+        for label, dedupe in (("streaming", False), ("dedupe", True)):
+            output = os.path.join(tmp, f"{label}.pdf")
+            result = pdf_engine.merge(files, output, streaming=True, dedupe=dedupe)
+            saved = result.stats.get("bytes_saved", 0) / 1024
+            print(f"{label:>10} {result.seconds:>9.2f} {os.path.getsize(output) / 1024:>10.0f} {saved:>10.0f}")
+
+
+def make_large_pdf(path, size_mb, pages):
+    """Write a scan-like PDF of about ``size_mb`` directly, one raw image per page."""
+    image_bytes = size_mb * 1024 * 1024 // pages
+    side = int((image_bytes // 3) ** 0.5)
+    offsets = {}
+    chunk = os.urandom(1 << 20)
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.7\n")
+
+        def obj(num, body, data=None):
+            offsets[num] = f.tell()
+            f.write(b"%d 0 obj\n" % num + body)
+            if data is not None:
+                f.write(b"\nstream\n")
+                remaining = data
+                while remaining > 0:
+                    f.write(chunk[:min(remaining, len(chunk))])
+                    remaining -= len(chunk)
+                f.write(b"\nendstream")
+            f.write(b"\nendobj\n")
+
+        kids = []
+        for i in range(pages):
+            page, content, image = 3 + 3 * i, 4 + 3 * i, 5 + 3 * i
+            kids.append(b"%d 0 R" % page)
+            obj(page, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                      b"/Resources << /XObject << /Im0 %d 0 R >> >> >>" % (content, image))
+            draw = b"q 612 0 0 792 0 0 cm /Im0 Do Q"
+            obj(content, b"<< /Length %d >>\nstream\n" % len(draw) + draw + b"\nendstream")
+            obj(image, b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+                       b"/BitsPerComponent 8 /Length %d >>" % (side, side, side * side * 3), side * side * 3)
+        obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        obj(2, b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % pages)
+        size = max(offsets) + 1
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for num in range(1, size):
+            f.write(b"%010d 00000 n \n" % offsets[num])
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref))
+
+
+def _probe_large(path, mode, touch):
+    # runs in a fresh process: open, count pages, then read a random sample of pages' images
+    started = time.perf_counter()
+    if mode == "path":
+        reader = PdfReader(path)  # the previous default: whole file copied into memory
+    else:
+        reader = sources.open_reader(path, use_mmap=(mode == "mmap"))
+    count = len(reader.pages)
+    opened = time.perf_counter() - started
+    for index in random.Random(0).sample(range(count), min(touch, count)):
+        image = reader.pages[index]["/Resources"]["/XObject"]["/Im0"].get_object()
+        len(image._data)
+    return opened, time.perf_counter() - started, _peak_rss_kb(), _rss_split_kb()
+
+
+def _rss_split_kb():
+    """(anonymous, file-backed) resident KB; mapped file pages are shared and reclaimable (Linux only)."""
+    fields = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("RssAnon", "RssFile"):
+                    fields[key] = int(value.split()[0])
+    except OSError:
+        return 0, 0
+    return fields.get("RssAnon", 0), fields.get("RssFile", 0)
+
+
+def bench_mmap(args):
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        path = os.path.join(tmp, "large.pdf")
+        make_large_pdf(path, args.size_mb, args.pages)
+        print(f"open + page count, then {args.touch} random pages: "
+              f"{os.path.getsize(path) / 2 ** 20:.0f} MB, {args.pages} pages (fresh process per mode)")
+        print(f"{'mode':>9} {'open s':>8} {'total s':>8} {'peak RSS MB':>12} {'anon MB':>8} {'file MB':>8}")
+        for mode in ("path", "buffered", "mmap"):
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                opened, total, rss, (anon, mapped) = pool.submit(_probe_large, path, mode, args.touch).result()
+            print(f"{mode:>9} {opened:>8.3f} {total:>8.3f} {rss / 1024:>12.1f} {anon / 1024:>8.1f} {mapped / 1024:>8.1f}")
+
+
+def make_nested_pdf(path, layout):
+    """Write a PDF whose page tree follows ``layout``: a list of kids, where a list is
+    an intermediate /Pages node and anything else a page (labelled in document order)."""
+    objects = []  # object number - 1 -> body (filled in once kids are numbered)
+
+    def node(kids, parent):
+        num = len(objects) + 1
+        objects.append(None)
+        refs, count = [], 0
+        for kid in kids:
+            if isinstance(kid, list):
+                ref, n = node(kid, num)
+                count += n
+            else:
+                ref = len(objects) + 1
+                objects.append(None)
+                content = f"BT /F1 24 Tf 72 700 Td (Page {sum(1 for o in objects if o and '/Page ' in o) + 1}) Tj ET"
+                objects[ref - 1] = (f"<< /Type /Page /Parent {num} 0 R /MediaBox [0 0 612 792] "
+                                    f"/Contents {len(objects) + 1} 0 R >>")
+                objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+                count += 1
+            refs.append(f"{ref} 0 R")
+        parent_entry = f" /Parent {parent} 0 R" if parent else ""
+        objects[num - 1] = f"<< /Type /Pages{parent_entry} /Kids [{' '.join(refs)}] /Count {count} >>"
+        return num, count
+
+    root, _ = node(layout, None)
+    objects.append(f"<< /Type /Catalog /Pages {root} 0 R >>")
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root {len(objects)} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+NESTED_TREES = [[[1, 1], []], [1, [1]], [[[1], 1], [], [1, [1, 1]]]]
+
+
+def check_nested_rotate(tmp):
+    """Rotate each page of some nested page trees incrementally; returns the failures."""
+    failures = []
+    for layout in NESTED_TREES:
+        source = os.path.join(tmp, "nested.pdf")
+        make_nested_pdf(source, layout)
+        pages = len(PdfReader(source).pages)
+        for target in range(pages):
+            output = os.path.join(tmp, "nested_rot.pdf")
+            pdf_engine.rotate(source, 90, output, pages=str(target + 1), incremental=True)
+            reader = PdfReader(output)
+            rotated = [i for i, page in enumerate(reader.pages) if page.get("/Rotate", 0) == 90]
+            order = all(f"(Page {i + 1})".encode() in page["/Contents"].get_data()
+                        for i, page in enumerate(reader.pages))
+            nodes, on_nodes = [reader.trailer["/Root"]["/Pages"]], []
+            while nodes:  # the rotation belongs on the page, not on an intermediate node
+                node = nodes.pop()
+                if node.get("/Type") == "/Pages":
+                    on_nodes += ["/Rotate" in node]
+                    nodes.extend(kid.get_object() for kid in node["/Kids"])
+            if rotated != [target] or not order or any(on_nodes):
+                failures.append(f"tree {layout}: rotating page {target + 1} rotated pages "
+                                f"{[i + 1 for i in rotated]}" + (" (on a /Pages node)" if any(on_nodes) else ""))
+    return failures
+
+
+def bench_rotate(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.pdf")
+        make_pdf(source, args.pages)
+        size = os.path.getsize(source)
+        print(f"rotate pages {args.rotate} of {args.pages} ({size / 1024:.0f} KB)")
+        print(f"{'mode':>12} {'seconds':>9} {'written KB':>11}")
+        output = os.path.join(tmp, "rewrite.pdf")
+        started = time.perf_counter()
+        pdf_engine.rotate(source, 90, output, pages=args.rotate)
+        elapsed = time.perf_counter() - started
+        print(f"{'rewrite':>12} {elapsed:>9.3f} {os.path.getsize(output) / 1024:>11.0f}")
+        started = time.perf_counter()
+        pdf_engine.rotate(source, 90, source, pages=args.rotate, incremental=True)
+        elapsed = time.perf_counter() - started
+        print(f"{'incremental':>12} {elapsed:>9.3f} {(os.path.getsize(source) - size) / 1024:>11.1f}")
+        failures = check_nested_rotate(tmp)
+        print(f"nested page trees: {'ok' if not failures else '; '.join(failures)}")
+        if failures:
+            raise SystemExit(1)
+
+
+def bench_linearize(args):
+    # every write path, plain and linearized; page 1 must be readable from the first /E bytes
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.pdf")
+        other = os.path.join(tmp, "other.pdf")
+        stamp = os.path.join(tmp, "stamp.pdf")
+        make_pdf(source, args.pages)
+        make_pdf(other, args.pages, label="Other")
+        make_pdf(stamp, 1, label="CONFIDENTIAL")
+        ops = {
+            "merge": lambda out, lin: pdf_engine.merge([source, other], out, linearize=lin),
+            "split": lambda out, lin: pdf_engine.split(source, f"2-{args.pages}", out, linearize=lin),
+            "extract": lambda out, lin: pdf_engine.extract(source, "1,3-9", out, linearize=lin),
+            "watermark": lambda out, lin: pdf_engine.watermark(source, stamp, out, linearize=lin),
+            "rotate": lambda out, lin: pdf_engine.rotate(source, 90, out, linearize=lin),
+            "encrypt": lambda out, lin: pdf_engine.encrypt(source, "secret", out, linearize=lin),
+        }
+        print(f"linearize: {args.pages}-page documents")
+        print(f"{'op':>10} {'plain s':>8} {'linear s':>9} {'size KB':>8} {'page 1 KB':>10}  page 1 from first range")
+        failed = False
+        for op, run in ops.items():
+            plain, linear = os.path.join(tmp, f"{op}.pdf"), os.path.join(tmp, f"{op}_web.pdf")
+            started = time.perf_counter()
+            run(plain, False)
+            plain_s = time.perf_counter() - started
+            started = time.perf_counter()
+            run(linear, True)
+            linear_s = time.perf_counter() - started
+            problems = linearize.check(linear)
+            failed = failed or bool(problems)
+            first = linearize.parameters(linear)["E"] / 1024
+            print(f"{op:>10} {plain_s:>8.2f} {linear_s:>9.2f} {os.path.getsize(linear) / 1024:>8.0f} "
+                  f"{first:>10.1f}  {'ok' if not problems else '; '.join(problems)}")
+        if failed:
+            raise SystemExit(1)
+
+
+def _full_read(path):
+    # what the preview and the metadata index did before the probe
+    reader = sources.open_reader(path)
+    return {"pages": len(reader.pages), "info": {k: str(v) for k, v in (reader.metadata or {}).items()}}
+
+
+def bench_probe(args):
+    # a few distinct documents per size (classic tables, plus xref/object streams when
+    # pikepdf is installed), copied until the corpus has --files entries
+    sizes = [int(p) for p in args.pages.split(",")]
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        templates = []
+        for pages in sizes:
+            path = os.path.join(tmp, f"template_{pages}.pdf")
+            make_pdf(path, pages)
+            templates.append(path)
+            if linearize.pikepdf is not None:
+                packed = os.path.join(tmp, f"template_{pages}_objstm.pdf")
+                with linearize.pikepdf.open(path) as pdf:
+                    pdf.save(packed, object_stream_mode=linearize.pikepdf.ObjectStreamMode.generate)
+                templates.append(packed)
+        corpus = []
+        for i in range(args.files):
+            path = os.path.join(tmp, f"doc{i:05d}.pdf")
+            shutil.copyfile(templates[i % len(templates)], path)
+            corpus.append(path)
+        print(f"probe: {len(corpus)} files of {args.pages} pages ({len(templates)} layouts)")
+        print(f"{'reader':>10} {'seconds':>9} {'ms/file':>8}")
+        results = {}
+        for label, read in (("PdfReader", _full_read), ("probe", probe.probe)):
+            started = time.perf_counter()
+            results[label] = [read(path) for path in corpus]
+            elapsed = time.perf_counter() - started
+            print(f"{label:>10} {elapsed:>9.2f} {elapsed * 1000 / len(corpus):>8.3f}")
+        mismatched = sum(a["pages"] != b["pages"] or a["info"] != b["info"]
+                         for a, b in zip(results["PdfReader"], results["probe"]))
+        print(f"page count / info mismatches: {mismatched}")
+
+
+def bench_ingest(args):
+    # a nested folder tree of PDFs (plus some non-PDF files and fakes named .pdf);
+    # reports the time until the first batch is ready and the total
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        templates = []
+        for pages in (5, 50):
+            path = os.path.join(tmp, f"template_{pages}.pdf")
+            make_pdf(path, pages)
+            templates.append(path)
+        root = os.path.join(tmp, "corpus")
+        for i in range(args.files):
+            parts = [f"d{(i >> (3 * level)) % 8}" for level in range(1, args.depth + 1)]
+            folder = os.path.join(root, *parts)
+            os.makedirs(folder, exist_ok=True)
+            name = os.path.join(folder, f"doc{i:05d}")
+            if i % 50 == 0:
+                with open(name + ".pdf", "wb") as f:
+                    f.write(b"not really a PDF\n")
+            else:
+                shutil.copyfile(templates[i % len(templates)], name + ".pdf")
+            if i % 10 == 0:
+                with open(name + ".txt", "w") as f:
+                    f.write("notes\n")
+        print(f"ingest: {args.files} files in a tree {args.depth} folders deep")
+        print(f"{'workers':>8} {'first batch s':>14} {'total s':>8} {'files/s':>8} {'added':>7} {'rejected':>9}")
+        for workers in _workers(args.workers):
+            started = time.perf_counter()
+            first = []
+
+            def on_batch(records):
+                if not first:
+                    first.append(time.perf_counter() - started)
+
+            result = ingest.ingest([root], on_batch, workers=workers)
+            st = result.stats
+            print(f"{workers:>8} {first[0]:>14.3f} {result.seconds:>8.2f} {st['found'] / result.seconds:>8.0f} "
+                  f"{st['added']:>7} {st['rejected']:>9}")
+
+
+def _timed(label, func):
+    started = time.perf_counter()
+    func()
+    print(f"{label:>24} {time.perf_counter() - started:>9.3f}")
+
+
+def bench_filelist(args):
+    # the list operations the app performs, on a QListWidget and on the array-backed model
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QApplication, QListWidget
+    from file_model import FileListModel, NAME
+    app = QApplication.instance() or QApplication([])
+    records = [{"path": f"/data/folder{i % 100:02d}/doc{i:06d}.pdf", "pages": i % 97,
+                "size": 1000 + i, "mtime_ns": i * 10 ** 9} for i in range(args.rows)]
+    paths = [r["path"] for r in records]
+    middle = args.rows // 2
+    print(f"file list: {args.rows} rows")
+    print(f"{'operation':>24} {'seconds':>9}")
+
+    widget = QListWidget()
+    _timed("QListWidget add", lambda: widget.addItems(paths))
+    _timed("QListWidget gather", lambda: [widget.item(i).text() for i in range(widget.count())])
+    _timed("QListWidget move x100", lambda: [widget.insertItem(middle - 1, widget.takeItem(middle))
+                                             for _ in range(100)])
+    _timed("QListWidget remove 1000", lambda: [widget.takeItem(middle) for _ in range(1000)])
+
+    model = FileListModel()
+    _timed("model add", lambda: model.append(records))
+    _timed("model gather", model.paths)
+    _timed("model move x100", lambda: [model.move_rows([middle], -1) for _ in range(100)])
+    _timed("model remove 1000", lambda: model.remove_rows(range(middle, middle + 1000)))
+    _timed("model sort by name", lambda: model.sort(NAME, Qt.AscendingOrder))
+    del app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PDF engine benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("merge", help="sequential vs process-pool merge")
+    p.add_argument("--files", type=int, default=2000)
+    p.add_argument("--pages", type=int, default=3)
+    p.add_argument("--workers", default=",".join(str(w) for w in (1, 2, 4, 8) if w <= (os.cpu_count() or 1)))
+    p.set_defaults(func=bench_merge)
+
+    p = sub.add_parser("stream-merge", help="peak memory of PdfMerger vs streaming merge")
+    p.add_argument("--counts", default="50,200,800")
+    p.add_argument("--pages", type=int, default=20)
+    p.add_argument("--tolerance-mb", type=float, default=8.0,
+                   help="allowed growth of the streaming peak from the smallest to the largest count")
+    p.set_defaults(func=bench_stream_merge)
+
+    p = sub.add_parser("watermark", help="per-page merge_page vs shared Form XObject")
+    p.add_argument("--pages", type=int, default=1000)
+    p.set_defaults(func=bench_watermark)
+
+    p = sub.add_parser("rotate", help="full rewrite vs in-place incremental update")
+    p.add_argument("--pages", type=int, default=2000)
+    p.add_argument("--rotate", default="3,7-9")
+    p.set_defaults(func=bench_rotate)
+
+    p = sub.add_parser("dedupe", help="streaming merge with and without resource deduplication")
+    p.add_argument("--files", type=int, default=300)
+    p.add_argument("--resource-kb", type=int, default=200)
+    p.set_defaults(func=bench_dedupe)
+
+    p = sub.add_parser("mmap", help="parse time and RSS: PdfReader(path) vs buffered vs mmap sources")
+    p.add_argument("--size-mb", type=int, default=1100)
+    p.add_argument("--pages", type=int, default=500)
+    p.add_argument("--touch", type=int, default=50)
+    p.add_argument("--dir", default=None, help="where to create the test file (e.g. the scratch disk)")
+    p.set_defaults(func=bench_mmap)
+
+    p = sub.add_parser("linearize", help="every write path with fast web view, checking page 1 is in the first range")
+    p.add_argument("--pages", type=int, default=500)
+    p.set_defaults(func=bench_linearize)
+
+    p = sub.add_parser("probe", help="page count + info: full PdfReader vs trailer/xref-only probe")
+    p.add_argument("--files", type=int, default=10000)
+    p.add_argument("--pages", default="5,50,500", help="page counts of the documents in the corpus")
+    p.add_argument("--dir", default=None, help="where to create the corpus")
+    p.set_defaults(func=bench_probe)
+
+    p = sub.add_parser("ingest", help="recursive folder scan with header check and page-count probe")
+    p.add_argument("--files", type=int, default=10000)
+    p.add_argument("--depth", type=int, default=3, help="folder nesting levels")
+    p.add_argument("--workers", default=",".join(str(w) for w in (1, 2, 4) if w <= (os.cpu_count() or 1)))
+    p.add_argument("--dir", default=None, help="where to create the corpus")
+    p.set_defaults(func=bench_ingest)
+
+    p = sub.add_parser("filelist", help="file list add/gather/move/remove: QListWidget vs array-backed model")
+    p.add_argument("--rows", type=int, default=100000)
+    p.set_defaults(func=bench_filelist)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
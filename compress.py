@@ -0,0 +1,217 @@
+"""
+PDF compression: downsamples and recompresses embedded images, merges
+identical streams, fonts and graphics states, drops unused resources and
+packs the remaining objects into compressed object streams.
+
+Needs pikepdf (and Pillow for images); both are optional dependencies of
+the toolkit.
+"""
+
+import hashlib
+import io
+import os
+import time
+from dataclasses import dataclass
+
+import doc_cache
+from streaming import temp_path
+
+try:
+    import pikepdf
+    from pikepdf import Dictionary, Name, Stream
+except ImportError:
+    pikepdf = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+@dataclass(frozen=True)
+class Profile:
+    name: str
+    dpi: int            # images above this resolution are downsampled to it
+    jpeg_quality: int   # quality used when re-encoding photographic images
+
+
+PROFILES = {
+    "screen": Profile("screen", 72, 40),
+    "ebook": Profile("ebook", 150, 60),
+    "print": Profile("print", 300, 85),
+}
+DEFAULT_PROFILE = "ebook"
+
+# only images in these colour spaces are re-encoded; others are left alone
+_SIMPLE_SPACES = {"/DeviceRGB": 3, "/DeviceGray": 1}
+
+
+def _require():
+    if pikepdf is None:
+        raise RuntimeError("Compression needs pikepdf (pip install pikepdf)")
+
+
+def _components(image):
+    space = image.get("/ColorSpace")
+    if isinstance(space, Name):
+        return _SIMPLE_SPACES.get(str(space))
+    if isinstance(space, pikepdf.Array) and len(space) == 2 and space[0] == Name.ICCBased:
+        n = int(space[1].get("/N", 0))
+        return n if n in (1, 3) else None
+    return None
+
+
+def _page_images(pdf):
+    """Yield (image, widest page it is shown on, in inches) for every image XObject, once each."""
+    widest = {}
+    images = {}
+
+    def walk(resources, width, seen):
+        xobjects = resources.get("/XObject") if resources is not None else None
+        if xobjects is None:
+            return
+        for _, xobj in xobjects.items():
+            if not isinstance(xobj, Stream) or xobj.objgen in seen:
+                continue
+            seen.add(xobj.objgen)
+            if xobj.get("/Subtype") == Name.Image:
+                images[xobj.objgen] = xobj
+                widest[xobj.objgen] = max(widest.get(xobj.objgen, 0), width)
+            elif xobj.get("/Subtype") == Name.Form:
+                walk(xobj.get("/Resources"), width, seen)
+
+    for page in pdf.pages:
+        box = page.mediabox
+        size = max(abs(float(box[2]) - float(box[0])), abs(float(box[3]) - float(box[1]))) / 72
+        walk(page.obj.get("/Resources"), size, set())
+    for key, image in images.items():
+        yield image, widest[key]
+
+
+def _recompress_image(image, page_inches, profile):
+    """Downsample/re-encode one image in place; returns bytes saved (0 if left alone).
+
+    The target size is computed against the page the image sits on: an image
+    can never be drawn larger than its page, so its real resolution is at
+    least the one estimated here and never drops below the profile's DPI.
+    """
+    components = _components(image)
+    if (components is None or image.get("/ImageMask", False) or int(image.get("/BitsPerComponent", 8)) != 8
+            or "/Decode" in image or "/SMask" in image or "/Mask" in image):
+        return 0
+    before = len(image.read_raw_bytes())
+    try:
+        pil = pikepdf.PdfImage(image).as_pil_image()
+    except Exception:
+        return 0  # filters Pillow cannot decode (JBIG2, JPX, ...)
+    pil = pil.convert("L" if components == 1 else "RGB")
+    width, height = pil.size
+    max_pixels = int(page_inches * profile.dpi) if page_inches else 0
+    if max_pixels and max(width, height) > max_pixels:
+        scale = max_pixels / max(width, height)
+        pil = pil.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.LANCZOS)
+    buf = io.BytesIO()
+    pil.save(buf, "JPEG", quality=profile.jpeg_quality, optimize=True)
+    data = buf.getvalue()
+    if len(data) >= before:
+        return 0
+    image.write(data, filter=Name.DCTDecode)
+    image.Width, image.Height = pil.size
+    image.BitsPerComponent = 8
+    if "/DecodeParms" in image:
+        del image["/DecodeParms"]
+    return before - len(data)
+
+
+def _digest(obj):
+    h = hashlib.sha256()
+    if isinstance(obj, Stream):
+        h.update(obj.read_raw_bytes())
+        obj = Dictionary({k: v for k, v in obj.items() if k != "/Length"})
+    h.update(obj.unparse(resolved=True))  # the object itself; nested references stay references
+    return h.digest()
+
+
+def _dedupe(pdf, select):
+    """Point every reference to a duplicate object at its first copy; returns bytes saved."""
+    canonical, replace, saved = {}, {}, 0
+    for obj in pdf.objects:
+        if not select(obj):
+            continue
+        key = _digest(obj)
+        if key in canonical:
+            replace[obj.objgen] = canonical[key]
+            saved += len(obj.read_raw_bytes()) if isinstance(obj, Stream) else 0
+        else:
+            canonical[key] = obj
+    if not replace:
+        return 0, 0
+
+    def swap(container):
+        items = enumerate(container) if isinstance(container, pikepdf.Array) else container.items()
+        for key, value in list(items):
+            if not isinstance(value, pikepdf.Object):
+                continue  # numbers, booleans, ... come back as Python values
+            if value.is_indirect:
+                if value.objgen in replace:
+                    container[key] = replace[value.objgen]
+            elif isinstance(value, (Dictionary, pikepdf.Array)):
+                swap(value)
+
+    for obj in pdf.objects:
+        if isinstance(obj, (Dictionary, pikepdf.Array, Stream)):
+            swap(obj)
+    swap(pdf.trailer)
+    return len(replace), saved
+
+
+def _is_type(*types):
+    def select(obj):
+        return isinstance(obj, (Dictionary, Stream)) and obj.get("/Type") in types
+    return select
+
+
+def _is_stream(obj):
+    return isinstance(obj, Stream)
+
+
+def compress_file(file, output, profile=DEFAULT_PROFILE, images=True, linearize=False):
+    """Compress ``file`` into ``output``; returns a dict of before/after statistics.
+
+    ``linearize`` lays the output out for fast web view.
+    """
+    _require()
+    profile = PROFILES[profile] if isinstance(profile, str) else profile
+    started = time.perf_counter()
+    before = os.path.getsize(file)
+    stats = {"profile": profile.name, "bytes_before": before, "images_recompressed": 0,
+             "image_bytes_saved": 0, "duplicates_merged": 0, "duplicate_bytes_saved": 0}
+    tmp = temp_path(output)  # ``output`` may be ``file``, which pikepdf will not overwrite
+    try:
+        with pikepdf.open(file) as pdf:
+            stats["pages"] = len(pdf.pages)
+            # streams first so fonts that embed the same font file become identical too,
+            # and before images so a repeated image is only re-encoded once
+            for select in (_is_stream, _is_type(Name.FontDescriptor), _is_type(Name.Font),
+                           _is_type(Name.ExtGState)):
+                merged, saved = _dedupe(pdf, select)
+                stats["duplicates_merged"] += merged
+                stats["duplicate_bytes_saved"] += saved
+            if images and Image is not None:
+                for image, inches in _page_images(pdf):
+                    saved = _recompress_image(image, inches, profile)
+                    if saved:
+                        stats["images_recompressed"] += 1
+                        stats["image_bytes_saved"] += saved
+            pdf.remove_unreferenced_resources()
+            pdf.save(tmp, compress_streams=True, recompress_flate=True, linearize=linearize,
+                     object_stream_mode=pikepdf.ObjectStreamMode.generate)
+        doc_cache.invalidate(output)  # close any map of the target before replacing it
+        os.replace(tmp, output)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    stats["bytes_after"] = os.path.getsize(output)
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
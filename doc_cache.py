@@ -0,0 +1,154 @@
+"""
+Process-wide LRU cache of parsed PdfReader objects.
+
+Entries are keyed by absolute path and validated against the file's mtime
+and size on every lookup, so an edited file is re-parsed automatically.
+The cache is bounded by an approximate byte budget (the source file size).
+Sources are memory-mapped (see ``sources``), so the bytes behind a cached
+reader live in the shared, reclaimable page cache rather than on the heap.
+A dropped entry closes its map as soon as nobody is using it: Windows
+refuses to replace or truncate a file while a map of it is open, so call
+``invalidate(path)`` before writing to ``path``.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from sources import close_reader, open_reader
+
+DEFAULT_BUDGET = 256 * 1024 * 1024
+
+
+class _Entry:
+    def __init__(self, stamp, reader, cost):
+        self.stamp = stamp
+        self.reader = reader
+        self.cost = cost
+        self.lock = threading.RLock()
+        self._guard = threading.Lock()  # protects the fields below
+        self._users = 0
+        self._owner = None  # thread holding ``lock``
+        self._dropped = False
+
+    def enter(self):
+        """Count a user that holds ``lock``; False once the entry is dropped."""
+        with self._guard:
+            if self._dropped:
+                return False
+            self._users += 1
+            self._owner = threading.get_ident()
+            return True
+
+    def leave(self):
+        with self._guard:
+            self._users -= 1
+            if self._users:
+                return
+            self._owner = None
+            idle = self._dropped
+        if idle:
+            close_reader(self.reader)
+
+    def drop(self):
+        # no new users once dropped; close now unless another thread is reading.
+        # The thread that drops its own entry is about to overwrite the file,
+        # so it is done with the reader.
+        with self._guard:
+            self._dropped = True
+            idle = self._users == 0 or self._owner == threading.get_ident()
+        if idle:
+            close_reader(self.reader)
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+@contextmanager
+def _private(path):
+    reader = open_reader(path)
+    try:
+        yield reader
+    finally:
+        close_reader(reader)
+
+
+class DocumentCache:
+    def __init__(self, max_bytes=DEFAULT_BUDGET):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, path):
+        key = os.path.abspath(path)
+        stamp = _stamp(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.stamp == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if entry is not None:
+                self._drop(key)
+        # parse outside the cache lock so other files stay available meanwhile
+        entry = _Entry(stamp, open_reader(key), stamp[1])
+        with self._lock:
+            self.misses += 1
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self.used_bytes += entry.cost
+            while self.used_bytes > self.max_bytes and len(self._entries) > 1:
+                self._drop(next(iter(self._entries)))
+        return entry
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self.used_bytes -= entry.cost
+        entry.drop()
+
+    @contextmanager
+    def reader(self, path, blocking=True):
+        """Yield a cached reader for ``path`` with exclusive use of it.
+
+        PdfReader is not thread-safe, so concurrent users of the same file are
+        serialized. With ``blocking=False`` a busy entry yields a private,
+        uncached reader instead of waiting (use this on the GUI thread), as
+        does an entry dropped before it could be locked.
+        """
+        entry = self._entry(path)
+        if not entry.lock.acquire(blocking):
+            with _private(path) as reader:
+                yield reader
+            return
+        try:
+            if not entry.enter():
+                with _private(path) as reader:
+                    yield reader
+                return
+            try:
+                yield entry.reader
+            finally:
+                entry.leave()
+        finally:
+            entry.lock.release()
+
+    def invalidate(self, path=None):
+        """Forget ``path`` (or everything) and close the maps behind it."""
+        with self._lock:
+            if path is None:
+                for key in list(self._entries):
+                    self._drop(key)
+            elif os.path.abspath(path) in self._entries:
+                self._drop(os.path.abspath(path))
+
+
+cache = DocumentCache()
+reader = cache.reader
+invalidate = cache.invalidate
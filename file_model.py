@@ -0,0 +1,262 @@
+"""
+Model behind the file list. Paths live in one byte buffer with an offset
+array instead of one Python string and one QListWidgetItem per row, and the
+page count, size and modification time of each file live in typed arrays, so
+100k rows cost a few megabytes and a row is only decoded when it is painted.
+
+Appending, reading, moving and finding a row by path are O(1): the store
+indexes paths by hash and the model keeps a path id -> row array. Bulk
+removal shifts the row array once per contiguous block of removed rows (or
+rebuilds it once when the selection is badly fragmented) and renumbers the
+rows after the first one removed.
+"""
+
+import os
+import time
+from array import array
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+UNKNOWN = -1
+COLUMNS = ("Name", "Pages", "Size", "Modified", "Folder")
+NAME, PAGES, SIZE, MODIFIED, FOLDER = range(len(COLUMNS))
+COMPACT_MIN = 4096  # dead paths tolerated in the store before it is rebuilt
+RESET_BLOCKS = 256  # removals split into more runs than this reset the model instead
+
+
+class PathStore:
+    """Append-only path table: ``add`` returns an id and ``path(id)`` decodes it again.
+
+    Lookups go through a dict keyed by the path's hash (an int, not a copy of
+    the string); ids whose paths share a hash are chained and told apart by
+    comparing the stored bytes.
+    """
+
+    def __init__(self):
+        self._blob = bytearray()
+        self._starts = array("q")
+        self._index = {}            # hash(path) -> newest id with that hash
+        self._chain = array("q")    # id -> previous id with the same hash, or -1
+
+    def __len__(self):
+        return len(self._starts)
+
+    def add(self, path):
+        return self.extend([path])
+
+    def extend(self, paths):
+        """Add many paths at once; returns the id of the first."""
+        first = pid = len(self._starts)
+        at = len(self._blob)
+        for path in paths:
+            encoded = os.fsencode(path)
+            self._starts.append(at)
+            self._blob += encoded
+            at += len(encoded)
+            key = hash(path)
+            self._chain.append(self._index.get(key, -1))
+            self._index[key] = pid
+            pid += 1
+        return first
+
+    def _bytes(self, pid):
+        end = self._starts[pid + 1] if pid + 1 < len(self._starts) else len(self._blob)
+        return self._blob[self._starts[pid]:end]
+
+    def path(self, pid):
+        return os.fsdecode(bytes(self._bytes(pid)))
+
+    def find(self, path):
+        """Yield the ids stored for ``path``, newest first."""
+        encoded = os.fsencode(path)
+        pid = self._index.get(hash(path), -1)
+        while pid >= 0:
+            if self._bytes(pid) == encoded:
+                yield pid
+            pid = self._chain[pid]
+
+
+def _blocks(rows):
+    """Sorted (first, last) runs of consecutive rows."""
+    runs = []
+    for row in sorted(set(rows)):
+        if runs and runs[-1][1] == row - 1:
+            runs[-1][1] = row
+        else:
+            runs.append([row, row])
+    return runs
+
+
+class FileListModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._reset()
+
+    def _reset(self):
+        self._store = PathStore()
+        self._rows = array("q")    # row -> path id
+        self._row_of = array("q")  # path id -> row, or -1 once removed
+        self._pages = array("q")   # path id -> page count (UNKNOWN until indexed)
+        self._sizes = array("q")   # path id -> bytes
+        self._mtimes = array("q")  # path id -> st_mtime_ns
+
+    # ---------- Qt model interface ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        pid, column = self._rows[index.row()], index.column()
+        if role == Qt.DisplayRole:
+            if column in (NAME, FOLDER):
+                split = os.path.split(self._store.path(pid))
+                return split[1] if column == NAME else split[0]
+            value = (self._pages, self._sizes, self._mtimes)[column - PAGES][pid]
+            if value == UNKNOWN:
+                return ""
+            if column == PAGES:
+                return str(value)
+            if column == SIZE:
+                return f"{value / 1024:.1f} KB"
+            return time.strftime("%Y-%m-%d %H:%M", time.localtime(value / 1e9))
+        if role in (Qt.ToolTipRole, Qt.UserRole):
+            return self._store.path(pid)
+        if role == Qt.TextAlignmentRole and column in (PAGES, SIZE):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if not 0 <= column < len(COLUMNS):
+            return  # sort indicator cleared: keep the current order
+        if column in (NAME, FOLDER):
+            part = 1 if column == NAME else 0
+            key = lambda pid: os.path.split(self._store.path(pid))[part].lower()
+        else:
+            key = (self._pages, self._sizes, self._mtimes)[column - PAGES].__getitem__
+        self.layoutAboutToBeChanged.emit()
+        old = self.persistentIndexList()
+        old_ids = [self._rows[i.row()] for i in old]
+        self._rows = array("q", sorted(self._rows, key=key, reverse=order == Qt.DescendingOrder))
+        self._renumber(0)
+        if old:
+            self.changePersistentIndexList(old, [self.index(self._row_of[pid], i.column())
+                                                 for pid, i in zip(old_ids, old)])
+        self.layoutChanged.emit()
+
+    # ---------- rows ----------
+    def path(self, row):
+        return self._store.path(self._rows[row])
+
+    def paths(self):
+        return [self._store.path(pid) for pid in self._rows]
+
+    def find(self, path):
+        """Row of ``path``, or -1."""
+        for pid in self._store.find(os.path.abspath(path)):
+            if self._row_of[pid] >= 0:  # -1: a removed row
+                return self._row_of[pid]
+        return -1
+
+    def append(self, records):
+        """Add a row per dict with "path" and, when known, "pages", "size" and "mtime_ns"."""
+        if not records:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        cwd = os.getcwd()
+        pid = self._store.extend(os.path.normpath(os.path.join(cwd, r["path"])) for r in records)
+        self._rows.extend(range(pid, pid + len(records)))
+        self._row_of.extend(range(first, first + len(records)))
+        for column, key in ((self._pages, "pages"), (self._sizes, "size"), (self._mtimes, "mtime_ns")):
+            column.extend(UNKNOWN if value is None else value for value in (r.get(key) for r in records))
+        self.endInsertRows()
+
+    def set_metadata(self, path, pages=None, size=None, mtime_ns=None):
+        """Fill in the columns of every row showing ``path`` (None leaves a column as it is)."""
+        for pid in self._store.find(os.path.abspath(path)):
+            for column, value in ((self._pages, pages), (self._sizes, size), (self._mtimes, mtime_ns)):
+                if value is not None:
+                    column[pid] = value
+            row = self._row_of[pid]
+            if row >= 0:
+                self.dataChanged.emit(self.index(row, PAGES), self.index(row, MODIFIED))
+
+    def clear(self):
+        self.beginResetModel()
+        self._reset()
+        self.endResetModel()
+
+    def remove_rows(self, rows):
+        blocks = _blocks(rows)
+        if not blocks:
+            return
+        for first, last in blocks:
+            for pid in self._rows[first:last + 1]:
+                self._row_of[pid] = -1
+        if len(blocks) > RESET_BLOCKS:
+            # a scattered selection: one pass over the rows beats a signal pair per block
+            gone = set(rows)
+            self.beginResetModel()
+            self._rows = array("q", (pid for row, pid in enumerate(self._rows) if row not in gone))
+            self.endResetModel()
+        else:
+            for first, last in reversed(blocks):
+                self.beginRemoveRows(QModelIndex(), first, last)
+                del self._rows[first:last + 1]
+                self.endRemoveRows()
+        self._renumber(blocks[0][0])
+        self._compact()
+
+    def move_rows(self, rows, step):
+        """Move ``rows`` one place up (step -1) or down (step 1) together.
+
+        A row at the edge stays put, and so does a row pressed against one
+        that stayed put, so a selected block keeps its shape.
+        """
+        self.layoutAboutToBeChanged.emit()
+        edge = -1 if step < 0 else len(self._rows)
+        origin = {}  # row -> row it held before the move
+        for row in sorted(set(rows), reverse=step > 0):
+            target = row + step
+            if target == edge:
+                edge = row
+                continue
+            origin[row], origin[target] = origin.get(target, target), origin.get(row, row)
+            self._rows[row], self._rows[target] = self._rows[target], self._rows[row]
+            self._row_of[self._rows[row]], self._row_of[self._rows[target]] = row, target
+        if origin:
+            moved = {before: after for after, before in origin.items()}
+            old = self.persistentIndexList()
+            self.changePersistentIndexList(old, [self.index(moved.get(i.row(), i.row()), i.column())
+                                                 for i in old])
+        self.layoutChanged.emit()
+
+    def _renumber(self, start):
+        # rows from ``start`` on have shifted (removal) or been reordered (sort)
+        row_of, rows = self._row_of, self._rows
+        for row in range(start, len(rows)):
+            row_of[rows[row]] = row
+
+    def _compact(self):
+        # removed rows leave their path behind in the store; rebuild it once most of it is dead
+        if len(self._store) < COMPACT_MIN or len(self._store) < 2 * len(self._rows):
+            return
+        store, rows = PathStore(), array("q")
+        pages, sizes, mtimes = array("q"), array("q"), array("q")
+        for pid in self._rows:
+            rows.append(store.add(self._store.path(pid)))
+            pages.append(self._pages[pid])
+            sizes.append(self._sizes[pid])
+            mtimes.append(self._mtimes[pid])
+        self._store, self._rows = store, rows
+        self._row_of = array("q", range(len(rows)))
+        self._pages, self._sizes, self._mtimes = pages, sizes, mtimes
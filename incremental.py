@@ -0,0 +1,339 @@
+"""
+Incremental-update writer: changed and new objects are appended to the end
+of an existing PDF together with a new cross-reference section whose
+trailer points back (/Prev) at the original one. The original bytes are
+left untouched, so saving costs time and disk in proportion to the change,
+not to the size of the document.
+"""
+
+import os
+import re
+import shutil
+import zlib
+from io import BytesIO
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from PyPDF2 import PageObject, PdfReader
+from PyPDF2.generic import (
+    ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject, TextStringObject,
+)
+
+from sources import open_source
+
+TAIL_BYTES = 2048  # how far from the end of the file to look for startxref
+INHERITABLE = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+FICLONE = 0x40049409  # Linux ioctl: share the source's extents (btrfs, XFS, ...)
+LABEL_STYLES = {"D", "R", "r", "A", "a"}
+
+
+def clone_file(src, dst):
+    """Copy ``src`` to ``dst`` as cheaply as the filesystem allows.
+
+    Tries a reflink (no data copied), then copy_file_range (copied inside the
+    kernel), then a plain copy.
+    """
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+                return "reflink"
+            except OSError:
+                pass
+        if hasattr(os, "copy_file_range"):
+            try:
+                remaining = os.fstat(fin.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fin.fileno(), fout.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return "copy_file_range"
+            except OSError:
+                pass
+            fin.seek(0)
+            fout.seek(0)
+            fout.truncate()
+        shutil.copyfileobj(fin, fout, 1 << 20)
+        return "copy"
+
+
+def _startxref(fh):
+    fh.seek(0, os.SEEK_END)
+    size = fh.tell()
+    fh.seek(max(0, size - TAIL_BYTES))
+    found = re.findall(rb"startxref\s+(\d+)", fh.read())
+    if not found:
+        raise ValueError("No startxref found; not a valid PDF")
+    return int(found[-1]), size
+
+
+def _runs(numbers):
+    """Group sorted object numbers into (first, count) subsections."""
+    runs = []
+    for num in numbers:
+        if runs and runs[-1][0] + runs[-1][1] == num:
+            runs[-1][1] += 1
+        else:
+            runs.append([num, 1])
+    return runs
+
+
+class IncrementalWriter:
+    """Collect edits to ``path`` and append them as an incremental update.
+
+    Objects obtained from ``reader`` (pages, the catalog, ...) are edited in
+    place and passed to ``update``; brand new objects go through ``add``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = open_source(path)
+        try:
+            self.reader = PdfReader(self._fh)
+            if self.reader.is_encrypted:
+                raise ValueError("Incremental updates of encrypted PDFs are not supported")
+            self._prev, self._size = _startxref(self._fh)
+            self._fh.seek(self._prev)
+            self._xref_stream = not self._fh.read(4).startswith(b"xref")
+        except BaseException:
+            self._fh.close()
+            raise
+        self._next = self._size_of(self.reader)
+        self._changed = {}  # (number, generation) -> object
+        self._trailer = {}  # trailer entries replaced by this update
+
+    @staticmethod
+    def _size_of(reader):
+        # PyPDF2 does not keep /Size from cross-reference streams, so also count the objects it saw
+        numbers = [num for table in reader.xref.values() for num in table]
+        numbers.extend(reader.xref_objStm)
+        return max([int(reader.trailer.get("/Size", 0)), *(n + 1 for n in numbers)])
+
+    @property
+    def page_count(self):
+        return int(self.reader.trailer["/Root"]["/Pages"]["/Count"])
+
+    def page(self, index):
+        """Return page ``index`` by walking the page tree, without flattening it.
+
+        Subtrees are skipped by their /Count, so only the nodes on the path to
+        the page and their siblings are parsed. Inherited attributes are copied onto the page
+        (as PyPDF2 does), which keeps the appended page self-contained.
+        """
+        if not 0 <= index < self.page_count:
+            raise IndexError(f"Page {index + 1} out of range")
+        node = self.reader.trailer["/Root"]["/Pages"]
+        inherited = {}
+        while True:
+            for key in INHERITABLE:
+                if key in node:
+                    inherited[key] = node.raw_get(key)
+            for ref in node["/Kids"]:  # array items are kept as references
+                kid = ref.get_object()
+                subtree = kid.get("/Type") == "/Pages" or "/Kids" in kid
+                count = int(kid.get("/Count", 0)) if subtree else 1
+                if index < count:
+                    break
+                index -= count
+            else:
+                raise IndexError("Page tree /Count does not match its kids")
+            if not subtree:
+                return self._page(ref, inherited)
+            node = kid
+
+    def _page(self, ref, inherited):
+        page = PageObject(self.reader, ref)
+        page.update(ref.get_object())
+        for key, value in inherited.items():
+            if key not in page:
+                page[NameObject(key)] = value
+        return page
+
+    @property
+    def changed(self):
+        return len(self._changed)
+
+    def update(self, obj):
+        """Mark an object read from this document as modified."""
+        ref = obj if isinstance(obj, IndirectObject) else obj.indirect_reference
+        if ref is None:
+            raise ValueError("Only indirect objects can be updated incrementally")
+        self._changed[(ref.idnum, ref.generation)] = self._resolve(ref) if obj is ref else obj
+
+    def _resolve(self, ref):
+        # objects added by this update are not known to the reader
+        return self._changed.get((ref.idnum, ref.generation)) or ref.get_object()
+
+    def add(self, obj):
+        """Register a new object and return a reference to it."""
+        ref = IndirectObject(self._next, 0, self.reader)
+        self._next += 1
+        self._changed[(ref.idnum, 0)] = obj
+        return ref
+
+    def write(self, output=None):
+        """Append the update to ``output`` (a copy of the source) or, by default, the source itself.
+
+        Appending to the source closes this writer's map of it first, so
+        nothing can be read through the writer afterwards. Returns the number
+        of bytes appended.
+        """
+        if output is not None and os.path.abspath(output) != os.path.abspath(self.path):
+            clone_file(self.path, output)
+        else:
+            output = self.path
+        if not self._changed:
+            return 0
+        buf = BytesIO()
+        buf.write(b"\n")
+        offsets = {}
+        for key in sorted(self._changed):
+            offsets[key] = self._size + buf.tell()
+            buf.write(f"{key[0]} {key[1]} obj\n".encode())
+            self._changed[key].write_to_stream(buf, None)
+            buf.write(b"\nendobj\n")
+        xref_at = self._size + buf.tell()
+        if self._xref_stream:
+            self._write_xref_stream(buf, offsets, xref_at)
+        else:
+            self._write_xref_table(buf, offsets)
+        buf.write(f"startxref\n{xref_at}\n%%EOF\n".encode())
+        if output == self.path:
+            self.close()  # Windows will not extend a file that is still mapped
+        with open(output, "ab") as f:
+            f.write(buf.getvalue())
+        return buf.tell()
+
+    def _trailer_entries(self, size):
+        entries = BytesIO()
+        entries.write(f"/Size {size} /Prev {self._prev}".encode())
+        for key in ("/Root", "/Info", "/ID"):
+            value = self._trailer.get(key)
+            if value is None and key in self.reader.trailer:
+                value = self.reader.trailer.raw_get(key)
+            if value is not None:
+                entries.write(f" {key} ".encode())
+                value.write_to_stream(entries, None)
+        return entries.getvalue()
+
+    def _write_xref_table(self, buf, offsets):
+        entries = {n: (offsets[(n, g)], g) for n, g in offsets}
+        buf.write(b"xref\n")
+        for first, count in _runs(sorted(entries)):
+            buf.write(f"{first} {count}\n".encode())
+            for num in range(first, first + count):
+                buf.write(f"{entries[num][0]:010d} {entries[num][1]:05d} n \n".encode())
+        buf.write(b"trailer\n<< " + self._trailer_entries(self._next) + b" >>\n")
+
+    def _write_xref_stream(self, buf, offsets, xref_at):
+        # the original uses a cross-reference stream, so the update does too
+        num = self._next
+        entries = {n: (offsets[(n, g)], g) for n, g in offsets}
+        entries[num] = (xref_at, 0)
+        width = 4 if xref_at < 1 << 32 else 8
+        runs = _runs(sorted(entries))
+        data = b"".join(b"\x01" + entries[n][0].to_bytes(width, "big") + entries[n][1].to_bytes(2, "big")
+                        for first, count in runs for n in range(first, first + count))
+        data = zlib.compress(data)
+        index = " ".join(f"{first} {count}" for first, count in runs)
+        buf.write(f"{num} 0 obj\n<< /Type /XRef /W [1 {width} 2] /Index [{index}] ".encode())
+        buf.write(self._trailer_entries(num + 1))
+        buf.write(f" /Filter /FlateDecode /Length {len(data)} >>\nstream\n".encode())
+        buf.write(data)
+        buf.write(b"\nendstream\nendobj\n")
+
+    # ---------- document-level edits ----------
+    @property
+    def catalog(self):
+        return self.reader.trailer["/Root"]
+
+    def _touch(self, parent, key):
+        """Mark the object holding ``parent[key]`` as changed and return the value."""
+        value = parent.raw_get(key)
+        if isinstance(value, IndirectObject):
+            self.update(value)
+            return self._resolve(value)
+        return value
+
+    def set_metadata(self, fields):
+        """Set document info entries, e.g. {"/Title": "Report", "/Author": "Ann"}; None removes one."""
+        if "/Info" in self.reader.trailer and isinstance(self.reader.trailer.raw_get("/Info"), IndirectObject):
+            info = self._touch(self.reader.trailer, "/Info")
+        else:
+            info = DictionaryObject(self.reader.trailer.get("/Info", {}))
+            self._trailer["/Info"] = self.add(info)
+        for key, value in fields.items():
+            key = key if key.startswith("/") else "/" + key
+            if value is None:
+                info.pop(key, None)
+            else:
+                info[NameObject(key)] = TextStringObject(value)
+
+    def set_page_labels(self, labels):
+        """Replace the page labels; ``labels`` is a list of dicts with a 1-based
+        "page" where the range starts and optional "style" (D R r A a), "prefix"
+        and "start"."""
+        nums = ArrayObject()
+        for label in sorted(labels, key=lambda l: int(l["page"])):
+            page = int(label["page"])
+            if not 1 <= page <= self.page_count:
+                raise ValueError(f"Page label starts on page {page}, outside the document")
+            entry = DictionaryObject()
+            style = label.get("style") or ""
+            if style:
+                if style not in LABEL_STYLES:
+                    raise ValueError(f"Unknown page label style {style!r} (use one of D R r A a)")
+                entry[NameObject("/S")] = NameObject("/" + style)
+            if label.get("prefix"):
+                entry[NameObject("/P")] = TextStringObject(label["prefix"])
+            if int(label.get("start", 1)) != 1:
+                entry[NameObject("/St")] = NumberObject(int(label["start"]))
+            nums.extend([NumberObject(page - 1), entry])
+        self.update(self.reader.trailer.raw_get("/Root"))
+        if nums:
+            self.catalog[NameObject("/PageLabels")] = DictionaryObject({NameObject("/Nums"): nums})
+        else:
+            self.catalog.pop("/PageLabels", None)
+
+    def add_bookmark(self, title, page):
+        """Append a top-level bookmark pointing at 1-based ``page``."""
+        page_ref = self.page(int(page) - 1).indirect_reference
+        if "/Outlines" in self.catalog:
+            outlines = self._touch(self.catalog, "/Outlines")
+            outlines_ref = self.catalog.raw_get("/Outlines")
+        else:
+            outlines = DictionaryObject({NameObject("/Type"): NameObject("/Outlines")})
+            outlines_ref = self.add(outlines)
+            self.update(self.reader.trailer.raw_get("/Root"))
+            self.catalog[NameObject("/Outlines")] = outlines_ref
+        if not isinstance(outlines_ref, IndirectObject):
+            raise ValueError("Direct /Outlines dictionaries are not supported")
+        item = DictionaryObject({
+            NameObject("/Title"): TextStringObject(title),
+            NameObject("/Parent"): outlines_ref,
+            NameObject("/Dest"): ArrayObject([page_ref, NameObject("/Fit")]),
+        })
+        item_ref = self.add(item)
+        if "/Last" in outlines:
+            last = self._touch(outlines, "/Last")
+            last[NameObject("/Next")] = item_ref
+            item[NameObject("/Prev")] = outlines.raw_get("/Last")
+        else:
+            outlines[NameObject("/First")] = item_ref
+        outlines[NameObject("/Last")] = item_ref
+        outlines[NameObject("/Count")] = NumberObject(abs(int(outlines.get("/Count", 0))) + 1)
+        return item_ref
+
+    def close(self):
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,149 @@
+"""
+Folder ingestion: files and folders are scanned recursively with
+os.scandir, every candidate is checked for a %PDF- header and probed for
+its page count in worker processes, and the results are handed back in
+batches, in scan order, while the scan is still running.
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from pdf_engine import Result
+from probe import ProbeError, probe
+
+HEADER_BYTES = 1024  # the header may follow up to 1 KB of junk
+CHUNK = 256          # files per worker task (a probe takes well under a millisecond)
+
+
+def scan(paths):
+    """Yield the files to ingest from ``paths``, in name order.
+
+    Folders are walked recursively and contribute their ``*.pdf`` files
+    (any case); files given directly are yielded whatever their name and
+    left to the header check. Symlinked folders are not followed, so links
+    cannot loop.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            yield from _walk(path)
+        elif os.path.isfile(path):
+            yield path
+
+
+def _walk(top):
+    stack = [top]
+    while stack:
+        folder = stack.pop()
+        files, folders = [], []
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            folders.append(entry.path)
+                        elif entry.name.lower().endswith(".pdf") and entry.is_file():
+                            files.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue  # unreadable folder
+        yield from sorted(files)
+        stack.extend(sorted(folders, reverse=True))
+
+
+def has_pdf_header(path):
+    with open(path, "rb") as f:
+        return b"%PDF-" in f.read(HEADER_BYTES)
+
+
+def check_file(path):
+    """Validate and probe one file; returns its record ("error" is set for rejected files)."""
+    record = {"path": path, "pages": None, "encrypted": False, "info": {}, "size": 0, "mtime_ns": 0, "error": ""}
+    try:
+        st = os.stat(path)
+        record["size"], record["mtime_ns"] = st.st_size, st.st_mtime_ns
+        if not has_pdf_header(path):
+            record["error"] = "not a PDF"
+            return record
+    except OSError as e:
+        record["error"] = e.strerror or str(e)
+        return record
+    try:
+        meta = probe(path)
+        record.update(pages=meta["pages"], encrypted=meta["encrypted"], info=meta["info"])
+    except ProbeError:
+        pass  # still a PDF; a full parse may recover it later
+    return record
+
+
+def _check_chunk(paths):
+    return [check_file(path) for path in paths]
+
+
+def ingest(paths, on_batch, progress=None, workers=None, chunk=CHUNK):
+    """Scan ``paths`` and call ``on_batch(records)`` for each validated chunk, in scan order.
+
+    Scanning continues while earlier chunks are being checked; at most a few
+    chunks per worker are in flight. Inputs that fit in a single chunk are
+    checked in this thread instead of starting a pool. Returns a Result whose
+    stats count the files found, added and rejected.
+    """
+    started = time.perf_counter()
+    stats = {"found": 0, "added": 0, "rejected": 0}
+    pages = 0
+
+    def deliver(records):
+        nonlocal pages
+        ok = [r for r in records if not r["error"]]
+        stats["added"] += len(ok)
+        stats["rejected"] += len(records) - len(ok)
+        pages += sum(r["pages"] or 0 for r in ok)
+        on_batch(records)
+        if progress is not None:
+            progress(stats["added"] + stats["rejected"], stats["found"])
+
+    pending = []
+    found = scan(paths)
+    for path in found:
+        pending.append(path)
+        stats["found"] += 1
+        if len(pending) == chunk:
+            break
+    if stats["found"] < chunk:
+        deliver(_check_chunk(pending))
+        return Result("ingest", "", list(paths), pages, time.perf_counter() - started, stats=stats)
+
+    workers = workers or os.cpu_count() or 1
+    futures, done, next_index, submitted = {}, {}, 0, 0
+
+    def collect(block):
+        nonlocal next_index
+        finished, _ = wait(list(futures), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in finished:
+            done[futures.pop(future)] = future.result()
+        while next_index in done:  # hand batches over in scan order
+            deliver(done.pop(next_index))
+            next_index += 1
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            futures[pool.submit(_check_chunk, pending)] = submitted
+            submitted += 1
+            pending = []
+            for path in found:
+                pending.append(path)
+                stats["found"] += 1
+                if len(pending) == chunk:
+                    futures[pool.submit(_check_chunk, pending)] = submitted
+                    submitted += 1
+                    pending = []
+                    collect(block=len(futures) >= workers * 4)
+            if pending:
+                futures[pool.submit(_check_chunk, pending)] = submitted
+            while futures:
+                collect(block=True)
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+    return Result("ingest", "", list(paths), pages, time.perf_counter() - started, stats=stats)
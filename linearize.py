@@ -0,0 +1,201 @@
+"""
+Linearized ("fast web view") output.
+
+A linearized file starts with a dictionary giving the file length (/L), the
+object number of page 1 (/O) and the offset where page 1 ends (/E), followed
+by page 1 and everything it draws with, so a viewer that has fetched only
+the first /E bytes can show the first page while the rest downloads.
+
+Writing needs pikepdf (an optional dependency of the toolkit); checking a
+file needs only PyPDF2.
+"""
+
+import io
+import os
+import re
+import zlib
+
+from PyPDF2._utils import read_non_whitespace
+from PyPDF2.errors import PdfReadError
+from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject, read_object
+
+from streaming import temp_path
+
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+HEADER_BYTES = 1024  # the linearization dictionary must be the first object in the file
+_LINEARIZED = re.compile(rb"\d+\s+\d+\s+obj\s*<<(.*?)>>", re.S)
+_OBJ = re.compile(rb"(?<![\d.])(\d+)\s+(\d+)\s+obj\b")
+
+
+def _require():
+    if pikepdf is None:
+        raise RuntimeError("Linearized output needs pikepdf (pip install pikepdf)")
+
+
+def linearize_file(src, dst=None, password=None):
+    """Write a linearized copy of ``src`` to ``dst`` (``src`` itself when omitted).
+
+    An encrypted ``src`` is opened with ``password`` and keeps its encryption.
+    """
+    _require()
+    dst = dst or src
+    tmp = temp_path(dst, "lin")  # src may itself be the plain temp file of dst
+    try:
+        with pikepdf.open(src, password=password or "") as pdf:
+            pdf.save(tmp, linearize=True, encryption=pdf.is_encrypted)
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return dst
+
+
+def parameters(path):
+    """The linearization dictionary of ``path`` as {"L": ..., "O": ..., "E": ...}, or None."""
+    with open(path, "rb") as f:
+        head = f.read(HEADER_BYTES)
+    match = _LINEARIZED.search(head)
+    if match is None or b"/Linearized" not in match.group(1):
+        return None
+    return {key.decode(): int(value) for key, value in re.findall(rb"/([LOENT])\s+(\d+)", match.group(1))}
+
+
+def is_linearized(path):
+    return parameters(path) is not None
+
+
+class _Prefix:
+    """Resolves objects from the first bytes of a file only, as a viewer must before the rest arrives."""
+
+    strict = True
+
+    def __init__(self, data):
+        self.data = data
+        self.offsets = {}
+        for match in _OBJ.finditer(data):
+            self.offsets.setdefault((int(match.group(1)), int(match.group(2))), match.start())
+        self.xref = {0: {}}
+        for (num, gen), offset in self.offsets.items():
+            self.xref.setdefault(gen, {})[num] = offset
+        self._packed = None
+        self._cache = {}
+
+    def _object_streams(self):
+        # objects packed into object streams that lie inside the prefix
+        if self._packed is None:
+            self._packed = {}
+            for ref in list(self.offsets):
+                obj = self._read(ref)
+                if isinstance(obj, StreamObject) and obj.get("/Type") == "/ObjStm":
+                    self._packed.update({(num, 0): (obj, i) for i, num in enumerate(self._stream_numbers(obj))})
+        return self._packed
+
+    @staticmethod
+    def _stream_numbers(objstm):
+        header = objstm.get_data()[:int(objstm["/First"])].split()
+        return [int(num) for num in header[0::2]]
+
+    def _read(self, ref):
+        stream = io.BytesIO(self.data)
+        stream.seek(_OBJ.match(self.data, self.offsets[ref]).end())
+        return self._parse(stream)
+
+    def _parse(self, stream):
+        read_non_whitespace(stream)
+        stream.seek(-1, 1)
+        return read_object(stream, self)
+
+    def get_object(self, ref):
+        if isinstance(ref, IndirectObject):
+            ref = (ref.idnum, ref.generation)
+        if ref in self._cache:
+            return self._cache[ref]
+        if ref in self.offsets:
+            obj = self._read(ref)
+        elif ref in self._object_streams():
+            objstm, index = self._packed[ref]
+            data = objstm.get_data()
+            header = data[:int(objstm["/First"])].split()
+            stream = io.BytesIO(data)
+            stream.seek(int(objstm["/First"]) + int(header[2 * index + 1]))
+            obj = self._parse(stream)
+        else:
+            raise KeyError(ref)
+        self._cache[ref] = obj
+        return obj
+
+
+def check(path):
+    """Problems that stop page 1 of ``path`` showing from the first byte range; empty if none.
+
+    Reads only the first /E bytes and resolves page 1, its content streams
+    and every resource it draws with (fonts, images, forms, annotations)
+    from them, decoding each stream on the way.
+    """
+    params = parameters(path)
+    if params is None:
+        return ["not linearized (no /Linearized dictionary at the start of the file)"]
+    problems = []
+    size = os.path.getsize(path)
+    if params.get("L") != size:
+        problems.append(f"/L is {params.get('L')} but the file is {size} bytes (appended update?)")
+    if "O" not in params or "E" not in params:
+        return problems + ["linearization dictionary lacks /O or /E"]
+    with open(path, "rb") as f:
+        prefix = _Prefix(f.read(params["E"]))
+    # encrypted streams cannot be decoded without the key; check they are present only
+    decode = re.search(rb"/Encrypt\s+\d+\s+\d+\s+R", prefix.data) is None
+
+    seen = set()
+    pending = [(params["O"], 0)]
+    while pending:
+        ref = pending.pop()
+        if ref in seen:
+            continue
+        seen.add(ref)
+        try:
+            obj = prefix.get_object(ref)
+            if decode and isinstance(obj, StreamObject):
+                obj.get_data()
+        except KeyError:
+            problems.append(f"object {ref[0]} {ref[1]} R is not within the first {params['E']} bytes")
+            continue
+        except (PdfReadError, ValueError, zlib.error) as exc:
+            problems.append(f"object {ref[0]} {ref[1]} R cannot be read from the first byte range: {exc}")
+            continue
+        if ref == (params["O"], 0) and (not isinstance(obj, DictionaryObject) or obj.get("/Type") != "/Page"):
+            problems.append(f"/O {params['O']} is not a page")
+            continue
+        _references(obj, pending, is_page=ref == (params["O"], 0))
+    return problems
+
+
+def _references(obj, pending, is_page=False):
+    values = []
+    if isinstance(obj, DictionaryObject):
+        if obj.get("/Type") == "/Page" and not is_page:
+            return  # another page: part of its own section, not page 1's
+        values = [v for k, v in obj.items() if k not in ("/Parent", "/P")]
+    elif isinstance(obj, ArrayObject):
+        values = list(obj)
+    for value in values:
+        if isinstance(value, IndirectObject):
+            pending.append((value.idnum, value.generation))
+        else:
+            _references(value, pending)
+
+
+if __name__ == "__main__":
+    import sys
+
+    failed = False
+    for name in sys.argv[1:]:
+        found = check(name)
+        failed = failed or bool(found)
+        print(f"{name}: {'ok' if not found else '; '.join(found)}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,148 @@
+"""
+Persistent metadata index: page count, info dict, encryption flag and
+(optionally) page sizes for every file seen, keyed by path and validated by
+mtime + size, so the file list can show metadata without re-parsing
+unchanged PDFs. Files are read with the fast probe, which never loads the
+page tree; only page sizes need a full parse. The index lives in the user
+data folder (see ``storage.data_dir``).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from probe import ProbeError, probe
+from sources import open_reader
+from storage import data_dir
+
+INDEX_FILE = "metadata_index.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    pages INTEGER,
+    encrypted INTEGER NOT NULL DEFAULT 0,
+    info TEXT NOT NULL DEFAULT '{}',
+    page_sizes TEXT NOT NULL DEFAULT '[]',
+    indexed_at REAL NOT NULL
+)
+"""
+
+
+def read_metadata(path, page_sizes=False):
+    """Read the fields stored in the index from ``path``; ``page_sizes`` needs the whole page tree."""
+    probed = None
+    if not page_sizes:
+        try:
+            probed = probe(path)
+        except ProbeError:
+            pass  # damaged cross-reference data: let PyPDF2 reconstruct it
+        # encrypted info strings need the key, which only the full reader handles
+        if probed is not None and not probed["encrypted"]:
+            return {"pages": probed["pages"], "encrypted": False, "info": probed["info"], "page_sizes": []}
+    reader = open_reader(path)
+    encrypted = reader.is_encrypted
+    if encrypted:
+        try:
+            reader.decrypt("")
+        except Exception:
+            pass
+    meta = {"pages": None, "encrypted": encrypted, "info": {}, "page_sizes": []}
+    try:
+        meta["info"] = {k: str(v) for k, v in (reader.metadata or {}).items()}
+        if page_sizes:
+            meta["page_sizes"] = [[round(float(p.mediabox.width), 2), round(float(p.mediabox.height), 2)]
+                                  for p in reader.pages]
+        meta["pages"] = len(reader.pages)
+    except Exception:
+        # encrypted with a user password: only the flag (and the probed page count) is known
+        meta["pages"] = probed and probed["pages"]
+    return meta
+
+
+class MetadataIndex:
+    def __init__(self, path=None, page_sizes=False):
+        if path is None:
+            os.makedirs(data_dir(), exist_ok=True)
+            path = os.path.join(data_dir(), INDEX_FILE)
+        self.path = path
+        self.page_sizes = page_sizes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(SCHEMA)
+        self._db.commit()
+
+    @staticmethod
+    def _stamp(path):
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def get(self, path):
+        """Return the indexed metadata for path, or None if missing or stale."""
+        key = os.path.abspath(path)
+        try:
+            stamp = self._stamp(key)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT pages, encrypted, info, page_sizes, size FROM files "
+                "WHERE path = ? AND mtime_ns = ? AND size = ?", (key, *stamp)).fetchone()
+        if row is None:
+            return None
+        return {"pages": row[0], "encrypted": bool(row[1]), "info": json.loads(row[2]),
+                "page_sizes": json.loads(row[3]), "size": row[4]}
+
+    def update(self, path):
+        key = os.path.abspath(path)
+        stamp = self._stamp(key)
+        meta = read_metadata(key, self.page_sizes)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, *stamp, meta["pages"], int(meta["encrypted"]), json.dumps(meta["info"]),
+                 json.dumps(meta["page_sizes"]), time.time()))
+            self._db.commit()
+        meta["size"] = stamp[1]
+        return meta
+
+    def store(self, records):
+        """Save metadata gathered elsewhere (e.g. by ingest): dicts with path, mtime_ns, size,
+        pages, encrypted and info."""
+        rows = [(os.path.abspath(r["path"]), r["mtime_ns"], r["size"], r["pages"], int(r["encrypted"]),
+                 json.dumps(r["info"]), "[]", time.time()) for r in records]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+
+    def refresh(self, paths, progress=None):
+        """Index every path whose entry is missing or stale; returns how many were parsed."""
+        parsed = 0
+        paths = list(paths)
+        for idx, path in enumerate(paths, 1):
+            if self.get(path) is None:
+                try:
+                    self.update(path)
+                    parsed += 1
+                except Exception:
+                    pass  # unreadable files simply stay unindexed
+            if progress is not None:
+                progress(idx, len(paths))
+        return parsed
+
+    def forget_missing(self):
+        with self._lock:
+            paths = [r[0] for r in self._db.execute("SELECT path FROM files")]
+            gone = [(p,) for p in paths if not os.path.exists(p)]
+            self._db.executemany("DELETE FROM files WHERE path = ?", gone)
+            self._db.commit()
+        return len(gone)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -5,11 +5,22 @@ Features:
  - Upload / Drag & Drop multiple PDFs
  - Reorder files (Up/Down), Remove, Clear All
  - Merge (list-order), Split (range), Extract (pages)
- - Add Watermark (single-page PDF)
- - Rotate pages (selected file), Reorder pages inside a PDF
+ - Add Watermark (single-page PDF), stored once as a shared Form XObject
+ - Rotate all or some pages (e.g. 3,7-9), saved as an incremental update
+   that appends only the changed pages; Reorder pages inside a PDF
  - Encrypt (password protect) and Decrypt
- - Compress/Optimize (uses pikepdf if installed)
- - Preview first page (uses pdf2image if installed) or text snippet
+ - "Fast web view" option: every saved PDF is linearized, so page 1 shows
+   before the download finishes (needs pikepdf)
+ - Compress with screen/ebook/print profiles: downsample + re-encode images,
+   merge duplicate streams/fonts, pack object streams; one file or the whole
+   list across a process pool, with before/after sizes (needs pikepdf)
+ - Preview first page (uses pdf2image if installed) or text snippet;
+   rendered in worker processes and cached in `thumbs/` by content hash
+ - Scrollable multi-page strip that renders only visible pages at the chosen zoom
+ - Full-document OCR across a process pool, cached per page in `ocr_cache/`,
+   optionally embedded as an invisible text layer (searchable PDF)
+ - Export the text of whole documents (one or many files) page by page,
+   across a process pool, reporting throughput in pages/sec
  - Show extended metadata (title, author, pages, size, creation date)
  - Recent files, action logging, context menu, dark/light mode
  - Saves recent files to `recent.json` beside script
@@ -20,7 +31,15 @@ Usage: pip install required libs below, then run:
 import sys
 import os
 import json
+import hashlib
 import logging
+import re
+import shutil
+import threading
+import zlib
+from io import BytesIO
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import List
@@ -29,13 +48,14 @@ from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QLabel,
     QListWidget, QFileDialog, QMessageBox, QLineEdit, QHBoxLayout,
     QInputDialog, QMenu, QAction, QSpinBox, QDialog, QDialogButtonBox,
-    QTextEdit
+    QTextEdit, QScrollArea, QTabWidget, QCheckBox
 )
-from PyQt5.QtGui import QFont, QDragEnterEvent, QDropEvent, QPixmap, QIcon
-from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QFont, QDragEnterEvent, QDropEvent, QPixmap, QIcon, QImage, QTextCursor
+from PyQt5.QtCore import Qt, QSize, QObject, pyqtSignal
 
 # PDF libs
-from PyPDF2 import PdfMerger, PdfReader, PdfWriter
+from PyPDF2 import PdfMerger, PdfReader, PdfWriter, Transformation
+from PyPDF2.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject
 try:
     import pikepdf
     PIKEPDF_AVAILABLE = True
@@ -45,6 +65,7 @@ except Exception:
 # Optional preview libs
 try:
     from pdf2image import convert_from_path
+    from PIL import Image
     PDF2IMAGE_AVAILABLE = True
 except Exception:
     PDF2IMAGE_AVAILABLE = False
@@ -61,7 +82,18 @@ except Exception:
 APP_DIR = Path(__file__).resolve().parent
 RECENT_FILE = APP_DIR / "recent.json"
 LOG_FILE = APP_DIR / "pdf_toolkit.log"
+THUMB_DIR = APP_DIR / "thumbs"
+THUMB_WIDTHS = (200, 800)  # resolutions kept in the disk cache
+THUMB_MEMORY_BYTES = 64 * 1024 * 1024
+STRIP_MEMORY_BYTES = 96 * 1024 * 1024  # page strip bitmaps kept around for scrolling back
+STRIP_PREFETCH = 2  # pages rendered ahead of/behind the viewport
+OCR_DIR = APP_DIR / "ocr_cache"
+OCR_DPI = 300
+OCR_CHUNK = 8  # pages rasterized per worker task
+COMPRESS_PROFILES = {"screen": (72, 40), "ebook": (150, 60), "print": (300, 85)}  # image dpi, jpeg quality
 MAX_RECENT = 10
+INGEST_CHUNK = 256  # files header-checked per worker task
+READER_CACHE_BYTES = 256 * 1024 * 1024
 
 # set up logging
 logging.basicConfig(filename=str(LOG_FILE), level=logging.INFO,
@@ -88,20 +120,164 @@ def load_recent() -> List[str]:
         logger.exception("Failed loading recent")
     return []
 
+# parsed documents, keyed by path and validated by (mtime, size) on every lookup
+_reader_cache = OrderedDict()
+
+def get_reader(path):
+    """Return a cached PdfReader for path; re-parses if the file changed."""
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    stamp = (st.st_mtime_ns, st.st_size)
+    hit = _reader_cache.get(key)
+    if hit and hit[0] == stamp:
+        _reader_cache.move_to_end(key)
+        return hit[1]
+    reader = PdfReader(key)
+    _reader_cache[key] = (stamp, reader)
+    _reader_cache.move_to_end(key)
+    # evict least recently used documents beyond the byte budget (file size ~ memory held)
+    while len(_reader_cache) > 1 and sum(v[0][1] for v in _reader_cache.values()) > READER_CACHE_BYTES:
+        _reader_cache.popitem(last=False)
+    return reader
+
+def add_stream(writer, data):
+    stream = DecodedStreamObject()
+    stream.set_data(data)
+    return writer._add_object(stream)
+
+def write_pdf(writer, save_path, linearize=False, password=None):
+    """Write a PdfWriter/PdfMerger to save_path; with linearize, lay it out for
+    fast web view (page 1 and its resources first) using pikepdf. An encrypted
+    writer keeps its encryption."""
+    if not (linearize and PIKEPDF_AVAILABLE):
+        with open(save_path, "wb") as f:
+            writer.write(f)
+        return
+    buf = BytesIO()
+    writer.write(buf)
+    buf.seek(0)
+    with pikepdf.open(buf, password=password or "") as pdf:
+        pdf.save(save_path, linearize=True, encryption=pdf.is_encrypted)
+
+def make_stamper(writer, stamp_page):
+    """Compile stamp_page into one Form XObject; returns a function that makes a
+    writer page draw it. All pages share the XObject and its small wrapper
+    streams instead of each getting a merged copy of the watermark content."""
+    contents = stamp_page.get_contents()
+    form = DecodedStreamObject()
+    form.set_data(contents.get_data() if contents is not None else b"")
+    form = form.flate_encode()
+    form[NameObject("/Type")] = NameObject("/XObject")
+    form[NameObject("/Subtype")] = NameObject("/Form")
+    form[NameObject("/BBox")] = ArrayObject(stamp_page.mediabox)
+    if "/Resources" in stamp_page:
+        form[NameObject("/Resources")] = stamp_page["/Resources"].get_object().clone(writer)
+    form_ref = writer._add_object(form)
+    head = add_stream(writer, b"q\n")
+    tails = {}
+
+    def stamp(page):
+        if "/Resources" not in page:
+            page[NameObject("/Resources")] = DictionaryObject()
+        resources = page["/Resources"].get_object()
+        if "/XObject" not in resources:
+            resources[NameObject("/XObject")] = DictionaryObject()
+        xobjects = resources["/XObject"].get_object()
+        name, n = "/TkWm", 0
+        while name in xobjects and xobjects[name] != form_ref:
+            n += 1
+            name = f"/TkWm{n}"
+        xobjects[NameObject(name)] = form_ref
+        if name not in tails:
+            tails[name] = add_stream(writer, f"\nQ\nq {name} Do Q\n".encode())
+        parts = []
+        if "/Contents" in page:
+            target = page["/Contents"].get_object()
+            parts = list(target) if isinstance(target, ArrayObject) else [page["/Contents"]]
+        page[NameObject("/Contents")] = ArrayObject([head] + parts + [tails[name]])
+    return stamp
+
+def save_incremental(path, save_path, edit):
+    """Append an incremental update instead of rewriting the file.
+
+    ``edit(reader)`` changes objects of a fresh reader in place and returns
+    them; they are appended to ``save_path`` (a copy of ``path``, or ``path``
+    itself) with a new xref section chained to the old one via /Prev.
+    """
+    with open(path, "rb") as fh:
+        reader = PdfReader(fh)
+        if reader.is_encrypted:
+            raise ValueError("Incremental updates of encrypted PDFs are not supported")
+        changed = {(o.indirect_reference.idnum, o.indirect_reference.generation): o for o in edit(reader)}
+        size = fh.seek(0, os.SEEK_END)
+        fh.seek(max(0, size - 2048))
+        prev = int(re.findall(rb"startxref\s+(\d+)", fh.read())[-1])
+        fh.seek(prev)
+        xref_stream = not fh.read(4).startswith(b"xref")
+        numbers = [n for table in reader.xref.values() for n in table] + list(reader.xref_objStm)
+        next_num = max([int(reader.trailer.get("/Size", 0))] + [n + 1 for n in numbers])
+        buf = BytesIO(b"\n")
+        buf.seek(1)
+        entries = {}
+        for (num, gen), obj in sorted(changed.items()):
+            entries[num] = (size + buf.tell(), gen)
+            buf.write(f"{num} {gen} obj\n".encode())
+            obj.write_to_stream(buf, None)
+            buf.write(b"\nendobj\n")
+        xref_at = size + buf.tell()
+        trailer = BytesIO()
+        trailer.write(f"/Prev {prev}".encode())
+        for key in ("/Root", "/Info", "/ID"):
+            if key in reader.trailer:
+                trailer.write(f" {key} ".encode())
+                reader.trailer.raw_get(key).write_to_stream(trailer, None)
+        if xref_stream:  # keep the original's cross-reference style
+            entries[next_num] = (xref_at, 0)
+            nums = sorted(entries)
+            data = zlib.compress(b"".join(b"\x01" + entries[n][0].to_bytes(8, "big") + entries[n][1].to_bytes(2, "big")
+                                          for n in nums))
+            index = " ".join(f"{n} 1" for n in nums)
+            buf.write(f"{next_num} 0 obj\n<< /Type /XRef /W [1 8 2] /Index [{index}] /Size {next_num + 1} ".encode())
+            buf.write(trailer.getvalue())
+            buf.write(f" /Filter /FlateDecode /Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream\nendobj\n")
+        else:
+            buf.write(b"xref\n")
+            for n in sorted(entries):
+                buf.write(f"{n} 1\n{entries[n][0]:010d} {entries[n][1]:05d} n \n".encode())
+            buf.write(f"trailer\n<< /Size {next_num} ".encode() + trailer.getvalue() + b" >>\n")
+        buf.write(f"startxref\n{xref_at}\n%%EOF\n".encode())
+    if os.path.abspath(save_path) != os.path.abspath(path):
+        shutil.copyfile(path, save_path)
+    with open(save_path, "ab") as f:
+        f.write(buf.getvalue())
+    return len(changed)
+
+def parse_page_list(text, count):
+    """Parse "3,7-9" into 0-based page indexes."""
+    pages = []
+    for part in (x.strip() for x in text.split(",") if x.strip()):
+        first, sep, last = part.partition("-")
+        pages.extend(range(int(first) - 1, int(last) if sep else int(first)))
+    if not pages or any(p < 0 or p >= count for p in pages):
+        raise ValueError("One or more pages out of range.")
+    return pages
+
+def human_bytes(s):
+    for unit in ['B','KB','MB','GB']:
+        if s < 1024.0:
+            return f"{s:3.1f} {unit}"
+        s /= 1024.0
+    return f"{s:.1f} TB"
+
 def human_size(path):
     try:
-        s = os.path.getsize(path)
-        for unit in ['B','KB','MB','GB']:
-            if s < 1024.0:
-                return f"{s:3.1f} {unit}"
-            s /= 1024.0
-        return f"{s:.1f} TB"
+        return human_bytes(os.path.getsize(path))
     except Exception:
         return "Unknown"
 
 def read_metadata(path):
     try:
-        r = PdfReader(path)
+        r = get_reader(path)
         info = r.metadata or {}
         pages = len(r.pages)
         meta = {
@@ -116,6 +292,654 @@ def read_metadata(path):
     except Exception:
         return {"pages": "?"}
 
+# --- Thumbnails ---
+def file_digest(path, chunk=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def thumb_path(digest, page, width):
+    return THUMB_DIR / f"{digest}_p{page}_w{width}.png"
+
+def render_thumbnail(path, page, width, digest=None):
+    """Runs in a worker process. Returns (digest, w, h, RGBA bytes); on a disk
+    cache miss the page is rendered once and stored at every THUMB_WIDTHS size."""
+    digest = digest or file_digest(path)
+    cached = thumb_path(digest, page, width)
+    if cached.exists():
+        img = Image.open(cached)
+    else:
+        widths = sorted(set(THUMB_WIDTHS) | {width}, reverse=True)
+        rendered = convert_from_path(path, first_page=page, last_page=page, size=(widths[0], None))[0]
+        THUMB_DIR.mkdir(exist_ok=True)
+        img = rendered
+        for w in widths:
+            scaled = rendered if rendered.width <= w else rendered.resize(
+                (w, max(1, round(rendered.height * w / rendered.width))), Image.LANCZOS)
+            target = thumb_path(digest, page, w)
+            tmp = target.with_suffix(f".{os.getpid()}.tmp")
+            scaled.save(str(tmp), format="PNG")
+            os.replace(tmp, target)  # atomic: concurrent renders never see half a file
+            if w == width:
+                img = scaled
+    img = img.convert("RGBA")
+    return digest, img.width, img.height, img.tobytes("raw", "RGBA")
+
+class ThumbnailLoader(QObject):
+    """Renders page images off the GUI thread and keeps recent ones in memory."""
+    ready = pyqtSignal(str, int, int, QImage)  # path, page, width, image
+    failed = pyqtSignal(str, int, int)
+    _rendered = pyqtSignal(object)  # emitted from the pool callback thread
+    _hashed = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1))
+        self._digests = {}  # (path, mtime, size) -> content hash
+        self._hashing = {}  # stamp -> {key: path} renders waiting for the file's hash
+        self._memory = OrderedDict()  # (stamp, page, width) -> QImage
+        self._memory_bytes = 0
+        self._inflight = {}  # key -> future
+        self._rendered.connect(self._on_rendered)
+        self._hashed.connect(self._on_hashed)
+
+    @staticmethod
+    def _stamp(path):
+        st = os.stat(path)
+        return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+    def request(self, path, page=1, width=800):
+        try:
+            stamp = self._stamp(path)
+        except OSError:
+            self.failed.emit(path, page, width)
+            return
+        key = (stamp, page, width)
+        img = self._memory.get(key)
+        if img is not None:
+            self._memory.move_to_end(key)
+            self.ready.emit(path, page, width, img)
+            return
+        if key in self._inflight or key in self._hashing.get(stamp, ()):
+            return
+        digest = self._digests.get(stamp)
+        if digest is None:
+            # hash the file once, then queue every page asked for meanwhile
+            if stamp not in self._hashing:
+                self._hashing[stamp] = {}
+                future = self._pool.submit(file_digest, path)
+                future.add_done_callback(lambda f, s=stamp: self._hashed.emit((s, f)))
+            self._hashing[stamp][key] = path
+            return
+        self._submit(key, path, digest)
+
+    def _submit(self, key, path, digest):
+        _, page, width = key
+        future = self._pool.submit(render_thumbnail, path, page, width, digest)
+        self._inflight[key] = future
+        future.add_done_callback(lambda f, k=key, p=path: self._rendered.emit((k, p, f)))
+
+    def _on_hashed(self, payload):
+        stamp, future = payload
+        waiting = self._hashing.pop(stamp, {})
+        if future.cancelled():
+            return
+        try:
+            digest = future.result()
+        except Exception:
+            logger.exception("Hashing %s failed", stamp[0])
+            for (_, page, width), path in waiting.items():
+                self.failed.emit(path, page, width)
+            return
+        self._digests[stamp] = digest
+        for key, path in waiting.items():
+            self._submit(key, path, digest)
+
+    def cancel(self, path, pages, width):
+        """Drop queued (not yet started) renders that are no longer needed."""
+        path = os.path.abspath(path)
+        for key, future in list(self._inflight.items()):
+            if key[0][0] == path and key[1] in pages and key[2] == width:
+                future.cancel()
+        for stamp, waiting in self._hashing.items():
+            if stamp[0] == path:
+                for key in [k for k in waiting if k[1] in pages and k[2] == width]:
+                    del waiting[key]
+
+    def _on_rendered(self, payload):
+        key, path, future = payload
+        self._inflight.pop(key, None)
+        if future.cancelled():
+            return
+        stamp, page, width = key
+        try:
+            digest, w, h, data = future.result()
+        except Exception:
+            logger.exception("Thumbnail render failed")
+            self.failed.emit(path, page, width)
+            return
+        self._digests[stamp] = digest
+        img = QImage(data, w, h, 4 * w, QImage.Format_RGBA8888).copy()  # copy: own the buffer
+        self._remember(key, img)
+        self.ready.emit(path, page, width, img)
+
+    def _remember(self, key, img):
+        self._memory[key] = img
+        self._memory_bytes += img.byteCount()
+        while self._memory_bytes > THUMB_MEMORY_BYTES and len(self._memory) > 1:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= old.byteCount()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+class PageStrip(QScrollArea):
+    """Virtualized vertical strip of page images.
+
+    Only labels for pages in (or near) the viewport exist; bitmaps are
+    requested on demand from the ThumbnailLoader and evicted least recently
+    used beyond STRIP_MEMORY_BYTES, so large documents stay memory-bounded.
+    """
+    SPACING = 8
+
+    def __init__(self, loader, parent=None):
+        super().__init__(parent)
+        self.loader = loader
+        self.loader.ready.connect(self._on_ready)
+        self.canvas = QWidget()
+        self.setWidget(self.canvas)
+        self.setWidgetResizable(False)
+        self.path = None
+        self.page_count = 0
+        self.zoom = 200
+        self._labels = {}  # page -> QLabel for visible pages only
+        self._pixmaps = OrderedDict()  # page -> QPixmap
+        self._pixmap_bytes = 0
+        self.verticalScrollBar().valueChanged.connect(self.refresh)
+
+    def row_height(self):
+        return int(self.zoom * 1.3) + self.SPACING  # letter/A4-ish aspect
+
+    def set_document(self, path, page_count):
+        if self.path:
+            self.loader.cancel(self.path, set(range(1, self.page_count + 1)), self.zoom)
+        self.path = path
+        self.page_count = page_count or 0
+        self._reset()
+
+    def set_zoom(self, width):
+        if width != self.zoom:
+            if self.path:
+                self.loader.cancel(self.path, set(range(1, self.page_count + 1)), self.zoom)
+            self.zoom = width
+            self._reset()
+
+    def _reset(self):
+        for label in self._labels.values():
+            label.deleteLater()
+        self._labels.clear()
+        self._pixmaps.clear()
+        self._pixmap_bytes = 0
+        self.canvas.resize(self.zoom + 2 * self.SPACING, max(1, self.page_count * self.row_height()))
+        self.verticalScrollBar().setValue(0)
+        self.refresh()
+
+    def visible_pages(self):
+        top = self.verticalScrollBar().value()
+        rh = self.row_height()
+        first = top // rh + 1
+        last = (top + self.viewport().height()) // rh + 1
+        return max(1, first), min(self.page_count, last)
+
+    def refresh(self):
+        if not self.path or not self.page_count or not self.isVisible():
+            return
+        first, last = self.visible_pages()
+        visible = set(range(first, last + 1))
+        for page in [p for p in self._labels if p not in visible]:
+            self._labels.pop(page).deleteLater()
+        for page in sorted(visible):
+            if page not in self._labels:
+                label = QLabel(f"Page {page}", self.canvas)
+                label.setAlignment(Qt.AlignCenter)
+                label.setStyleSheet("border:1px solid #888;")
+                label.setGeometry(self.SPACING, (page - 1) * self.row_height(), self.zoom, self.row_height() - self.SPACING)
+                label.show()
+                self._labels[page] = label
+            if page in self._pixmaps:
+                self._pixmaps.move_to_end(page)
+                self._labels[page].setPixmap(self._pixmaps[page])
+            else:
+                self.loader.request(self.path, page, self.zoom)
+        # prefetch neighbours; drop queued renders that scrolled far away
+        for page in range(max(1, first - STRIP_PREFETCH), min(self.page_count, last + STRIP_PREFETCH) + 1):
+            if page not in visible and page not in self._pixmaps:
+                self.loader.request(self.path, page, self.zoom)
+        near = set(range(first - STRIP_PREFETCH, last + STRIP_PREFETCH + 1))
+        self.loader.cancel(self.path, set(range(1, self.page_count + 1)) - near, self.zoom)
+
+    def _on_ready(self, path, page, width, image):
+        if path != self.path or width != self.zoom:
+            return
+        pix = QPixmap.fromImage(image)
+        if page in self._pixmaps:
+            self._pixmap_bytes -= self._pix_bytes(self._pixmaps.pop(page))
+        self._pixmaps[page] = pix
+        self._pixmap_bytes += self._pix_bytes(pix)
+        while self._pixmap_bytes > STRIP_MEMORY_BYTES:
+            victim = next((p for p in self._pixmaps if p not in self._labels), None)
+            if victim is None:
+                break  # everything left is on screen
+            self._pixmap_bytes -= self._pix_bytes(self._pixmaps.pop(victim))
+        if page in self._labels:
+            self._labels[page].setPixmap(pix)
+
+    @staticmethod
+    def _pix_bytes(pix):
+        return pix.width() * pix.height() * max(1, pix.depth() // 8)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.refresh()
+
+# --- OCR ---
+def ocr_cache_path(digest, page, suffix):
+    return OCR_DIR / f"{digest}_p{page}{suffix}"
+
+def ocr_chunk(path, digest, first, last, with_layer):
+    """Runs in a worker process: OCR pages first..last, reusing cached pages.
+    Returns [(page, text)]; text-only PDF layers are left in the cache."""
+    OCR_DIR.mkdir(exist_ok=True)
+    def cached(page):
+        return ocr_cache_path(digest, page, ".txt").exists() and (
+            not with_layer or ocr_cache_path(digest, page, ".pdf").exists())
+    missing = [p for p in range(first, last + 1) if not cached(p)]
+    if missing:
+        images = convert_from_path(path, dpi=OCR_DPI, first_page=missing[0], last_page=missing[-1])
+        for page, img in zip(range(missing[0], missing[-1] + 1), images):
+            if page not in missing:
+                continue
+            if with_layer:
+                layer = pytesseract.image_to_pdf_or_hocr(
+                    img, extension="pdf", config=f"--dpi {OCR_DPI} -c textonly_pdf=1")
+                ocr_cache_path(digest, page, ".pdf").write_bytes(layer)
+            text = pytesseract.image_to_string(img, config=f"--dpi {OCR_DPI}")
+            ocr_cache_path(digest, page, ".txt").write_text(text, encoding="utf-8")
+    return [(p, ocr_cache_path(digest, p, ".txt").read_text(encoding="utf-8")) for p in range(first, last + 1)]
+
+def embed_text_layer(path, digest, save_path, linearize=False):
+    """Overlay the cached invisible OCR text onto the original pages."""
+    reader = PdfReader(path)
+    writer = PdfWriter()
+    for n, page in enumerate(reader.pages, 1):
+        out = writer.add_page(page)
+        layer = PdfReader(str(ocr_cache_path(digest, n, ".pdf"))).pages[0]
+        sx = float(out.mediabox.width) / float(layer.mediabox.width)
+        sy = float(out.mediabox.height) / float(layer.mediabox.height)
+        if abs(sx - 1) > 0.001 or abs(sy - 1) > 0.001:
+            layer.add_transformation(Transformation().scale(sx, sy))
+        out.merge_page(layer)
+        out[NameObject("/Contents")] = writer._add_object(out["/Contents"])  # merge_page leaves it direct
+    write_pdf(writer, save_path, linearize)
+
+class OcrJob(QObject):
+    """Full-document OCR; page results stream back as worker chunks finish.
+    With a layer_path the searchable PDF is then written by a pool worker too."""
+    pages_done = pyqtSignal(list)  # [(page, text)]
+    finished = pyqtSignal(dict)    # page -> text
+    embedded = pyqtSignal(str)     # layer_path, once the searchable PDF is written
+    failed = pyqtSignal(str)
+    _chunk = pyqtSignal(object)
+    _embed_done = pyqtSignal(object)
+
+    def __init__(self, path, page_count, layer_path=None, linearize=False, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.page_count = page_count
+        self.layer_path = layer_path
+        self.with_layer = bool(layer_path)
+        self.linearize = linearize
+        self.digest = None
+        self.results = {}
+        self.cancelled = False
+        self._pool = None
+        self._pending = 0
+        self._chunk.connect(self._on_chunk)
+        self._embed_done.connect(self._on_embed_done)
+
+    def start(self):
+        self.digest = file_digest(self.path)
+        self._pool = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1))
+        for first in range(1, self.page_count + 1, OCR_CHUNK):
+            last = min(first + OCR_CHUNK - 1, self.page_count)
+            future = self._pool.submit(ocr_chunk, self.path, self.digest, first, last, self.with_layer)
+            future.add_done_callback(self._chunk.emit)
+            self._pending += 1
+
+    def cancel(self):
+        self.cancelled = True  # chunks already running may still report back; they are ignored
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _on_chunk(self, future):
+        self._pending -= 1
+        if self.cancelled or future.cancelled():
+            return
+        try:
+            pages = future.result()
+        except Exception as e:
+            logger.exception("OCR chunk failed")
+            self.cancel()
+            self.failed.emit(str(e))
+            return
+        self.results.update(pages)
+        self.pages_done.emit(pages)
+        if self._pending == 0:
+            self.finished.emit(self.results)
+            if self.layer_path and not self.cancelled:
+                future = self._pool.submit(embed_text_layer, self.path, self.digest, self.layer_path, self.linearize)
+                future.add_done_callback(self._embed_done.emit)
+            else:
+                self._pool.shutdown(wait=False)
+
+    def _on_embed_done(self, future):
+        self._pool.shutdown(wait=False)
+        if self.cancelled or future.cancelled():
+            return
+        try:
+            future.result()
+        except Exception as e:
+            logger.exception("Embedding OCR layer failed")
+            self.failed.emit(f"Could not write searchable PDF: {e}")
+            return
+        self.embedded.emit(self.layer_path)
+
+# --- Text export ---
+TEXT_CACHE_PAGES = 64  # pages between releases of the reader's object cache
+
+def output_paths(paths, out_dir, name):
+    """One output per input in out_dir, named by ``name`` ({stem}); if two
+    names clash (same stem in different folders) every name is numbered."""
+    names = [name.format(stem=Path(p).stem) for p in paths]
+    if len({n.lower() for n in names}) != len(names):
+        names = [f"{idx}_{n}" for idx, n in enumerate(names, 1)]
+    return [os.path.join(out_dir, n) for n in names]
+
+def export_text(path, save_path):
+    """Runs in a worker process: stream every page's text to save_path
+    (form feed between pages) without holding the document's text in memory."""
+    start = datetime.now()
+    with open(path, "rb") as fh, open(save_path, "w", encoding="utf-8") as out:
+        reader = PdfReader(fh)
+        total = len(reader.pages)
+        for idx in range(total):
+            try:
+                out.write(reader.pages[idx].extract_text() or "")
+            except Exception:
+                pass
+            out.write("\f")
+            if (idx + 1) % TEXT_CACHE_PAGES == 0:
+                reader.resolved_objects.clear()
+    return total, (datetime.now() - start).total_seconds()
+
+class TextExportJob(QObject):
+    file_done = pyqtSignal(str, str, int)  # path, output, pages ("" output on failure)
+    finished = pyqtSignal(int, float)      # total pages, wall seconds
+    _done = pyqtSignal(object)
+
+    def __init__(self, jobs, parent=None):
+        super().__init__(parent)
+        self.jobs = jobs  # [(path, save_path)]
+        self.pages = 0
+        self._pending = 0
+        self._started = None
+        self._pool = None
+        self._done.connect(self._on_done)
+
+    def start(self):
+        self._started = datetime.now()
+        self._pool = ProcessPoolExecutor(max_workers=min(len(self.jobs), os.cpu_count() or 1))
+        for path, save_path in self.jobs:
+            future = self._pool.submit(export_text, path, save_path)
+            future.add_done_callback(lambda f, p=path, o=save_path: self._done.emit((p, o, f)))
+            self._pending += 1
+
+    def _on_done(self, payload):
+        path, save_path, future = payload
+        self._pending -= 1
+        try:
+            pages, _ = future.result()
+            self.pages += pages
+            self.file_done.emit(path, save_path, pages)
+        except Exception:
+            logger.exception("Text export failed for %s", path)
+            self.file_done.emit(path, "", 0)
+        if self._pending == 0:
+            self._pool.shutdown(wait=False)
+            self.finished.emit(self.pages, (datetime.now() - self._started).total_seconds())
+
+def _recompress_image(image, page_inches, dpi, quality):
+    space = image.get("/ColorSpace")
+    if isinstance(space, pikepdf.Array) and len(space) == 2 and space[0] == pikepdf.Name.ICCBased:
+        n = int(space[1].get("/N", 0))
+    else:
+        n = {"/DeviceRGB": 3, "/DeviceGray": 1}.get(str(space))
+    if (n not in (1, 3) or image.get("/ImageMask", False) or int(image.get("/BitsPerComponent", 8)) != 8
+            or any(k in image for k in ("/Decode", "/SMask", "/Mask"))):
+        return 0
+    before = len(image.read_raw_bytes())
+    try:
+        pil = pikepdf.PdfImage(image).as_pil_image().convert("L" if n == 1 else "RGB")
+    except Exception:
+        return 0
+    # an image is never drawn larger than its page, so sizing against the page keeps >= dpi
+    limit = int(page_inches * dpi)
+    if max(pil.size) > limit:
+        scale = limit / max(pil.size)
+        pil = pil.resize((max(1, round(pil.width * scale)), max(1, round(pil.height * scale))), Image.LANCZOS)
+    buf = BytesIO()
+    pil.save(buf, "JPEG", quality=quality, optimize=True)
+    if buf.tell() >= before:
+        return 0
+    image.write(buf.getvalue(), filter=pikepdf.Name.DCTDecode)
+    image.Width, image.Height = pil.size
+    if "/DecodeParms" in image:
+        del image["/DecodeParms"]
+    return before - buf.tell()
+
+def _merge_duplicates(pdf, select):
+    """Repoint references to identical objects at one copy; returns how many were merged."""
+    canonical, replace = {}, {}
+    for obj in pdf.objects:
+        if not select(obj):
+            continue
+        h = hashlib.sha256()
+        if isinstance(obj, pikepdf.Stream):
+            h.update(obj.read_raw_bytes())
+            h.update(pikepdf.Dictionary({k: v for k, v in obj.items() if k != "/Length"}).unparse())
+        else:
+            h.update(obj.unparse(resolved=True))
+        replace_with = canonical.setdefault(h.digest(), obj)
+        if replace_with is not obj:
+            replace[obj.objgen] = replace_with
+
+    def swap(container):
+        items = enumerate(container) if isinstance(container, pikepdf.Array) else container.items()
+        for key, value in list(items):
+            if isinstance(value, pikepdf.Object):
+                if value.is_indirect:
+                    if value.objgen in replace:
+                        container[key] = replace[value.objgen]
+                elif isinstance(value, (pikepdf.Dictionary, pikepdf.Array)):
+                    swap(value)
+    if replace:
+        for obj in pdf.objects:
+            if isinstance(obj, (pikepdf.Dictionary, pikepdf.Array, pikepdf.Stream)):
+                swap(obj)
+    return len(replace)
+
+def compress_document(path, save_path, profile, linearize=False):
+    """Runs in a worker process; returns (bytes before, bytes after, seconds, images, duplicates)."""
+    start = datetime.now()
+    dpi, quality = COMPRESS_PROFILES[profile]
+    images = duplicates = 0
+    with pikepdf.open(path) as pdf:
+        for select in (lambda o: isinstance(o, pikepdf.Stream),
+                       lambda o: isinstance(o, pikepdf.Dictionary) and o.get("/Type") == "/FontDescriptor",
+                       lambda o: isinstance(o, pikepdf.Dictionary) and o.get("/Type") == "/Font"):
+            duplicates += _merge_duplicates(pdf, select)
+        if PDF2IMAGE_AVAILABLE:  # Pillow
+            seen = set()
+            for page in pdf.pages:
+                box = page.mediabox
+                inches = max(abs(float(box[2]) - float(box[0])), abs(float(box[3]) - float(box[1]))) / 72
+                for _, xobj in (page.obj.get("/Resources", {}).get("/XObject") or {}).items():
+                    if xobj.get("/Subtype") == "/Image" and xobj.objgen not in seen:
+                        seen.add(xobj.objgen)
+                        images += _recompress_image(xobj, inches, dpi, quality) > 0
+        pdf.remove_unreferenced_resources()
+        pdf.save(save_path, compress_streams=True, recompress_flate=True, linearize=linearize,
+                 object_stream_mode=pikepdf.ObjectStreamMode.generate)
+    return (os.path.getsize(path), os.path.getsize(save_path), (datetime.now() - start).total_seconds(),
+            images, duplicates)
+
+class CompressJob(QObject):
+    file_done = pyqtSignal(str, str, object)  # path, output, stats tuple (None on failure)
+    finished = pyqtSignal()
+    _done = pyqtSignal(object)
+
+    def __init__(self, jobs, profile, linearize=False, parent=None):
+        super().__init__(parent)
+        self.jobs = jobs  # [(path, save_path)]
+        self.profile = profile
+        self.linearize = linearize
+        self.results = []
+        self._pending = 0
+        self._pool = None
+        self._done.connect(self._on_done)
+
+    def start(self):
+        self._pool = ProcessPoolExecutor(max_workers=min(len(self.jobs), os.cpu_count() or 1))
+        for path, save_path in self.jobs:
+            future = self._pool.submit(compress_document, path, save_path, self.profile, self.linearize)
+            future.add_done_callback(lambda f, p=path, o=save_path: self._done.emit((p, o, f)))
+            self._pending += 1
+
+    def _on_done(self, payload):
+        path, save_path, future = payload
+        self._pending -= 1
+        try:
+            stats = future.result()
+        except Exception:
+            logger.exception("Compress failed for %s", path)
+            stats = None
+        self.results.append((path, save_path, stats))
+        self.file_done.emit(path, save_path, stats)
+        if self._pending == 0:
+            self._pool.shutdown(wait=False)
+            self.finished.emit()
+
+def scan_pdfs(paths):
+    """Yield files given directly and every *.pdf under the folders given (recursively, in name order)."""
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        stack = [path] if os.path.isdir(path) else []
+        while stack:
+            folder = stack.pop()
+            try:
+                with os.scandir(folder) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+            subdirs = []
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):  # symlinked folders could loop
+                        subdirs.append(entry.path)
+                    elif entry.name.lower().endswith(".pdf") and entry.is_file():
+                        yield entry.path
+                except OSError:
+                    continue
+            stack.extend(reversed(subdirs))
+
+def check_pdf_headers(paths):
+    """Runs in a worker process; returns the paths whose first KB holds a %PDF- header."""
+    ok = []
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                if b"%PDF-" in f.read(1024):
+                    ok.append(path)
+        except OSError:
+            pass
+    return ok
+
+class IngestJob(QObject):
+    batch = pyqtSignal(list)         # valid paths, in scan order
+    finished = pyqtSignal(int, int)  # added, rejected
+    _done = pyqtSignal(object)
+
+    def __init__(self, paths, parent=None):
+        super().__init__(parent)
+        self.paths = paths
+        self.added = self.rejected = 0
+        self._results = {}
+        self._next = 0
+        self._chunks = None  # known once the scan has ended
+        self._pool = None
+        self._done.connect(self._on_done)
+
+    def start(self):
+        self._pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        threading.Thread(target=self._scan, daemon=True).start()
+
+    def _scan(self):
+        # walks the folders off the GUI thread; header checks start as soon as a chunk fills
+        chunk, index = [], 0
+        for path in scan_pdfs(self.paths):
+            chunk.append(path)
+            if len(chunk) == INGEST_CHUNK:
+                self._submit(index, chunk)
+                index, chunk = index + 1, []
+        if chunk:
+            self._submit(index, chunk)
+            index += 1
+        self._done.emit((None, index, None))
+
+    def _submit(self, index, chunk):
+        future = self._pool.submit(check_pdf_headers, chunk)
+        future.add_done_callback(lambda f, i=index, n=len(chunk): self._done.emit((i, n, f)))
+
+    def _on_done(self, payload):
+        index, count, future = payload
+        if index is None:
+            self._chunks = count
+        else:
+            try:
+                ok = future.result()
+            except Exception:
+                logger.exception("Header check failed")
+                ok = []
+            self._results[index] = (ok, count)
+        while self._next in self._results:  # hand batches over in scan order
+            ok, count = self._results.pop(self._next)
+            self._next += 1
+            self.added += len(ok)
+            self.rejected += count - len(ok)
+            if ok:
+                self.batch.emit(ok)
+        if self._chunks is not None and self._next == self._chunks:
+            self._pool.shutdown(wait=False)
+            self.finished.emit(self.added, self.rejected)
+
 # --- UI ---
 class PDFToolkitPlus(QWidget):
     def __init__(self):
@@ -157,6 +981,10 @@ class PDFToolkitPlus(QWidget):
         self.upload_btn.clicked.connect(self.upload_files)
         top.addWidget(self.upload_btn)
 
+        self.upload_folder_btn = QPushButton("Upload Folder…")
+        self.upload_folder_btn.clicked.connect(self.upload_folder)
+        top.addWidget(self.upload_folder_btn)
+
         self.recent_btn = QPushButton("Recent")
         self.recent_btn.clicked.connect(self.show_recent)
         top.addWidget(self.recent_btn)
@@ -205,7 +1033,33 @@ class PDFToolkitPlus(QWidget):
         self.preview_label.setFixedSize(480, 300)
         self.preview_label.setStyleSheet("border:1px solid #888;")
         self.preview_label.setAlignment(Qt.AlignCenter)
-        right_col.addWidget(self.preview_label, alignment=Qt.AlignCenter)
+
+        # async page rendering (shared by the first-page preview and the page strip)
+        self.thumbs = ThumbnailLoader(self)
+        self.thumbs.ready.connect(self.on_thumbnail)
+        self.thumbs.failed.connect(self.on_thumbnail_failed)
+
+        pages_tab = QWidget()
+        pages_col = QVBoxLayout()
+        pages_col.setContentsMargins(0, 0, 0, 0)
+        zoom_row = QHBoxLayout()
+        zoom_row.addWidget(QLabel("Zoom (px width):"))
+        self.zoom_spin = QSpinBox()
+        self.zoom_spin.setRange(100, 800)
+        self.zoom_spin.setSingleStep(50)
+        self.zoom_spin.setValue(200)
+        self.zoom_spin.valueChanged.connect(lambda v: self.page_strip.set_zoom(v))
+        zoom_row.addWidget(self.zoom_spin)
+        pages_col.addLayout(zoom_row)
+        self.page_strip = PageStrip(self.thumbs)
+        pages_col.addWidget(self.page_strip)
+        pages_tab.setLayout(pages_col)
+
+        self.preview_tabs = QTabWidget()
+        self.preview_tabs.setFixedSize(500, 340)
+        self.preview_tabs.addTab(self.preview_label, "Preview")
+        self.preview_tabs.addTab(pages_tab, "Pages")
+        right_col.addWidget(self.preview_tabs, alignment=Qt.AlignCenter)
 
         # meta
         self.meta = QLabel("Select a file to view metadata")
@@ -270,7 +1124,7 @@ class PDFToolkitPlus(QWidget):
         ops_row5.addWidget(self.decrypt_btn)
 
         if PIKEPDF_AVAILABLE:
-            self.compress_btn = QPushButton("Compress (pikepdf)")
+            self.compress_btn = QPushButton("Compress…")
             self.compress_btn.clicked.connect(self.compress_pdf)
             ops_row5.addWidget(self.compress_btn)
         else:
@@ -278,6 +1132,10 @@ class PDFToolkitPlus(QWidget):
             self.compress_btn.setEnabled(False)
             ops_row5.addWidget(self.compress_btn)
 
+        self.linearize_check = QCheckBox("Fast web view")
+        self.linearize_check.setToolTip("Linearize every saved PDF so page 1 shows before the download finishes")
+        self.linearize_check.setEnabled(PIKEPDF_AVAILABLE)
+        ops_row5.addWidget(self.linearize_check)
         right_col.addLayout(ops_row5)
 
         # OCR / conversion
@@ -287,9 +1145,17 @@ class PDFToolkitPlus(QWidget):
         self.ocr_btn.setEnabled(TESSERACT_AVAILABLE and PDF2IMAGE_AVAILABLE)
         ops_row6.addWidget(self.ocr_btn)
 
+        self.ocr_all_btn = QPushButton("OCR All Pages")
+        self.ocr_all_btn.clicked.connect(self.ocr_document)
+        ops_row6.addWidget(self.ocr_all_btn)
+
         self.save_text_btn = QPushButton("Save Text (first page)")
         self.save_text_btn.clicked.connect(self.save_first_page_text)
         ops_row6.addWidget(self.save_text_btn)
+
+        self.export_text_btn = QPushButton("Export Text (all pages)")
+        self.export_text_btn.clicked.connect(self.export_text_dialog)
+        ops_row6.addWidget(self.export_text_btn)
         right_col.addLayout(ops_row6)
 
         # log / notes display
@@ -326,27 +1192,33 @@ class PDFToolkitPlus(QWidget):
             event.acceptProposedAction()
 
     def dropEvent(self, event: QDropEvent):
-        added = 0
-        for url in event.mimeData().urls():
-            path = url.toLocalFile()
-            if path and path.lower().endswith(".pdf"):
-                self.file_list.addItem(path)
-                added += 1
-        if added:
-            self.log(f"Added {added} file(s) via drag & drop")
-        self.update_ui_state()
-        self.save_recent_state()
+        # files and whole folders; the header check decides what is a PDF
+        self.add_paths([url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()])
 
     # ---------- file loading ----------
     def upload_files(self):
         files, _ = QFileDialog.getOpenFileNames(self, "Select PDF files", "", "PDF Files (*.pdf)")
-        if files:
-            for f in files:
-                if f.lower().endswith(".pdf"):
-                    self.file_list.addItem(f)
-            self.log(f"Uploaded {len(files)} file(s)")
-        self.update_ui_state()
-        self.save_recent_state()
+        self.add_paths(files)
+
+    def upload_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select a folder of PDFs (searched recursively)")
+        if folder:
+            self.add_paths([folder])
+
+    def add_paths(self, paths):
+        if not paths:
+            return
+        job = IngestJob(list(paths), self)
+        job.batch.connect(self.file_list.addItems)
+        job.batch.connect(lambda _: self.update_ui_state())
+
+        def finished(added, rejected):
+            self.log(f"Added {added} file(s)" + (f", skipped {rejected} without a PDF header" if rejected else ""))
+            self.update_ui_state()
+            self.save_recent_state()
+            job.deleteLater()
+        job.finished.connect(finished)
+        job.start()
 
     def load_recent_list(self):
         recent = load_recent()
@@ -367,6 +1239,7 @@ class PDFToolkitPlus(QWidget):
     def clear_files(self):
         self.file_list.clear()
         self.preview_label.setText("Preview area")
+        self.page_strip.set_document(None, 0)
         self.meta.setText("Select a file to view metadata")
         self.log("Cleared file list")
         self.update_ui_state()
@@ -448,7 +1321,7 @@ class PDFToolkitPlus(QWidget):
         sel = self.file_list.currentItem()
         enabled = sel is not None
         for w in [self.split_btn, self.extract_btn, self.watermark_btn, self.rotate_btn,
-                  self.reorder_pages_btn, self.encrypt_btn, self.decrypt_btn, self.ocr_btn, self.save_text_btn]:
+                  self.reorder_pages_btn, self.encrypt_btn, self.decrypt_btn, self.ocr_btn, self.ocr_all_btn, self.save_text_btn]:
             w.setEnabled(enabled)
         if not PIKEPDF_AVAILABLE:
             self.compress_btn.setEnabled(False)
@@ -461,42 +1334,47 @@ class PDFToolkitPlus(QWidget):
             self.show_meta(path)
         else:
             self.preview_label.setText("Preview area")
+            self.page_strip.set_document(None, 0)
             self.meta.setText("Select a file to view metadata")
         self.update_ui_state()
 
     def show_meta(self, path):
         meta = read_metadata(path)
+        if PDF2IMAGE_AVAILABLE:
+            pages = meta.get("pages")
+            self.page_strip.set_document(path, pages if isinstance(pages, int) else 0)
         size = human_size(path)
         text = f"📄 Pages: {meta.get('pages')}  |  📦 Size: {size}\nTitle: {meta.get('title') or '—'}\nAuthor: {meta.get('author') or '—'}\nProducer: {meta.get('producer') or '—'}"
         self.meta.setText(text)
 
     def show_preview(self, path):
-        # try image preview via pdf2image
+        # image preview is rendered asynchronously (see on_thumbnail)
         self.preview_label.setPixmap(QPixmap())  # clear
         if PDF2IMAGE_AVAILABLE:
-            try:
-                imgs = convert_from_path(path, first_page=1, last_page=1, fmt="png", size=(800, None))
-                if imgs:
-                    pil_img = imgs[0]
-                    # convert PIL to QPixmap
-                    data = pil_img.convert("RGBA").tobytes("raw", "RGBA")
-                    qimg = QPixmap.fromImage(
-                        QPixmap.fromImage)
-                    # simpler: save to temp and load QPixmap (safer)
-                    tmp = APP_DIR / "_preview_tmp.png"
-                    pil_img.save(str(tmp))
-                    pix = QPixmap(str(tmp)).scaled(self.preview_label.width(), self.preview_label.height(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    self.preview_label.setPixmap(pix)
-                    try:
-                        tmp.unlink()
-                    except Exception:
-                        pass
-                    return
-            except Exception:
-                logger.exception("pdf2image preview failed")
+            self.preview_label.setText("Rendering preview…")
+            self.thumbs.request(path, 1, 800)
+            return
+        self.show_text_preview(path)
+
+    def current_path(self):
+        item = self.file_list.currentItem()
+        return item.text() if item else None
+
+    def on_thumbnail(self, path, page, width, image):
+        if path != self.current_path() or page != 1:
+            return  # selection moved on while rendering
+        pix = QPixmap.fromImage(image).scaled(self.preview_label.width(), self.preview_label.height(),
+                                              Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        self.preview_label.setPixmap(pix)
+
+    def on_thumbnail_failed(self, path, page, width):
+        if path == self.current_path() and page == 1:
+            self.show_text_preview(path)
+
+    def show_text_preview(self, path):
         # fallback: extract text snippet
         try:
-            reader = PdfReader(path)
+            reader = get_reader(path)
             first_page = reader.pages[0]
             txt = ""
             try:
@@ -531,7 +1409,7 @@ class PDFToolkitPlus(QWidget):
             merger = PdfMerger()
             for i in range(self.file_list.count()):
                 merger.append(self.file_list.item(i).text())
-            merger.write(save_path)
+            write_pdf(merger, save_path, self.linearize_enabled())
             merger.close()
             self.log(f"Merged {self.file_list.count()} files -> {save_path}")
             QMessageBox.information(self, "Merge", "Merged successfully.")
@@ -557,7 +1435,7 @@ class PDFToolkitPlus(QWidget):
             return
         try:
             a,b = [int(x.strip()) for x in rng.split("-",1)]
-            reader = PdfReader(path)
+            reader = get_reader(path)
             if a < 1 or b > len(reader.pages) or a > b:
                 QMessageBox.warning(self, "Split", "Invalid range for this document.")
                 return
@@ -567,8 +1445,7 @@ class PDFToolkitPlus(QWidget):
             writer = PdfWriter()
             for p in range(a-1, b):
                 writer.add_page(reader.pages[p])
-            with open(save_path, "wb") as f:
-                writer.write(f)
+            write_pdf(writer, save_path, self.linearize_enabled())
             self.log(f"Split {path} pages {a}-{b} -> {save_path}")
             QMessageBox.information(self, "Split", "Split done.")
         except Exception as e:
@@ -585,7 +1462,7 @@ class PDFToolkitPlus(QWidget):
             return
         try:
             pages = [int(x.strip()) for x in txt.split(",") if x.strip()]
-            reader = PdfReader(path)
+            reader = get_reader(path)
             maxp = len(reader.pages)
             if any(p < 1 or p > maxp for p in pages):
                 QMessageBox.warning(self, "Extract", "One or more pages out of range.")
@@ -596,8 +1473,7 @@ class PDFToolkitPlus(QWidget):
             writer = PdfWriter()
             for p in pages:
                 writer.add_page(reader.pages[p-1])
-            with open(save_path, "wb") as f:
-                writer.write(f)
+            write_pdf(writer, save_path, self.linearize_enabled())
             self.log(f"Extracted pages {pages} from {path} -> {save_path}")
             QMessageBox.information(self, "Extract", "Pages extracted.")
         except Exception as e:
@@ -615,14 +1491,14 @@ class PDFToolkitPlus(QWidget):
         if not save_path:
             return
         try:
-            reader = PdfReader(path)
-            watermark = PdfReader(watermark_file).pages[0]
+            reader = get_reader(path)
+            watermark = get_reader(watermark_file).pages[0]
             writer = PdfWriter()
+            stamp = make_stamper(writer, watermark)
             for page in reader.pages:
-                page.merge_page(watermark)
-                writer.add_page(page)
-            with open(save_path, "wb") as f:
-                writer.write(f)
+                # stamp the writer's copy so the cached reader stays pristine
+                stamp(writer.add_page(page))
+            write_pdf(writer, save_path, self.linearize_enabled())
             self.log(f"Applied watermark from {watermark_file} to {path} -> {save_path}")
             QMessageBox.information(self, "Watermark", "Watermark added.")
         except Exception as e:
@@ -637,19 +1513,41 @@ class PDFToolkitPlus(QWidget):
         if not ok:
             return
         angle = int(angle)
-        save_path, _ = QFileDialog.getSaveFileName(self, "Save rotated PDF", "", "PDF Files (*.pdf)")
+        pages_txt, ok = QInputDialog.getText(self, "Rotate", "Pages to rotate (e.g. 3,7-9; blank for all):")
+        if not ok:
+            return
+        linearize = self.linearize_enabled()  # an appended update would undo fast web view
+        in_place = QMessageBox.question(
+            self, "Rotate", "Save into the original file? " +
+            ("It is rewritten for fast web view." if linearize else "Only the rotated pages are appended.") +
+            "\nChoose No to save a copy.") == QMessageBox.Yes
+        save_path = path if in_place else QFileDialog.getSaveFileName(self, "Save rotated PDF", "", "PDF Files (*.pdf)")[0]
         if not save_path:
             return
         try:
-            reader = PdfReader(path)
-            writer = PdfWriter()
-            for p in reader.pages:
-                # rotate clockwise
-                p.rotate(angle)
-                writer.add_page(p)
-            with open(save_path, "wb") as f:
-                writer.write(f)
-            self.log(f"Rotated {path} by {angle} -> {save_path}")
+            count = len(get_reader(path).pages)
+            pages = parse_page_list(pages_txt, count) if pages_txt.strip() else range(count)
+
+            def edit(reader):
+                # rotate clockwise; the fresh reader's page dicts are appended as-is
+                return [reader.pages[i].rotate(angle) for i in pages]
+            rewrite = linearize
+            if not rewrite:
+                try:
+                    save_incremental(path, save_path, edit)
+                except ValueError:
+                    if in_place:
+                        raise
+                    rewrite = True  # encrypted sources cannot be appended to: rewrite the copy instead
+            if rewrite:
+                reader = get_reader(path)
+                writer = PdfWriter()
+                for i, p in enumerate(reader.pages):
+                    copy = writer.add_page(p)
+                    if i in pages:
+                        copy.rotate(angle)
+                write_pdf(writer, save_path, linearize)
+            self.log(f"Rotated pages {pages_txt.strip() or 'all'} of {path} by {angle} -> {save_path}")
             QMessageBox.information(self, "Rotate", "Rotation complete.")
         except Exception as e:
             logger.exception("Rotate failed")
@@ -659,7 +1557,7 @@ class PDFToolkitPlus(QWidget):
         path = self.get_selected_file()
         if not path:
             return
-        reader = PdfReader(path)
+        reader = get_reader(path)
         n = len(reader.pages)
         seq, ok = QInputDialog.getText(self, "Reorder Pages",
                                        f"Enter new page order (1..{n}) separated by commas. Example: 1,3,2")
@@ -676,8 +1574,7 @@ class PDFToolkitPlus(QWidget):
             writer = PdfWriter()
             for idx in order:
                 writer.add_page(reader.pages[idx-1])
-            with open(save_path, "wb") as f:
-                writer.write(f)
+            write_pdf(writer, save_path, self.linearize_enabled())
             self.log(f"Reordered pages of {path} -> {save_path}")
             QMessageBox.information(self, "Reorder", "Reordered saved.")
         except Exception as e:
@@ -695,13 +1592,12 @@ class PDFToolkitPlus(QWidget):
         if not save_path:
             return
         try:
-            reader = PdfReader(path)
+            reader = get_reader(path)
             writer = PdfWriter()
             for p in reader.pages:
                 writer.add_page(p)
             writer.encrypt(pwd)
-            with open(save_path, "wb") as f:
-                writer.write(f)
+            write_pdf(writer, save_path, self.linearize_enabled(), pwd)
             self.log(f"Encrypted {path} -> {save_path}")
             QMessageBox.information(self, "Encrypt", "File encrypted.")
         except Exception as e:
@@ -732,8 +1628,7 @@ class PDFToolkitPlus(QWidget):
             writer = PdfWriter()
             for p in reader.pages:
                 writer.add_page(p)
-            with open(save_path, "wb") as f:
-                writer.write(f)
+            write_pdf(writer, save_path, self.linearize_enabled())
             self.log(f"Decrypted {path} -> {save_path}")
             QMessageBox.information(self, "Decrypt", "Decrypted and saved.")
         except Exception as e:
@@ -744,20 +1639,61 @@ class PDFToolkitPlus(QWidget):
         if not PIKEPDF_AVAILABLE:
             QMessageBox.warning(self, "Compress", "pikepdf not installed.")
             return
-        path = self.get_selected_file()
-        if not path:
+        if self.file_list.count() == 0:
+            QMessageBox.warning(self, "Compress", "No files in list.")
             return
-        save_path, _ = QFileDialog.getSaveFileName(self, "Save compressed PDF", "", "PDF Files (*.pdf')")
-        if not save_path:
+        profile, ok = QInputDialog.getItem(self, "Compress", "Profile (image resolution / quality):",
+                                           [f"{k} ({v[0]} dpi)" for k, v in COMPRESS_PROFILES.items()], 1, False)
+        if not ok:
             return
-        try:
-            with pikepdf.Pdf.open(path) as pdf:
-                pdf.save(save_path, optimize_version=True, linearize=True)
-            self.log(f"Compressed {path} -> {save_path}")
-            QMessageBox.information(self, "Compress", "Compressed (pikepdf).")
-        except Exception as e:
-            logger.exception("Compress failed")
-            QMessageBox.critical(self, "Compress failed", str(e))
+        profile = profile.split()[0]
+        scope, ok = QInputDialog.getItem(self, "Compress", "Compress:", ["Selected file", "All files in list"], 0, False)
+        if not ok:
+            return
+        if scope == "Selected file":
+            path = self.get_selected_file()
+            if not path:
+                return
+            save_path, _ = QFileDialog.getSaveFileName(self, "Save compressed PDF", f"{Path(path).stem}_{profile}.pdf",
+                                                       "PDF Files (*.pdf)")
+            if not save_path:
+                return
+            jobs = [(path, save_path)]
+        else:
+            out_dir = QFileDialog.getExistingDirectory(self, "Select output folder")
+            if not out_dir:
+                return
+            paths = [self.file_list.item(i).text() for i in range(self.file_list.count())]
+            paths = [p for p in paths if os.path.isfile(p)]
+            jobs = list(zip(paths, output_paths(paths, out_dir, f"{{stem}}_{profile}.pdf")))
+        if getattr(self, "compress_job", None) is not None:
+            QMessageBox.information(self, "Compress", "A compression is already running.")
+            return
+        self.compress_job = CompressJob(jobs, profile, self.linearize_enabled(), self)
+        self.compress_job.file_done.connect(self.on_file_compressed)
+        self.compress_job.finished.connect(self.on_compress_finished)
+        self.compress_btn.setEnabled(False)
+        self.log(f"Compressing {len(jobs)} file(s) with the {profile} profile…")
+        self.compress_job.start()
+
+    def on_file_compressed(self, path, save_path, stats):
+        if stats is None:
+            self.log(f"Compress failed: {path}")
+            return
+        before, after, secs, images, duplicates = stats
+        self.log(f"Compressed {path} -> {save_path}: {human_bytes(before)} -> {human_bytes(after)} "
+                 f"in {secs:.1f}s ({images} images re-encoded, {duplicates} duplicates merged)")
+
+    def on_compress_finished(self):
+        done = [r for r in self.compress_job.results if r[2] is not None]
+        before = sum(r[2][0] for r in done)
+        after = sum(r[2][1] for r in done)
+        lines = [f"{Path(p).name}: {human_bytes(st[0])} -> {human_bytes(st[1])} ({st[2]:.1f}s)" if st else
+                 f"{Path(p).name}: failed" for p, _, st in self.compress_job.results]
+        summary = f"{len(done)} of {len(self.compress_job.results)} file(s): {human_bytes(before)} -> {human_bytes(after)}"
+        self.compress_job = None
+        self.compress_btn.setEnabled(PIKEPDF_AVAILABLE)
+        QMessageBox.information(self, "Compress", summary + "\n\n" + "\n".join(lines[:20]))
 
     def ocr_first_page(self):
         if not (TESSERACT_AVAILABLE and PDF2IMAGE_AVAILABLE):
@@ -788,12 +1724,92 @@ class PDFToolkitPlus(QWidget):
             logger.exception("OCR failed")
             QMessageBox.critical(self, "OCR failed", str(e))
 
+    def ocr_document(self):
+        if not (TESSERACT_AVAILABLE and PDF2IMAGE_AVAILABLE):
+            QMessageBox.warning(self, "OCR", "OCR unavailable (install pytesseract and pdf2image).")
+            return
+        path = self.get_selected_file()
+        if not path:
+            return
+        pages = read_metadata(path).get("pages")
+        if not isinstance(pages, int) or pages < 1:
+            QMessageBox.warning(self, "OCR", "Could not read the page count.")
+            return
+        layer_path = None
+        if QMessageBox.question(self, "OCR", "Also save a searchable PDF with the OCR text layer?") == QMessageBox.Yes:
+            layer_path, _ = QFileDialog.getSaveFileName(self, "Save searchable PDF", "", "PDF Files (*.pdf)")
+            if not layer_path:
+                return
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle(f"OCR — {Path(path).name}")
+        v = QVBoxLayout()
+        status = QLabel(f"OCR 0/{pages} pages…")
+        v.addWidget(status)
+        te = QTextEdit()
+        te.setReadOnly(True)
+        v.addWidget(te)
+        btns = QDialogButtonBox(QDialogButtonBox.Save | QDialogButtonBox.Close)
+        btns.button(QDialogButtonBox.Save).setEnabled(False)
+        v.addWidget(btns)
+        dlg.setLayout(v)
+
+        job = OcrJob(path, pages, layer_path, self.linearize_enabled(), parent=dlg)
+        started = datetime.now()
+
+        def on_pages(chunk):
+            for page, text in chunk:
+                te.moveCursor(QTextCursor.End)
+                te.insertPlainText(f"--- Page {page} ---\n{text.strip()}\n\n")
+            status.setText(f"OCR {len(job.results)}/{pages} pages…")
+
+        def on_finished(results):
+            secs = (datetime.now() - started).total_seconds()
+            status.setText(f"OCR done: {pages} pages in {secs:.1f}s")
+            te.setPlainText("\n\n".join(f"--- Page {p} ---\n{results[p].strip()}" for p in sorted(results)))
+            btns.button(QDialogButtonBox.Save).setEnabled(True)
+            if layer_path:
+                status.setText(status.text() + "; writing searchable PDF…")
+            self.log(f"OCR performed on all {pages} pages of {path}")
+
+        def on_embedded(save_path):
+            status.setText(status.text().replace("; writing searchable PDF…", "; searchable PDF saved"))
+            self.log(f"Saved searchable PDF of {path} -> {save_path}")
+
+        def on_failed(err):
+            status.setText("OCR failed")
+            QMessageBox.critical(dlg, "OCR failed", err)
+
+        def save_text():
+            save_path, _ = QFileDialog.getSaveFileName(dlg, "Save OCR text", "", "Text Files (*.txt)")
+            if save_path:
+                with open(save_path, "w", encoding="utf-8") as f:
+                    for p in sorted(job.results):
+                        f.write(job.results[p])
+                        f.write("\f")
+                self.log(f"Saved OCR text of {path} -> {save_path}")
+
+        job.pages_done.connect(on_pages)
+        job.finished.connect(on_finished)
+        job.embedded.connect(on_embedded)
+        job.failed.connect(on_failed)
+        btns.accepted.connect(save_text)
+        btns.rejected.connect(dlg.reject)
+        try:
+            job.start()
+        except Exception as e:
+            logger.exception("OCR failed")
+            QMessageBox.critical(self, "OCR failed", str(e))
+            return
+        dlg.exec_()
+        job.cancel()
+
     def save_first_page_text(self):
         path = self.get_selected_file()
         if not path:
             return
         try:
-            reader = PdfReader(path)
+            reader = get_reader(path)
             text = ""
             try:
                 text = reader.pages[0].extract_text() or ""
@@ -810,7 +1826,50 @@ class PDFToolkitPlus(QWidget):
             logger.exception("Save text failed")
             QMessageBox.critical(self, "Save text failed", str(e))
 
+    def export_text_dialog(self):
+        if self.file_list.count() == 0:
+            QMessageBox.warning(self, "Export Text", "No files in list.")
+            return
+        scope, ok = QInputDialog.getItem(self, "Export Text", "Extract text from:",
+                                         ["Selected file", "All files in list"], 0, False)
+        if not ok:
+            return
+        if scope == "Selected file":
+            path = self.get_selected_file()
+            if not path:
+                return
+            save_path, _ = QFileDialog.getSaveFileName(self, "Save text", f"{Path(path).stem}.txt", "Text Files (*.txt)")
+            if not save_path:
+                return
+            jobs = [(path, save_path)]
+        else:
+            out_dir = QFileDialog.getExistingDirectory(self, "Select output folder")
+            if not out_dir:
+                return
+            paths = [self.file_list.item(i).text() for i in range(self.file_list.count())]
+            paths = [p for p in paths if os.path.isfile(p)]
+            jobs = list(zip(paths, output_paths(paths, out_dir, "{stem}.txt")))
+        if getattr(self, "text_job", None) is not None:
+            QMessageBox.information(self, "Export Text", "A text export is already running.")
+            return
+        self.text_job = TextExportJob(jobs, self)
+        self.text_job.file_done.connect(
+            lambda p, o, n: self.log(f"Extracted {n} pages of text from {p} -> {o}" if o else f"Text export failed: {p}"))
+        self.text_job.finished.connect(self.on_text_export_finished)
+        self.export_text_btn.setEnabled(False)
+        self.log(f"Exporting text from {len(jobs)} file(s)…")
+        self.text_job.start()
+
+    def on_text_export_finished(self, pages, secs):
+        rate = pages / secs if secs else 0
+        self.log(f"Text export done: {pages} pages in {secs:.1f}s ({rate:.0f} pages/sec)")
+        self.text_job = None
+        self.export_text_btn.setEnabled(True)
+
     # ---------- utilities ----------
+    def linearize_enabled(self):
+        return self.linearize_check.isChecked()
+
     def get_selected_file(self):
         it = self.file_list.currentItem()
         if not it:
@@ -822,6 +1881,10 @@ class PDFToolkitPlus(QWidget):
             return None
         return path
 
+    def closeEvent(self, event):
+        self.thumbs.shutdown()
+        super().closeEvent(event)
+
     def toggle_theme(self):
         if self.is_dark:
             self.setStyleSheet(self.light_theme)
@@ -0,0 +1,96 @@
+"""
+Headless batch runner for PDF Toolkit Plus.
+
+Usage:
+    python -m pdf_batch jobs.json [--report report.json] [--stop-on-error]
+    python -m pdf_batch jobs.csv
+
+A JSON manifest is a list of jobs (or {"jobs": [...]}), e.g.
+    [{"op": "merge", "inputs": ["a.pdf", "b.pdf"], "output": "ab.pdf"},
+     {"op": "split", "input": "a.pdf", "range": "1-3", "output": "a_1-3.pdf"},
+     {"op": "extract", "input": "a.pdf", "pages": "1,3,5", "output": "a_x.pdf"},
+     {"op": "watermark", "input": "a.pdf", "watermark": "wm.pdf", "output": "a_wm.pdf"},
+     {"op": "rotate", "input": "a.pdf", "angle": 90, "output": "a_rot.pdf"},
+     {"op": "edit", "input": "a.pdf", "output": "a.pdf", "metadata": {"Title": "Report"}},
+     {"op": "compress", "input": "scan.pdf", "profile": "ebook", "output": "scan_small.pdf"},
+     {"op": "text", "input": "a.pdf", "output": "a.txt"},
+     {"op": "pipeline", "input": "a.pdf", "output": "a_final.pdf",
+      "steps": [{"op": "extract", "pages": "1-3"}, {"op": "rotate", "angle": 90}]},
+     {"op": "text", "inputs": ["a.pdf", "b.pdf"], "output_dir": "texts", "workers": 4}]
+
+A CSV manifest has a header row using the same keys; for merge jobs the
+"inputs" column holds paths separated by ";".
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+
+import pdf_engine
+
+
+def load_manifest(path):
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            jobs = []
+            for row in csv.DictReader(f):
+                job = {k.strip(): v.strip() for k, v in row.items() if k and v and v.strip()}
+                if "inputs" in job:
+                    job["inputs"] = [p.strip() for p in job["inputs"].split(";") if p.strip()]
+                jobs.append(job)
+            return jobs
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("jobs", [])
+    if not isinstance(data, list):
+        raise ValueError("Manifest must be a list of jobs or {\"jobs\": [...]}")
+    return data
+
+
+def run_manifest(jobs, stop_on_error=False, echo=print):
+    results = []
+    for idx, job in enumerate(jobs, 1):
+        result = pdf_engine.run_job(job)
+        results.append(result)
+        if result.ok:
+            rate = result.pages / result.seconds if result.seconds else 0
+            line = (f"[{idx}/{len(jobs)}] {result.op} -> {result.output} "
+                    f"({result.pages} pages, {result.seconds:.2f}s, {rate:.0f} pages/s)")
+            if "bytes_before" in result.stats:
+                line += f" {result.stats['bytes_before'] / 1024:.0f} KB -> {result.stats['bytes_after'] / 1024:.0f} KB"
+            echo(line)
+        else:
+            echo(f"[{idx}/{len(jobs)}] {result.op} FAILED: {result.error}")
+            if stop_on_error:
+                break
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pdf_batch", description="Run PDF operations from a job manifest.")
+    parser.add_argument("manifest", help="JSON or CSV job manifest")
+    parser.add_argument("--report", help="write per-job results to this JSON file")
+    parser.add_argument("--stop-on-error", action="store_true", help="stop at the first failed job")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        jobs = load_manifest(args.manifest)
+    except Exception as e:
+        print(f"Could not read manifest: {e}", file=sys.stderr)
+        return 2
+    results = run_manifest(jobs, args.stop_on_error)
+    failed = sum(1 for r in results if not r.ok)
+    print(f"{len(results) - failed} succeeded, {failed} failed in {time.perf_counter() - started:.2f}s")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump([r.as_dict() for r in results], f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
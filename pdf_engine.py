@@ -0,0 +1,931 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field, asdict
+
+from PyPDF2 import PdfMerger, PdfReader, PdfWriter
+from PyPDF2.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject, StreamObject
+
+import doc_cache
+from compress import DEFAULT_PROFILE, PROFILES, compress_file
+from incremental import IncrementalWriter
+from linearize import linearize_file
+from sources import open_reader, open_source
+from streaming import DEFAULT_MEMORY_LIMIT, StreamingWriter, temp_path
+
+
+class Cancelled(Exception):
+    """Raised from a progress callback to abort an operation."""
+
+
+@dataclass
+class Result:
+    op: str
+    output: str
+    inputs: list = field(default_factory=list)
+    pages: int = 0
+    seconds: float = 0.0
+    ok: bool = True
+    error: str = ""
+    outputs: list = field(default_factory=list)
+    stats: dict = field(default_factory=dict)
+
+    def as_dict(self):
+        return asdict(self)
+
+
+# --- Page spec helpers ---
+def parse_range(page_range, page_count=None):
+    """Parse "start-end" (1-based, inclusive) into a (start, end) tuple."""
+    try:
+        start, end = [int(x.strip()) for x in str(page_range).split("-", 1)]
+    except ValueError:
+        raise ValueError(f"Invalid page range: {page_range!r} (expected e.g. 1-3)")
+    if start < 1 or start > end or (page_count is not None and end > page_count):
+        raise ValueError(f"Page range {start}-{end} is out of bounds")
+    return start, end
+
+
+def parse_ranges(ranges_str, page_count=None):
+    """Parse "1-3, 4-10, 11" into a list of (start, end) tuples."""
+    ranges = []
+    for part in str(ranges_str).split(","):
+        part = part.strip()
+        if part:
+            ranges.append(parse_range(part if "-" in part else f"{part}-{part}", page_count))
+    if not ranges:
+        raise ValueError("No page ranges given")
+    return ranges
+
+
+def parse_pages(pages_str, page_count=None):
+    """Parse "1,3,5" or "3,7-9" into a list of 0-based page indexes."""
+    pages = []
+    try:
+        for part in (x.strip() for x in str(pages_str).split(",")):
+            if not part:
+                continue
+            first, sep, last = part.partition("-")
+            first = int(first)
+            last = int(last) if sep else first
+            if last < first:
+                raise ValueError
+            pages.extend(range(first - 1, last))
+    except ValueError:
+        raise ValueError(f"Invalid page list: {pages_str!r} (expected e.g. 1,3,5 or 3,7-9)")
+    if not pages:
+        raise ValueError("No pages given")
+    if any(p < 0 or (page_count is not None and p >= page_count) for p in pages):
+        raise ValueError("One or more pages out of range")
+    return pages
+
+
+def parse_page_labels(spec):
+    """Parse "1:r, 5:D:A-:1" (page:style[:prefix[:start]]) into page label dicts."""
+    if not isinstance(spec, str):
+        return list(spec)
+    labels = []
+    for part in (p.strip() for p in spec.split(",") if p.strip()):
+        fields = part.split(":")
+        try:
+            label = {"page": int(fields[0]), "style": fields[1] if len(fields) > 1 else "D"}
+            if len(fields) > 2:
+                label["prefix"] = fields[2]
+            if len(fields) > 3:
+                label["start"] = int(fields[3])
+        except ValueError:
+            raise ValueError(f"Invalid page label: {part!r} (expected e.g. 1:r or 5:D:A-:1)")
+        labels.append(label)
+    return labels
+
+
+def parse_bookmarks(spec):
+    """Parse "Intro@1; Results@12" into bookmark dicts."""
+    if not isinstance(spec, str):
+        return list(spec)
+    bookmarks = []
+    for part in (p.strip() for p in spec.split(";") if p.strip()):
+        title, sep, page = part.rpartition("@")
+        if not sep or not title.strip() or not page.strip().isdigit():
+            raise ValueError(f"Invalid bookmark: {part!r} (expected e.g. Intro@1)")
+        bookmarks.append({"title": title.strip(), "page": int(page)})
+    return bookmarks
+
+
+def _report(progress, done, total):
+    if progress is not None:
+        progress(done, total)
+
+
+@contextmanager
+def _readers(*paths):
+    # lock cache entries in a fixed order so concurrent jobs cannot deadlock
+    with ExitStack() as stack:
+        opened = {}
+        for path in sorted(set(map(os.path.abspath, paths))):
+            opened[path] = stack.enter_context(doc_cache.reader(path))
+        yield [opened[os.path.abspath(p)] for p in paths]
+
+
+def _write(writer, output, linearize=False, password=None):
+    # write beside the target and move it into place: sources are memory-mapped,
+    # so truncating a file that is also an input would pull pages from under its readers
+    tmp = temp_path(output)
+    try:
+        with open(tmp, "wb") as f:
+            writer.write(f)
+        doc_cache.invalidate(output)  # close any map of the target before replacing it
+        if linearize:
+            linearize_file(tmp, output, password)
+            os.remove(tmp)
+        else:
+            os.replace(tmp, output)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+# --- Operations ---
+PARALLEL_MERGE_MIN_FILES = 32
+
+
+def merge(files, output, progress=None, workers=1, streaming=False, memory_limit=DEFAULT_MEMORY_LIMIT,
+          dedupe=False, linearize=False):
+    """Merge files in order; with workers > 1 large lists are merged as a tree.
+
+    ``streaming`` writes pages to disk as they are read and releases each
+    source afterwards, keeping memory bounded (bookmarks are not carried over).
+    ``dedupe`` (implies streaming) writes each identical font, image or other
+    resource once across all inputs; the Result's stats report the savings.
+    ``linearize`` (here and in every other writing operation) saves the
+    output for fast web view, so page 1 shows before the download finishes.
+    """
+    if streaming or dedupe:
+        return _streaming_merge(files, output, progress, memory_limit, dedupe, linearize)
+    if workers and workers > 1 and len(files) >= PARALLEL_MERGE_MIN_FILES:
+        return _parallel_merge(files, output, progress, workers, linearize)
+    started = time.perf_counter()
+    merger = PdfMerger()
+    try:
+        for idx, f in enumerate(files, 1):
+            merger.append(f)
+            _report(progress, idx, len(files))
+        pages = len(merger.pages)
+        _write(merger, output, linearize)  # an input may also be the output
+    finally:
+        merger.close()
+    return Result("merge", output, list(files), pages, time.perf_counter() - started)
+
+
+def _streaming_merge(files, output, progress, memory_limit, dedupe=False, linearize=False):
+    started = time.perf_counter()
+    doc_cache.invalidate(output)  # the inputs are read through their own maps, not the cache
+    with StreamingWriter(output, memory_limit, dedupe=dedupe) as writer:
+        for idx, f in enumerate(files, 1):
+            writer.append(f)
+            _report(progress, idx, len(files))
+    if linearize:
+        linearize_file(output)
+    stats = {"duplicates": writer.duplicates, "bytes_saved": writer.bytes_saved} if dedupe else {}
+    return Result("merge", output, list(files), writer.page_count, time.perf_counter() - started, stats=stats)
+
+
+def _merge_chunk(files, output):
+    merger = PdfMerger()
+    try:
+        for f in files:
+            merger.append(f)
+        _write(merger, output)
+    finally:
+        merger.close()
+    return len(files)
+
+
+def _parallel_merge(files, output, progress, workers, linearize=False):
+    # Parse the inputs in worker processes, each writing a partial document,
+    # then stitch the (already normalized) partials in order.
+    started = time.perf_counter()
+    files = list(files)
+    chunk_count = min(len(files), workers * 4)
+    size = -(-len(files) // chunk_count)
+    chunks = [files[i:i + size] for i in range(0, len(files), size)]
+    tmp_dir = tempfile.mkdtemp(prefix=".merge-", dir=os.path.dirname(os.path.abspath(output)))
+    partials = [os.path.join(tmp_dir, f"part{i:05d}.pdf") for i in range(len(chunks))]
+    try:
+        done = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_merge_chunk, chunk, part) for chunk, part in zip(chunks, partials)]
+            try:
+                for future in as_completed(futures):
+                    done += future.result()
+                    _report(progress, done, len(files))
+            except BaseException:
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+        result = merge(partials, output, linearize=linearize)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return Result("merge", output, files, result.pages, time.perf_counter() - started)
+
+
+def split(file, page_range, output, progress=None, linearize=False):
+    started = time.perf_counter()
+    with doc_cache.reader(file) as reader:
+        start, end = parse_range(page_range, len(reader.pages))
+        writer = PdfWriter()
+        for page in range(start - 1, end):
+            writer.add_page(reader.pages[page])
+            _report(progress, page - start + 2, end - start + 1)
+        _write(writer, output, linearize)
+    return Result("split", output, [file], end - start + 1, time.perf_counter() - started)
+
+
+SPLIT_TEMPLATE = "{stem}_{start}-{end}.pdf"
+
+
+def _every_ranges(page_count, every):
+    every = int(every)
+    if every < 1:
+        raise ValueError("Chunk size must be at least 1")
+    return [(start, min(start + every - 1, page_count)) for start in range(1, page_count + 1, every)]
+
+
+def _bookmark_ranges(reader):
+    page_count = len(reader.pages)
+    starts = {}
+    for item in reader.outline:
+        if isinstance(item, list):  # nested children of the previous entry
+            continue
+        try:
+            page = reader.get_destination_page_number(item) + 1
+        except Exception:
+            continue
+        starts.setdefault(page, str(item.title or ""))
+    if not starts:
+        raise ValueError("Document has no usable bookmarks")
+    if 1 not in starts:
+        starts[1] = "front"
+    pages = sorted(starts)
+    bounds = pages[1:] + [page_count + 1]
+    return [(start, end - 1, starts[start]) for start, end in zip(pages, bounds) if start <= page_count]
+
+
+def _safe_name(text):
+    return re.sub(r"[^\w\- ]+", "", text).strip().replace(" ", "_")[:60]
+
+
+def _write_ranges(source, jobs, progress=None, linearize=False):
+    # one parse of the source serves every (start, end, output) job
+    reader = source if isinstance(source, PdfReader) else open_reader(source)
+    written = []
+    for idx, (start, end, output) in enumerate(jobs, 1):
+        writer = PdfWriter()
+        for page in range(start - 1, end):
+            writer.add_page(reader.pages[page])
+        _write(writer, output, linearize)
+        written.append(end - start + 1)
+        _report(progress, idx, len(jobs))
+    return written
+
+
+def split_many(file, output_dir, ranges=None, every=None, bookmarks=False,
+               template=SPLIT_TEMPLATE, progress=None, workers=1, linearize=False):
+    """Split one document into many files from a single parse.
+
+    Boundaries come from ``ranges`` ("1-3,4-9" or a list of tuples), ``every``
+    N pages, or top-level ``bookmarks``. ``template`` may use {stem}, {index},
+    {start}, {end} and {title}. With workers > 1 the outputs are written by
+    worker processes, each parsing the source once.
+    """
+    started = time.perf_counter()
+    parallel = workers and workers > 1
+    with doc_cache.reader(file) as reader:
+        page_count = len(reader.pages)
+        if bookmarks:
+            bounds = _bookmark_ranges(reader)
+        elif every:
+            bounds = [(a, b, "") for a, b in _every_ranges(page_count, every)]
+        elif ranges:
+            if isinstance(ranges, str):
+                ranges = parse_ranges(ranges, page_count)
+            bounds = [(a, b, "") for a, b in (parse_range(f"{a}-{b}", page_count) for a, b in ranges)]
+        else:
+            raise ValueError("Give page ranges, a chunk size or bookmarks to split on")
+
+        stem = os.path.splitext(os.path.basename(file))[0]
+        os.makedirs(output_dir, exist_ok=True)
+        jobs = [(start, end, os.path.join(output_dir, template.format(
+                    stem=stem, index=idx, start=start, end=end, title=_safe_name(title) or idx)))
+                for idx, (start, end, title) in enumerate(bounds, 1)]
+        parallel = parallel and len(jobs) > 1
+        if not parallel:
+            _write_ranges(reader, jobs, progress, linearize)
+
+    if parallel:
+        groups = [jobs[i::workers] for i in range(min(workers, len(jobs)))]
+        done = 0
+        with ProcessPoolExecutor(max_workers=len(groups)) as pool:
+            futures = [pool.submit(_write_ranges, file, group, None, linearize) for group in groups]
+            try:
+                for future in as_completed(futures):
+                    done += len(future.result())
+                    _report(progress, done, len(jobs))
+            except BaseException:
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+
+    outputs = [output for _, _, output in jobs]
+    pages = sum(end - start + 1 for start, end, _ in jobs)
+    return Result("split", output_dir, [file], pages, time.perf_counter() - started, outputs=outputs)
+
+
+def extract(file, pages_str, output, progress=None, linearize=False):
+    started = time.perf_counter()
+    with doc_cache.reader(file) as reader:
+        pages = parse_pages(pages_str, len(reader.pages))
+        writer = PdfWriter()
+        for idx, p in enumerate(pages, 1):
+            writer.add_page(reader.pages[p])
+            _report(progress, idx, len(pages))
+        _write(writer, output, linearize)
+    return Result("extract", output, [file], len(pages), time.perf_counter() - started)
+
+
+def _stream(writer, data, compress=True):
+    stream = DecodedStreamObject()
+    stream.set_data(data)
+    return writer._add_object(stream.flate_encode() if compress else stream)
+
+
+class _SharedStamp:
+    """A watermark page compiled once into a Form XObject.
+
+    Every page references the same XObject and the same two tiny content
+    streams ("q" before the page content, "Q q /Name Do Q" after it), so the
+    watermark's content is stored once instead of being merged into each page.
+    """
+
+    def __init__(self, writer, stamp_page):
+        self.writer = writer
+        contents = stamp_page.get_contents()
+        form = DecodedStreamObject()
+        form.set_data(contents.get_data() if contents is not None else b"")
+        form = form.flate_encode()
+        form[NameObject("/Type")] = NameObject("/XObject")
+        form[NameObject("/Subtype")] = NameObject("/Form")
+        form[NameObject("/BBox")] = ArrayObject(stamp_page.mediabox)
+        if "/Resources" in stamp_page:
+            form[NameObject("/Resources")] = stamp_page["/Resources"].get_object().clone(writer)
+        self.form = writer._add_object(form)
+        self.head = _stream(writer, b"q\n", compress=False)
+        self._tails = {}  # resource name -> shared "draw it" stream
+
+    def _tail(self, name):
+        if name not in self._tails:
+            self._tails[name] = _stream(self.writer, f"\nQ\nq {name} Do Q\n".encode(), compress=False)
+        return self._tails[name]
+
+    def apply(self, page):
+        resources = page.get("/Resources")
+        if resources is None:
+            resources = page[NameObject("/Resources")] = DictionaryObject()
+        resources = resources.get_object()
+        xobjects = resources.get("/XObject")
+        if xobjects is None:
+            xobjects = resources[NameObject("/XObject")] = DictionaryObject()
+        xobjects = xobjects.get_object()
+        name, n = "/TkWm", 0
+        while name in xobjects and xobjects[name] != self.form:
+            n += 1
+            name = f"/TkWm{n}"
+        xobjects[NameObject(name)] = self.form
+
+        contents = page.get("/Contents")
+        parts = []
+        if contents is not None:
+            target = contents.get_object()
+            parts = list(target) if isinstance(target, ArrayObject) else [contents]
+        page[NameObject("/Contents")] = ArrayObject([self.head] + parts + [self._tail(name)])
+
+
+def _merge_stamp(writer, page, stamp_page):
+    page.merge_page(stamp_page)
+    # PyPDF2 leaves the merged content as a direct stream, which PDF does not
+    # allow (and qpdf refuses to read); register it as an object of its own
+    contents = page.get("/Contents")
+    if isinstance(contents, StreamObject):
+        page[NameObject("/Contents")] = writer._add_object(contents)
+
+
+def watermark(file, watermark_file, output, progress=None, shared=True, linearize=False):
+    """Stamp page 1 of watermark_file onto every page.
+
+    ``shared`` draws one Form XObject from every page (small, fast output);
+    ``shared=False`` merges the watermark content into each page.
+    """
+    started = time.perf_counter()
+    with _readers(file, watermark_file) as (reader, stamp_reader):
+        stamp = stamp_reader.pages[0]
+        writer = PdfWriter()
+        shared_stamp = _SharedStamp(writer, stamp) if shared else None
+        total = len(reader.pages)
+        for idx, page in enumerate(reader.pages, 1):
+            out = writer.add_page(page)
+            if shared_stamp is not None:
+                shared_stamp.apply(out)
+            else:
+                _merge_stamp(writer, out, stamp)
+            _report(progress, idx, total)
+        _write(writer, output, linearize)
+    return Result("watermark", output, [file, watermark_file], total, time.perf_counter() - started)
+
+
+def rotate(file, angle, output, progress=None, pages=None, incremental=False, linearize=False):
+    """Rotate every page, or only ``pages`` (e.g. "3,7-9").
+
+    With ``incremental`` only the changed page dictionaries are appended to a
+    copy of the file (or to the file itself when ``output`` is ``file``).
+    An appended update cannot keep the file linearized, so the two exclude
+    each other.
+    """
+    started = time.perf_counter()
+    angle = int(angle)
+    if angle % 90:
+        raise ValueError(f"Rotation must be a multiple of 90, got {angle}")
+    if incremental and linearize:
+        raise ValueError("An incremental update cannot be linearized; save a rewritten copy instead")
+    if incremental:
+        with IncrementalWriter(file) as update:
+            total = update.page_count
+            selected = parse_pages(pages, total) if pages else range(total)
+            for idx, page_index in enumerate(selected, 1):
+                page = update.page(page_index)
+                page.rotate(angle)
+                update.update(page)
+                _report(progress, idx, len(selected))
+            doc_cache.invalidate(output)
+            update.write(output)
+        return Result("rotate", output, [file], len(selected), time.perf_counter() - started)
+    with doc_cache.reader(file) as reader:
+        writer = PdfWriter()
+        total = len(reader.pages)
+        selected = set(parse_pages(pages, total)) if pages else None
+        for idx, page in enumerate(reader.pages, 1):
+            copy = writer.add_page(page)
+            if selected is None or idx - 1 in selected:
+                copy.rotate(angle)
+            _report(progress, idx, total)
+        _write(writer, output, linearize)
+    return Result("rotate", output, [file], total, time.perf_counter() - started)
+
+
+def edit_document(file, output, metadata=None, page_labels=None, bookmarks=None, progress=None):
+    """Change document info, page labels and/or add bookmarks as an incremental update.
+
+    ``output`` may be ``file`` itself; otherwise the source is cloned first.
+    ``metadata`` maps info keys (e.g. "Title", "Author") to values, or None to remove them.
+    """
+    started = time.perf_counter()
+    if metadata is None and page_labels is None and not bookmarks:
+        raise ValueError("Nothing to change")
+    with IncrementalWriter(file) as update:
+        if metadata is not None:
+            update.set_metadata(metadata)
+        if page_labels is not None:
+            update.set_page_labels(parse_page_labels(page_labels))
+        bookmarks = parse_bookmarks(bookmarks or [])
+        for idx, bookmark in enumerate(bookmarks, 1):
+            update.add_bookmark(bookmark["title"], bookmark["page"])
+            _report(progress, idx, len(bookmarks))
+        doc_cache.invalidate(output)
+        update.write(output)
+    return Result("edit", output, [file], 0, time.perf_counter() - started)
+
+
+def encrypt(file, password, output, progress=None, linearize=False):
+    started = time.perf_counter()
+    if not password:
+        raise ValueError("A password is required")
+    with doc_cache.reader(file) as reader:
+        writer = PdfWriter()
+        total = len(reader.pages)
+        for idx, page in enumerate(reader.pages, 1):
+            writer.add_page(page)
+            _report(progress, idx, total)
+        writer.encrypt(password)
+        _write(writer, output, linearize, password)
+    return Result("encrypt", output, [file], total, time.perf_counter() - started)
+
+
+def decrypt(file, password, output, progress=None, linearize=False):
+    started = time.perf_counter()
+    reader = open_reader(file)  # decrypting mutates the reader, so never use the shared cache
+    if not reader.is_encrypted:
+        raise ValueError("File is not encrypted")
+    if not reader.decrypt(password or ""):
+        raise ValueError("Wrong password")
+    writer = PdfWriter()
+    total = len(reader.pages)
+    for idx, page in enumerate(reader.pages, 1):
+        writer.add_page(page)
+        _report(progress, idx, total)
+    _write(writer, output, linearize)
+    return Result("decrypt", output, [file], total, time.perf_counter() - started)
+
+
+TEXT_CACHE_PAGES = 64  # pages between releases of the reader's object cache
+
+
+def extract_text(file, output, progress=None):
+    """Stream the text of every page to ``output`` (pages separated by form feeds)."""
+    started = time.perf_counter()
+    with open_source(file) as fh, open(output, "w", encoding="utf-8") as out:
+        reader = PdfReader(fh)
+        total = len(reader.pages)
+        for idx in range(total):
+            try:
+                text = reader.pages[idx].extract_text() or ""
+            except Exception:
+                text = ""
+            out.write(text)
+            out.write("\f")
+            if (idx + 1) % TEXT_CACHE_PAGES == 0:
+                reader.resolved_objects.clear()
+            _report(progress, idx + 1, total)
+    return Result("text", output, [file], total, time.perf_counter() - started)
+
+
+def _text_worker(file, output):
+    result = extract_text(file, output)
+    return result.pages
+
+
+TEXT_TEMPLATE = "{stem}.txt"
+
+
+def extract_text_many(files, output_dir, progress=None, workers=None, template=TEXT_TEMPLATE):
+    """Extract the text of many files into output_dir across a process pool.
+
+    ``template`` may use {stem} and {index}.
+    """
+    started = time.perf_counter()
+    files = list(files)
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = [os.path.join(output_dir, template.format(stem=os.path.splitext(os.path.basename(f))[0], index=idx))
+               for idx, f in enumerate(files, 1)]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError("Output template produces duplicate file names; add {index}")
+    pages, errors, done = 0, [], 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {pool.submit(_text_worker, f, out): f for f, out in zip(files, outputs)}
+        try:
+            for future in as_completed(futures):
+                try:
+                    pages += future.result()
+                except Exception as e:
+                    errors.append(f"{futures[future]}: {e}")
+                done += 1
+                _report(progress, done, len(files))
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+    return Result("text", output_dir, files, pages, time.perf_counter() - started, ok=not errors,
+                  error="; ".join(errors), outputs=outputs)
+
+
+def compress(file, output, profile=DEFAULT_PROFILE, progress=None, linearize=False):
+    """Downsample images, merge duplicate resources and pack object streams (needs pikepdf)."""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile {profile!r} (use one of {', '.join(PROFILES)})")
+    stats = compress_file(file, output, profile, linearize=linearize)
+    _report(progress, 1, 1)
+    return Result("compress", output, [file], stats["pages"], stats["seconds"], stats=stats)
+
+
+COMPRESS_TEMPLATE = "{stem}_{profile}.pdf"
+
+
+def _compress_file(file, output, profile, linearize=False):
+    try:
+        return compress(file, output, profile, linearize=linearize)
+    except Exception as e:
+        return Result("compress", output, [file], ok=False, error=f"{type(e).__name__}: {e}")
+
+
+def compress_many(files, output_dir, profile=DEFAULT_PROFILE, template=COMPRESS_TEMPLATE,
+                  progress=None, workers=None, linearize=False):
+    """Compress every file into output_dir across a process pool; returns one Result per file."""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile {profile!r} (use one of {', '.join(PROFILES)})")
+    files = list(files)
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = [os.path.join(output_dir, template.format(stem=os.path.splitext(os.path.basename(f))[0],
+                                                        index=idx, profile=profile))
+               for idx, f in enumerate(files, 1)]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError("Output template produces duplicate file names; add {index}")
+    for out in outputs:
+        doc_cache.invalidate(out)  # the workers cannot reach this process's cache
+    results = [None] * len(files)
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {pool.submit(_compress_file, f, out, profile, linearize): idx
+                   for idx, (f, out) in enumerate(zip(files, outputs))}
+        try:
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                done += 1
+                _report(progress, done, len(files))
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+    return results
+
+
+# --- Pipelines ---
+PIPELINE_OPS = ("decrypt", "split", "extract", "rotate", "watermark", "encrypt")
+
+
+class Pipeline:
+    """A chain of page-level steps run with one parse and one write.
+
+    Steps are dicts like the manifest jobs, e.g.
+        Pipeline().add("extract", pages="1-3,7").add("rotate", angle=90) \
+                  .add("watermark", watermark="wm.pdf").add("encrypt", password="x")
+    Page selections (split/extract) pick from the pages selected so far;
+    rotate/watermark apply to every selected page. decrypt may only be the
+    first step and encrypt only the last.
+    """
+
+    def __init__(self, steps=()):
+        self.steps = [dict(step) for step in steps]
+
+    def add(self, op, **params):
+        self.steps.append(dict(params, op=op))
+        return self
+
+    def validate(self):
+        if not self.steps:
+            raise ValueError("Pipeline has no steps")
+        for idx, step in enumerate(self.steps):
+            op = step.get("op")
+            if op not in PIPELINE_OPS:
+                raise ValueError(f"Unknown pipeline step: {op!r}")
+            if op == "decrypt" and idx != 0:
+                raise ValueError("decrypt must be the first step")
+            if op == "encrypt" and idx != len(self.steps) - 1:
+                raise ValueError("encrypt must be the last step")
+
+    @property
+    def name(self):
+        return "-".join(step["op"] for step in self.steps)
+
+    def _select(self, page_count):
+        selected = list(range(page_count))
+        for step in self.steps:
+            if step["op"] == "split":
+                start, end = parse_range(step["range"], len(selected))
+                selected = selected[start - 1:end]
+            elif step["op"] == "extract":
+                selected = [selected[i] for i in parse_pages(step["pages"], len(selected))]
+        return selected
+
+    def run(self, file, output, progress=None, linearize=False):
+        self.validate()
+        started = time.perf_counter()
+        # the input and every watermark are locked in one _readers call, so two
+        # pipelines sharing files always take the cache entries in the same order
+        marks = [step["watermark"] for step in self.steps if step["op"] == "watermark"]
+        first = self.steps[0]
+        if first["op"] == "decrypt":
+            reader = open_reader(file)  # decrypting mutates the reader, so never use the shared cache
+            if reader.is_encrypted and not reader.decrypt(first.get("password", "")):
+                raise ValueError("Wrong password")
+            with _readers(*marks) as stamps:
+                return self._run(reader, stamps, file, output, progress, started, linearize)
+        with _readers(file, *marks) as readers:
+            return self._run(readers[0], readers[1:], file, output, progress, started, linearize)
+
+    def _run(self, reader, stamps, file, output, progress, started, linearize):
+        writer = PdfWriter()
+        transforms = []
+        stamps = iter(stamps)  # one reader per watermark step, in step order
+        for step in self.steps:
+            if step["op"] == "rotate":
+                angle = int(step["angle"])
+                if angle % 90:
+                    raise ValueError(f"Rotation must be a multiple of 90, got {angle}")
+                transforms.append(lambda page, a=angle: page.rotate(a))
+            elif step["op"] == "watermark":
+                stamp_page = next(stamps).pages[0]
+                if _flag(step.get("shared", True)):
+                    transforms.append(_SharedStamp(writer, stamp_page).apply)
+                else:
+                    transforms.append(lambda page, st=stamp_page: _merge_stamp(writer, page, st))
+
+        selected = self._select(len(reader.pages))
+        for idx, page_index in enumerate(selected, 1):
+            page = writer.add_page(reader.pages[page_index])
+            for transform in transforms:
+                transform(page)
+            _report(progress, idx, len(selected))
+        password = None
+        if self.steps[-1]["op"] == "encrypt":
+            password = self.steps[-1].get("password")
+            if not password:
+                raise ValueError("A password is required")
+            writer.encrypt(password)
+        _write(writer, output, linearize, password)
+        return Result(self.name, output, [file], len(selected), time.perf_counter() - started)
+
+
+# --- Batch ---
+BATCH_TEMPLATE = "{stem}_{ops}.pdf"
+
+
+def apply_steps(file, steps, output, linearize=False):
+    """Apply a chain of per-file steps, e.g. [{"op": "rotate", "angle": 90}], in one pass."""
+    return Pipeline(steps).run(file, output, linearize=linearize)
+
+
+def _batch_file(file, steps, output, linearize=False):
+    try:
+        return apply_steps(file, steps, output, linearize)
+    except Exception as e:
+        return Result("+".join(s.get("op", "?") for s in steps), output, [file], ok=False,
+                      error=f"{type(e).__name__}: {e}")
+
+
+def batch(files, steps, output_dir, template=BATCH_TEMPLATE, progress=None, workers=None, linearize=False):
+    """Apply ``steps`` to every file across a process pool; returns one Result per file.
+
+    ``template`` may use {stem}, {index} and {ops}.
+    """
+    if not steps:
+        raise ValueError("No batch steps given")
+    files = list(files)
+    os.makedirs(output_dir, exist_ok=True)
+    ops = "-".join(step.get("op", "?") for step in steps)
+    outputs = [os.path.join(output_dir, template.format(stem=os.path.splitext(os.path.basename(f))[0],
+                                                        index=idx, ops=ops))
+               for idx, f in enumerate(files, 1)]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError("Output template produces duplicate file names; add {index}")
+    results = [None] * len(files)
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {pool.submit(_batch_file, f, steps, out, linearize): idx
+                   for idx, (f, out) in enumerate(zip(files, outputs))}
+        try:
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                done += 1
+                _report(progress, done, len(files))
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+    return results
+
+
+def write_report(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([r.as_dict() for r in results], f, indent=2)
+
+
+# --- Manifest jobs ---
+def _flag(value):
+    """A boolean manifest field: JSON true/1 or a CSV "true"/"1"/"yes"; anything else is false."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return value is True or value == 1
+
+
+def _linearize(job):
+    return _flag(job.get("linearize", False))
+
+
+def _job_merge(job):
+    return merge(job["inputs"], job["output"], workers=int(job.get("workers", 1)),
+                 streaming=_flag(job.get("streaming", False)),
+                 memory_limit=int(job.get("memory_limit", DEFAULT_MEMORY_LIMIT)),
+                 dedupe=_flag(job.get("dedupe", False)), linearize=_linearize(job))
+
+
+def _job_split(job):
+    return split(job["input"], job["range"], job["output"], linearize=_linearize(job))
+
+
+def _job_split_many(job):
+    return split_many(job["input"], job["output_dir"], ranges=job.get("ranges"), every=job.get("every"),
+                      bookmarks=_flag(job.get("bookmarks", False)),
+                      template=job.get("template", SPLIT_TEMPLATE), workers=int(job.get("workers", 1)),
+                      linearize=_linearize(job))
+
+
+def _job_extract(job):
+    return extract(job["input"], job["pages"], job["output"], linearize=_linearize(job))
+
+
+def _job_watermark(job):
+    return watermark(job["input"], job["watermark"], job["output"], shared=_flag(job.get("shared", True)),
+                     linearize=_linearize(job))
+
+
+def _job_text(job):
+    if "inputs" in job:
+        return extract_text_many(job["inputs"], job["output_dir"], workers=job.get("workers") and int(job["workers"]),
+                                 template=job.get("template", TEXT_TEMPLATE))
+    return extract_text(job["input"], job["output"])
+
+
+def _job_pipeline(job):
+    return Pipeline(job["steps"]).run(job["input"], job["output"], linearize=_linearize(job))
+
+
+def _job_batch(job):
+    started = time.perf_counter()
+    results = batch(job["inputs"], job["steps"], job["output_dir"], job.get("template", BATCH_TEMPLATE),
+                    workers=job.get("workers") and int(job["workers"]), linearize=_linearize(job))
+    write_report(results, os.path.join(job["output_dir"], "batch_report.json"))
+    failed = [f"{r.inputs[0]}: {r.error}" for r in results if not r.ok]
+    return Result("batch", job["output_dir"], list(job["inputs"]), sum(r.pages for r in results),
+                  time.perf_counter() - started, ok=not failed, error="; ".join(failed),
+                  outputs=[r.output for r in results if r.ok])
+
+
+def _job_compress(job):
+    profile = job.get("profile", DEFAULT_PROFILE)
+    if "inputs" not in job:
+        return compress(job["input"], job["output"], profile, linearize=_linearize(job))
+    started = time.perf_counter()
+    results = compress_many(job["inputs"], job["output_dir"], profile, job.get("template", COMPRESS_TEMPLATE),
+                            workers=job.get("workers") and int(job["workers"]), linearize=_linearize(job))
+    write_report(results, os.path.join(job["output_dir"], "compress_report.json"))
+    failed = [f"{r.inputs[0]}: {r.error}" for r in results if not r.ok]
+    done = [r for r in results if r.ok]
+    stats = {"bytes_before": sum(r.stats["bytes_before"] for r in done),
+             "bytes_after": sum(r.stats["bytes_after"] for r in done)}
+    return Result("compress", job["output_dir"], list(job["inputs"]), sum(r.pages for r in results),
+                  time.perf_counter() - started, ok=not failed, error="; ".join(failed),
+                  outputs=[r.output for r in done], stats=stats)
+
+
+def _job_encrypt(job):
+    return encrypt(job["input"], job["password"], job["output"], linearize=_linearize(job))
+
+
+def _job_decrypt(job):
+    return decrypt(job["input"], job.get("password", ""), job["output"], linearize=_linearize(job))
+
+
+def _job_edit(job):
+    return edit_document(job["input"], job["output"], metadata=job.get("metadata"),
+                         page_labels=job.get("page_labels"), bookmarks=job.get("bookmarks"))
+
+
+def _job_rotate(job):
+    return rotate(job["input"], job["angle"], job["output"], pages=job.get("pages"),
+                  incremental=_flag(job.get("incremental", False)), linearize=_linearize(job))
+
+
+OPERATIONS = {
+    "merge": _job_merge,
+    "split": _job_split,
+    "split-many": _job_split_many,
+    "extract": _job_extract,
+    "watermark": _job_watermark,
+    "rotate": _job_rotate,
+    "text": _job_text,
+    "encrypt": _job_encrypt,
+    "decrypt": _job_decrypt,
+    "batch": _job_batch,
+    "pipeline": _job_pipeline,
+    "edit": _job_edit,
+    "compress": _job_compress,
+}
+
+
+def run_job(job):
+    """Run one manifest job (a dict with an "op" key); never raises."""
+    op = job.get("op", "")
+    inputs = job.get("inputs") or [job.get("input", "")]
+    try:
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {op!r}")
+        output = job.get("output")
+        if job.get("output_dir"):
+            os.makedirs(job["output_dir"], exist_ok=True)
+        elif output:
+            os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        else:
+            raise ValueError("Missing output path")
+        return OPERATIONS[op](job)
+    except Exception as e:
+        return Result(op, job.get("output") or job.get("output_dir", ""), inputs, ok=False,
+                      error=f"{type(e).__name__}: {e}")
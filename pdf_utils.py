@@ -1,82 +1,271 @@
-import os
-from PyPDF2 import PdfMerger, PdfReader, PdfWriter
-from PyQt5.QtWidgets import QFileDialog, QMessageBox
-
-
-class PDFUtils:
-    def merge(self, files):
-        save_path, _ = QFileDialog.getSaveFileName(None, "Save Merged PDF", "", "PDF Files (*.pdf)")
-        if save_path:
-            try:
-                merger = PdfMerger()
-                for f in files:
-                    merger.append(f)
-                merger.write(save_path)
-                merger.close()
-                QMessageBox.information(None, "Success", "PDFs merged successfully!")
-            except Exception as e:
-                QMessageBox.warning(None, "Error", str(e))
-
-    def split(self, file, page_range):
-        save_path, _ = QFileDialog.getSaveFileName(None, "Save Split PDF", "", "PDF Files (*.pdf)")
-        if save_path:
-            try:
-                reader = PdfReader(file)
-                writer = PdfWriter()
-                start, end = [int(x) for x in page_range.split("-")]
-                for page in range(start - 1, end):
-                    writer.add_page(reader.pages[page])
-                with open(save_path, "wb") as output:
-                    writer.write(output)
-                QMessageBox.information(None, "Success", "PDF split successfully!")
-            except Exception as e:
-                QMessageBox.warning(None, "Error", str(e))
-
-    def extract(self, file, pages_str):
-        save_path, _ = QFileDialog.getSaveFileName(None, "Save Extracted PDF", "", "PDF Files (*.pdf)")
-        if save_path:
-            try:
-                reader = PdfReader(file)
-                writer = PdfWriter()
-                pages = [int(x.strip()) - 1 for x in pages_str.split(",")]
-                for p in pages:
-                    writer.add_page(reader.pages[p])
-                with open(save_path, "wb") as output:
-                    writer.write(output)
-                QMessageBox.information(None, "Success", "Pages extracted successfully!")
-            except Exception as e:
-                QMessageBox.warning(None, "Error", str(e))
-
-    def watermark(self, file):
-        watermark_file, _ = QFileDialog.getOpenFileName(None, "Select Watermark PDF", "", "PDF Files (*.pdf)")
-        if not watermark_file:
-            return
-        save_path, _ = QFileDialog.getSaveFileName(None, "Save Watermarked PDF", "", "PDF Files (*.pdf)")
-        if save_path:
-            try:
-                reader = PdfReader(file)
-                watermark = PdfReader(watermark_file).pages[0]
-                writer = PdfWriter()
-                for page in reader.pages:
-                    page.merge_page(watermark)
-                    writer.add_page(page)
-                with open(save_path, "wb") as output:
-                    writer.write(output)
-                QMessageBox.information(None, "Success", "Watermark added successfully!")
-            except Exception as e:
-                QMessageBox.warning(None, "Error", str(e))
-
-    def rotate(self, file, angle):
-        save_path, _ = QFileDialog.getSaveFileName(None, "Save Rotated PDF", "", "PDF Files (*.pdf)")
-        if save_path:
-            try:
-                reader = PdfReader(file)
-                writer = PdfWriter()
-                for page in reader.pages:
-                    page.rotate(angle)
-                    writer.add_page(page)
-                with open(save_path, "wb") as output:
-                    writer.write(output)
-                QMessageBox.information(None, "Success", f"PDF rotated {angle}° successfully!")
-            except Exception as e:
-                QMessageBox.warning(None, "Error", str(e))
+import os
+
+from PyQt5.QtWidgets import QFileDialog, QInputDialog, QLineEdit, QMessageBox
+
+import doc_cache
+import pdf_engine
+
+# inputs larger than this in total are merged in bounded memory
+STREAMING_MERGE_MIN_BYTES = 512 * 1024 * 1024
+
+
+class PDFUtils:
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.linearize = False  # save outputs for fast web view
+
+    def _run(self, label, func, *args, success, **kwargs):
+        return self.jobs.submit(
+            label, func, *args,
+            on_finished=lambda _: QMessageBox.information(None, "Success", success),
+            on_failed=lambda err: QMessageBox.warning(None, "Error", f"{label} failed: {err}"),
+            **kwargs,
+        )
+
+    def merge(self, files, dedupe=False):
+        save_path, _ = QFileDialog.getSaveFileName(None, "Save Merged PDF", "", "PDF Files (*.pdf)")
+        if not save_path:
+            return
+        streaming = sum(os.path.getsize(f) for f in files if os.path.isfile(f)) >= STREAMING_MERGE_MIN_BYTES
+        if not dedupe:
+            self._run(f"Merge {len(files)} files", pdf_engine.merge, list(files), save_path,
+                      workers=os.cpu_count(), streaming=streaming, linearize=self.linearize,
+                      success="PDFs merged successfully!")
+            return
+
+        def finished(result):
+            QMessageBox.information(
+                None, "Success",
+                f"PDFs merged successfully!\n{result.stats['duplicates']} shared resources written once, "
+                f"saving {result.stats['bytes_saved'] / 1024:.0f} KB.")
+
+        self.jobs.submit(f"Merge {len(files)} files (dedupe)", pdf_engine.merge, list(files), save_path,
+                         dedupe=True, linearize=self.linearize, on_finished=finished,
+                         on_failed=lambda err: QMessageBox.warning(None, "Error", f"Merge {len(files)} files failed: {err}"))
+
+    def split(self, file, page_range):
+        spec = page_range.strip().lower()
+        if "," in spec or spec.startswith(("every", "bookmarks")):
+            return self.split_many(file, spec)
+        save_path, _ = QFileDialog.getSaveFileName(None, "Save Split PDF", "", "PDF Files (*.pdf)")
+        if save_path:
+            self._run(f"Split {page_range}", pdf_engine.split, file, page_range, save_path,
+                      linearize=self.linearize, success="PDF split successfully!")
+
+    def split_many(self, file, spec):
+        output_dir = QFileDialog.getExistingDirectory(None, "Select Output Folder for Split Files")
+        if not output_dir:
+            return
+        kwargs = {"workers": os.cpu_count(), "linearize": self.linearize}
+        if spec.startswith("every"):
+            kwargs["every"] = spec[len("every"):].strip()
+        elif spec.startswith("bookmarks"):
+            kwargs["bookmarks"] = True
+        else:
+            kwargs["ranges"] = spec
+        self._run(f"Split {spec}", pdf_engine.split_many, file, output_dir,
+                  success="PDF split successfully!", **kwargs)
+
+    def extract(self, file, pages_str):
+        save_path, _ = QFileDialog.getSaveFileName(None, "Save Extracted PDF", "", "PDF Files (*.pdf)")
+        if save_path:
+            self._run(f"Extract {pages_str}", pdf_engine.extract, file, pages_str, save_path,
+                      linearize=self.linearize, success="Pages extracted successfully!")
+
+    def watermark(self, file):
+        watermark_file, _ = QFileDialog.getOpenFileName(None, "Select Watermark PDF", "", "PDF Files (*.pdf)")
+        if not watermark_file:
+            return
+        save_path, _ = QFileDialog.getSaveFileName(None, "Save Watermarked PDF", "", "PDF Files (*.pdf)")
+        if save_path:
+            self._run("Watermark", pdf_engine.watermark, file, watermark_file, save_path,
+                      linearize=self.linearize, success="Watermark added successfully!")
+
+    def rotate(self, file, angle):
+        pages, ok = QInputDialog.getText(None, f"Rotate {angle}°", "Pages to rotate (e.g. 3,7-9; blank for all):")
+        if not ok:
+            return
+        # an appended update would undo fast web view, so linearized saves rewrite the file
+        how = "The file is rewritten for fast web view" if self.linearize else "Only the changed pages are appended"
+        in_place = QMessageBox.question(
+            None, f"Rotate {angle}°",
+            f"Save the rotation into the original file?\n({how}; choose No to save a copy.)") == QMessageBox.Yes
+        if in_place:
+            save_path = file
+        else:
+            save_path, _ = QFileDialog.getSaveFileName(None, "Save Rotated PDF", "", "PDF Files (*.pdf)")
+        if save_path:
+            self._run(f"Rotate {angle}°", pdf_engine.rotate, file, angle, save_path,
+                      pages=pages.strip() or None, incremental=not self.linearize, linearize=self.linearize,
+                      success=f"PDF rotated {angle}° successfully!")
+
+    def compress(self, files):
+        profiles = [f"{p.name} ({p.dpi} dpi images)" for p in pdf_engine.PROFILES.values()]
+        choice, ok = QInputDialog.getItem(None, "Compress", "Profile:", profiles,
+                                          list(pdf_engine.PROFILES).index(pdf_engine.DEFAULT_PROFILE), False)
+        if not ok:
+            return
+        profile = choice.split()[0]
+        if len(files) == 1:
+            save_path, _ = QFileDialog.getSaveFileName(None, "Save Compressed PDF", "", "PDF Files (*.pdf)")
+            if not save_path:
+                return
+
+            def finished(result):
+                st = result.stats
+                QMessageBox.information(
+                    None, "Success",
+                    f"Compressed {st['bytes_before'] / 1024:.0f} KB -> {st['bytes_after'] / 1024:.0f} KB "
+                    f"in {st['seconds']:.1f}s\n{st['images_recompressed']} images re-encoded, "
+                    f"{st['duplicates_merged']} duplicate objects merged.")
+
+            self.jobs.submit(f"Compress {os.path.basename(files[0])} ({profile})", pdf_engine.compress,
+                             files[0], save_path, profile, linearize=self.linearize, on_finished=finished,
+                             on_failed=lambda err: QMessageBox.warning(None, "Error", f"Compress failed: {err}"))
+            return
+        output_dir = QFileDialog.getExistingDirectory(None, "Select Output Folder")
+        if not output_dir:
+            return
+
+        def finished_many(results):
+            report = os.path.join(output_dir, "compress_report.json")
+            pdf_engine.write_report(results, report)
+            done = [r for r in results if r.ok]
+            before = sum(r.stats["bytes_before"] for r in done)
+            after = sum(r.stats["bytes_after"] for r in done)
+            text = (f"{len(done)} of {len(results)} files compressed: "
+                    f"{before / 1024:.0f} KB -> {after / 1024:.0f} KB.\nReport: {report}")
+            failed = [r for r in results if not r.ok]
+            if failed:
+                text += "\n\nFailed:\n" + "\n".join(f"{os.path.basename(r.inputs[0])}: {r.error}" for r in failed[:10])
+            QMessageBox.information(None, "Compress Complete", text)
+
+        self.jobs.submit(f"Compress {len(files)} files ({profile})", pdf_engine.compress_many, list(files),
+                         output_dir, profile, linearize=self.linearize, on_finished=finished_many,
+                         on_failed=lambda err: QMessageBox.warning(None, "Error", f"Compress failed: {err}"))
+
+    def edit_properties(self, file):
+        try:
+            with doc_cache.reader(file, blocking=False) as reader:
+                info = dict(reader.metadata or {})
+        except Exception:
+            info = {}
+        metadata = {}
+        for key in ("Title", "Author"):
+            value, ok = QInputDialog.getText(None, "Edit Properties", f"{key}:", QLineEdit.Normal,
+                                             str(info.get("/" + key, "")))
+            if not ok:
+                return
+            if value != str(info.get("/" + key, "")):
+                metadata[key] = value or None
+        labels, ok = QInputDialog.getText(
+            None, "Edit Properties", "Page labels, page:style[:prefix[:start]]\n(e.g. 1:r, 5:D; blank to keep):")
+        if not ok:
+            return
+        bookmarks, ok = QInputDialog.getText(
+            None, "Edit Properties", "Bookmarks to add, title@page\n(e.g. Intro@1; Results@12; blank for none):")
+        if not ok:
+            return
+        try:
+            labels = pdf_engine.parse_page_labels(labels) if labels.strip() else None
+            bookmarks = pdf_engine.parse_bookmarks(bookmarks)
+        except ValueError as e:
+            QMessageBox.warning(None, "Error", str(e))
+            return
+        if not metadata and labels is None and not bookmarks:
+            return
+        in_place = QMessageBox.question(
+            None, "Edit Properties",
+            "Save the changes into the original file?\n(They are appended as an incremental update; "
+            "choose No to save a copy.)") == QMessageBox.Yes
+        save_path = file if in_place else QFileDialog.getSaveFileName(None, "Save PDF", "", "PDF Files (*.pdf)")[0]
+        if save_path:
+            self._run(f"Edit {os.path.basename(file)}", pdf_engine.edit_document, file, save_path,
+                      metadata=metadata or None, page_labels=labels, bookmarks=bookmarks,
+                      success="Properties saved successfully!")
+
+    def ask_steps(self, spec):
+        """Turn "watermark, rotate 90, encrypt" into engine batch steps, prompting for files/passwords."""
+        parts = []
+        for part in (p.strip() for p in spec.split(",")):
+            if part[:1].isdigit() and parts:
+                parts[-1] += "," + part  # more pages of the previous step ("extract 1-3,7")
+            elif part:
+                parts.append(part)
+        steps = []
+        for part in parts:
+            op, _, arg = part.partition(" ")
+            op = op.lower()
+            if op == "rotate":
+                steps.append({"op": "rotate", "angle": int(arg or 90)})
+            elif op == "extract":
+                steps.append({"op": "extract", "pages": arg.replace(" ", "").replace(";", ",")})
+            elif op == "split":
+                steps.append({"op": "split", "range": arg.replace(" ", "")})
+            elif op == "watermark":
+                watermark_file, _ = QFileDialog.getOpenFileName(None, "Select Watermark PDF", "", "PDF Files (*.pdf)")
+                if not watermark_file:
+                    return None
+                steps.append({"op": "watermark", "watermark": watermark_file})
+            elif op in ("encrypt", "decrypt"):
+                password, ok = QInputDialog.getText(None, op.title(), f"Password to {op} with:", QLineEdit.Password)
+                if not ok:
+                    return None
+                steps.append({"op": op, "password": password})
+            else:
+                raise ValueError(f"Unknown operation: {op}")
+        return steps
+
+    def pipeline(self, file):
+        spec, ok = QInputDialog.getText(
+            None, "Pipeline",
+            "Steps to run in a single pass, in order\n(e.g. extract 1-3;7, rotate 90, watermark, encrypt):")
+        if not ok or not spec.strip():
+            return
+        try:
+            steps = self.ask_steps(spec)
+            if steps is None:
+                return
+            pipeline = pdf_engine.Pipeline(steps)
+            pipeline.validate()
+        except ValueError as e:
+            QMessageBox.warning(None, "Error", str(e))
+            return
+        save_path, _ = QFileDialog.getSaveFileName(None, "Save Pipeline Output", "", "PDF Files (*.pdf)")
+        if save_path:
+            self._run(f"Pipeline {pipeline.name} on {os.path.basename(file)}", pipeline.run, file, save_path,
+                      linearize=self.linearize, success="Pipeline finished successfully!")
+
+    def batch(self, files):
+        spec, ok = QInputDialog.getText(
+            None, "Batch Process",
+            "Operations to apply to every file, in order\n(e.g. watermark, rotate 90, encrypt):")
+        if not ok or not spec.strip():
+            return
+        try:
+            steps = self.ask_steps(spec)
+        except ValueError as e:
+            QMessageBox.warning(None, "Error", str(e))
+            return
+        if not steps:
+            return
+        output_dir = QFileDialog.getExistingDirectory(None, "Select Output Folder")
+        if not output_dir:
+            return
+        template, ok = QInputDialog.getText(None, "Batch Process", "Output file name template:",
+                                            QLineEdit.Normal, pdf_engine.BATCH_TEMPLATE)
+        if not ok or not template.strip():
+            return
+
+        def finished(results):
+            report = os.path.join(output_dir, "batch_report.json")
+            pdf_engine.write_report(results, report)
+            failed = [r for r in results if not r.ok]
+            text = f"{len(results) - len(failed)} of {len(results)} files processed.\nReport: {report}"
+            if failed:
+                text += "\n\nFailed:\n" + "\n".join(f"{os.path.basename(r.inputs[0])}: {r.error}" for r in failed[:10])
+            QMessageBox.information(None, "Batch Complete", text)
+
+        self.jobs.submit(f"Batch {spec} on {len(files)} files", pdf_engine.batch, list(files), steps,
+                         output_dir, template.strip(), linearize=self.linearize, on_finished=finished,
+                         on_failed=lambda err: QMessageBox.warning(None, "Error", f"Batch failed: {err}"))
@@ -1,12 +1,24 @@
-import os
-from PyPDF2 import PdfReader
-
-
-def get_metadata_preview(file):
-    try:
-        reader = PdfReader(file)
-        pages = len(reader.pages)
-        size = os.path.getsize(file) / 1024  # KB
-        return f"📄 Pages: {pages} | 📦 Size: {size:.1f} KB"
-    except Exception:
-        return "⚠️ Could not read metadata"
+import os
+
+import doc_cache
+from probe import ProbeError, probe
+
+
+def get_metadata_preview(file, index=None):
+    try:
+        meta = index.get(file) if index is not None else None
+        if meta is None or meta["pages"] is None:
+            try:
+                meta = probe(file)  # trailer, /Pages and /Info only, not the page tree
+            except ProbeError:
+                with doc_cache.reader(file, blocking=False) as reader:
+                    meta = {"pages": len(reader.pages), "info": {}}
+        pages = meta["pages"]
+        size = os.path.getsize(file) / 1024  # KB
+        text = f"📄 Pages: {pages} | 📦 Size: {size:.1f} KB"
+        title = meta["info"].get("/Title")
+        if title:
+            text += f" | 🏷️ {title}"
+        return text
+    except Exception:
+        return "⚠️ Could not read metadata"
@@ -0,0 +1,292 @@
+"""
+Fast probe: page count, encryption flag and document info read from the
+trailer, the cross-reference sections and the few objects they point at
+(/Root, /Pages and /Info). The page tree is never loaded, so the cost does
+not grow with the number of pages.
+
+Classic cross-reference tables are not parsed: an object's entry is found by
+arithmetic from the subsection headers. Cross-reference streams and object
+streams are decoded only when they hold one of the objects asked for.
+
+Files the probe cannot follow (damaged or missing cross-reference data) raise
+ProbeError; callers fall back to a full PdfReader, which can reconstruct them.
+"""
+
+import os
+import re
+import zlib
+from io import BytesIO
+
+from PyPDF2._utils import read_non_whitespace
+from PyPDF2.generic import DictionaryObject, IndirectObject, StreamObject, read_object
+
+from sources import open_source
+
+TAIL_BYTES = 2048  # how far from the end of the file to look for startxref
+HEADER_BYTES = 1024
+_OBJ_HEADER = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj\s*")
+_SUBSECTION = re.compile(rb"\s*(\d+)\s+(\d+)\s*$")
+_COUNT = re.compile(rb"/Count\s+(\d+)\b(?!\s+\d+\s+R)")
+_OBJ_END = re.compile(rb"endobj|stream")
+RAW_CHUNK = 64 * 1024
+
+
+class ProbeError(ValueError):
+    """The file's cross-reference data cannot be followed without a full parse."""
+
+
+class _Probe:
+    strict = True  # read_object: fail on a bad stream length instead of scanning for "endstream"
+
+    def __init__(self, fh):
+        self.fh = fh
+        self._sections = []  # newest first: ("table", [(first, count, entries at, entry size)]) / ("stream", obj)
+        self._cache = {}
+        self._inflated = {}  # inflated cross-reference streams
+        self._objstms = {}  # object stream number -> (decoded data, offset of first object, header)
+        self.trailer = {}
+        self._read_sections()
+
+    # ---------- cross-reference sections ----------
+    def _read_sections(self):
+        fh = self.fh
+        fh.seek(0, os.SEEK_END)
+        size = fh.tell()
+        fh.seek(max(0, size - TAIL_BYTES))
+        found = re.findall(rb"startxref\s+(\d+)", fh.read())
+        if not found:
+            raise ProbeError("No startxref found")
+        pending, seen = [int(found[-1])], set()
+        while pending:
+            offset = pending.pop(0)
+            if offset in seen or not 0 < offset < size:
+                continue
+            seen.add(offset)
+            fh.seek(offset)
+            if fh.read(4) == b"xref":
+                trailer = self._read_table()
+                if "/XRefStm" in trailer:  # hybrid file: the stream covers objects the table leaves out
+                    pending.append(int(trailer["/XRefStm"]))
+            else:
+                trailer = self._read_stream(offset)
+            for key in ("/Root", "/Info", "/Encrypt"):
+                if key in trailer and key not in self.trailer:
+                    self.trailer[key] = trailer.raw_get(key)  # resolved once every section is known
+            if "/Prev" in trailer:
+                pending.append(int(trailer["/Prev"]))
+        if "/Root" not in self.trailer:
+            raise ProbeError("Trailer has no /Root")
+
+    def _read_table(self):
+        fh = self.fh
+        subsections = []
+        while True:
+            pos = fh.tell()
+            line = fh.readline()
+            if not line.strip():
+                if not line:
+                    raise ProbeError("Cross-reference table ends early")
+                continue
+            if line.lstrip().startswith(b"trailer"):
+                fh.seek(pos + line.index(b"trailer") + len(b"trailer"))
+                break
+            match = _SUBSECTION.match(line)
+            if match is None:
+                raise ProbeError(f"Bad cross-reference subsection at byte {pos}")
+            first, count = int(match.group(1)), int(match.group(2))
+            start = fh.tell()
+            entry = len(fh.readline()) if count else 20  # 20 by the spec; some writers use 19 or 21
+            subsections.append((first, count, start, entry))
+            fh.seek(start + count * entry)
+        self._sections.append(("table", subsections))
+        return self._read(fh)
+
+    def _read_stream(self, offset):
+        fh = self.fh
+        fh.seek(offset)
+        if _OBJ_HEADER.match(fh.read(64)) is None:
+            raise ProbeError(f"startxref points at byte {offset}, which is neither a table nor a stream")
+        obj = self._object_at(offset)
+        if not isinstance(obj, StreamObject) or obj.get("/Type") != "/XRef":
+            raise ProbeError(f"Object at byte {offset} is not a cross-reference stream")
+        self._sections.append(("stream", obj))
+        return obj
+
+    def _locate(self, num, gen):
+        """(offset, None) or (None, (object stream number, index)); None if the object does not exist."""
+        fh = self.fh
+        for kind, section in self._sections:
+            if kind == "table":
+                for first, count, start, entry in section:
+                    if first <= num < first + count:
+                        fh.seek(start + (num - first) * entry)
+                        fields = fh.read(entry).split()
+                        if len(fields) < 3:
+                            raise ProbeError(f"Bad cross-reference entry for object {num}")
+                        if fields[2] == b"f":
+                            return None
+                        if int(fields[1]) == gen:
+                            return int(fields[0]), None
+            else:
+                found = self._stream_entry(section, num)
+                if found is not None:
+                    return found or None
+        return None
+
+    def _xref_row(self, xref, row, width):
+        """Row ``row`` of a cross-reference stream's table, decoding as little as possible.
+
+        Writers almost always use the PNG "Up" predictor, where a row is the
+        bytewise sum of every row above it: that sum is taken over byte slices
+        instead of running PyPDF2's per-byte decoder over the whole table.
+        """
+        parms = xref.get("/DecodeParms")
+        if (xref.get("/Filter") == "/FlateDecode" and isinstance(parms, DictionaryObject)
+                and int(parms.get("/Predictor", 1)) >= 10 and int(parms.get("/Columns", 1)) == width):
+            key = id(xref)
+            if key not in self._inflated:
+                self._inflated[key] = zlib.decompress(xref._data)
+            data, stride = self._inflated[key], width + 1
+            tags = data[0:(row + 1) * stride:stride]
+            start = max(tags.rfind(b"\x00"), 0)  # an unfiltered row restarts the sum
+            rest = tags[start + 1:]
+            if len(tags) == row + 1 and tags[start] in (0, 2) and rest.count(b"\x02") == len(rest):
+                first = start * stride + 1
+                return bytes(sum(data[first + c:(row + 1) * stride:stride]) & 0xFF for c in range(width))
+        key = ("decoded", id(xref))
+        if key not in self._inflated:
+            self._inflated[key] = xref.get_data()
+        return self._inflated[key][row * width:(row + 1) * width]
+
+    def _stream_entry(self, xref, num):
+        widths = [int(w) for w in xref["/W"]]
+        index = [int(i) for i in xref.get("/Index", [0, int(xref["/Size"])])]
+        row = 0
+        for first, count in zip(index[0::2], index[1::2]):
+            if first <= num < first + count:
+                row += num - first
+                break
+            row += count
+        else:
+            return None
+        data = self._xref_row(xref, row, sum(widths))
+        at = 0
+        fields = []
+        for width in widths:
+            fields.append(int.from_bytes(data[at:at + width], "big") if width else None)
+            at += width
+        kind = 1 if fields[0] is None else fields[0]  # a zero-width type field defaults to 1
+        if kind == 0:
+            return ()  # free: the object was deleted
+        if kind == 1:
+            return fields[1], None
+        return None, (fields[1], fields[2])
+
+    # ---------- objects ----------
+    def _read(self, stream):
+        try:
+            read_non_whitespace(stream)
+            stream.seek(-1, 1)
+            return read_object(stream, self)
+        except Exception as exc:
+            raise ProbeError(f"Cannot parse object at byte {stream.tell()}: {exc}") from exc
+
+    def _object_at(self, offset):
+        self.fh.seek(offset)
+        match = _OBJ_HEADER.match(self.fh.read(64))
+        if match is None:
+            raise ProbeError(f"No object at byte {offset}")
+        self.fh.seek(offset + match.end())
+        return self._read(self.fh)
+
+    def get_object(self, ref):
+        if isinstance(ref, IndirectObject):
+            ref = (ref.idnum, ref.generation)
+        if ref in self._cache:
+            return self._cache[ref]
+        where = self._locate(*ref)
+        if where is None:
+            obj = None
+        elif where[0] is not None:
+            obj = self._object_at(where[0])
+        else:
+            obj = self._packed(*where[1])
+        self._cache[ref] = obj
+        return obj
+
+    def _objstm(self, stream_num):
+        if stream_num not in self._objstms:
+            objstm = self.get_object((stream_num, 0))
+            if not isinstance(objstm, StreamObject):
+                raise ProbeError(f"Object stream {stream_num} is missing")
+            data = objstm.get_data()
+            first = int(objstm["/First"])
+            self._objstms[stream_num] = data, first, data[:first].split()
+        return self._objstms[stream_num]
+
+    def _packed(self, stream_num, index):
+        data, first, header = self._objstm(stream_num)
+        stream = BytesIO(data)
+        stream.seek(first + int(header[2 * index + 1]))
+        return self._read(stream)
+
+    def raw(self, ref):
+        """The unparsed text of an object (up to its stream data, if any)."""
+        where = self._locate(ref.idnum, ref.generation)
+        if where is None:
+            return b""
+        if where[0] is None:
+            data, first, header = self._objstm(where[1][0])
+            index = where[1][1]
+            end = first + int(header[2 * index + 3]) if 2 * index + 3 < len(header) else len(data)
+            return data[first + int(header[2 * index + 1]):end]
+        self.fh.seek(where[0])
+        text = b""
+        while True:
+            chunk = self.fh.read(RAW_CHUNK)
+            text += chunk
+            match = _OBJ_END.search(text, max(0, len(text) - len(chunk) - 6))
+            if match is not None:
+                return text[:match.start()]
+            if not chunk:
+                return text
+
+    def count(self, ref):
+        """/Count of a page tree node, read from its text so a large /Kids array is never parsed."""
+        if isinstance(ref, IndirectObject):
+            found = _COUNT.findall(self.raw(ref))
+            if len(found) == 1:
+                return int(found[0])
+        node = self.resolve(ref)
+        return self.resolve(node.get("/Count")) if isinstance(node, DictionaryObject) else None
+
+    def resolve(self, value):
+        return self.get_object(value) if isinstance(value, IndirectObject) else value
+
+
+def probe(path):
+    """Return {"pages", "encrypted", "info", "version"} for ``path`` without loading its page tree.
+
+    ``info`` is left empty for encrypted files, whose strings cannot be read
+    without the key. Raises ProbeError when a full parse is needed.
+    """
+    with open_source(path) as fh:
+        version = re.search(rb"%PDF-(\d\.\d)", fh.read(HEADER_BYTES))
+        if version is None:
+            raise ProbeError("Not a PDF (no %PDF- header)")
+        try:
+            doc = _Probe(fh)
+            root = doc.resolve(doc.trailer["/Root"])
+            count = doc.count(root.raw_get("/Pages")) if isinstance(root, DictionaryObject) and "/Pages" in root else None
+            if count is None:
+                raise ProbeError("Catalog has no page tree with a /Count")
+            encrypted = "/Encrypt" in doc.trailer
+            info = {}
+            source = None if encrypted else doc.resolve(doc.trailer.get("/Info"))
+            if isinstance(source, DictionaryObject):
+                info = {k: str(doc.resolve(v)) for k, v in source.items()}
+        except ProbeError:
+            raise
+        except Exception as exc:
+            raise ProbeError(f"{type(exc).__name__}: {exc}") from exc
+    return {"pages": int(count), "encrypted": encrypted, "info": info, "version": version.group(1).decode()}
@@ -0,0 +1,138 @@
+"""
+Full-text search over the text of loaded and recent PDFs (SQLite FTS5).
+
+Documents are re-indexed only when their mtime or size changes; a search
+returns (path, page, snippet) hits. The index lives in the user data folder
+(see ``storage.data_dir``). FTS5 cannot index ``doc_id``, so each
+document's page rowids are kept in a plain table and a re-index deletes
+them by rowid instead of scanning every page.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from PyPDF2 import PdfReader
+
+from sources import open_source
+from storage import data_dir
+
+INDEX_FILE = "search_index.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    page_count INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5(
+    text, doc_id UNINDEXED, page UNINDEXED, tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS page_rows (
+    rowid INTEGER PRIMARY KEY,  -- rowid in pages
+    doc_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS page_rows_doc ON page_rows (doc_id);
+"""
+VERSION = 1  # PRAGMA user_version; 1 added page_rows
+
+
+def page_texts(path):
+    with open_source(path) as fh:
+        reader = PdfReader(fh)
+        for idx, page in enumerate(reader.pages, 1):
+            try:
+                yield idx, page.extract_text() or ""
+            except Exception:
+                yield idx, ""
+
+
+class SearchIndex:
+    def __init__(self, path=None):
+        if path is None:
+            os.makedirs(data_dir(), exist_ok=True)
+            path = os.path.join(data_dir(), INDEX_FILE)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        if self._db.execute("PRAGMA user_version").fetchone()[0] < VERSION:
+            # an index from before page_rows: record the rowids it already holds
+            self._db.execute("INSERT OR IGNORE INTO page_rows (rowid, doc_id) SELECT rowid, doc_id FROM pages")
+            self._db.execute(f"PRAGMA user_version = {VERSION}")
+        self._db.commit()
+
+    def is_current(self, path):
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM docs WHERE path = ? AND mtime_ns = ? AND size = ?",
+                                   (key, st.st_mtime_ns, st.st_size)).fetchone()
+        return row is not None
+
+    def index_file(self, path):
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        # extract outside the lock so searches stay fast while indexing
+        rows, page_count = [], 0
+        for page_count, text in page_texts(key):
+            if text.strip():
+                rows.append((text, page_count))
+        with self._lock, self._db:
+            self._remove(key)
+            cur = self._db.execute(
+                "INSERT INTO docs (path, mtime_ns, size, page_count, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, st.st_mtime_ns, st.st_size, page_count, time.time()))
+            doc_id = cur.lastrowid
+            for text, page in rows:
+                cur.execute("INSERT INTO pages (text, doc_id, page) VALUES (?, ?, ?)", (text, doc_id, page))
+                cur.execute("INSERT INTO page_rows (rowid, doc_id) VALUES (?, ?)", (cur.lastrowid, doc_id))
+        return len(rows)
+
+    def _remove(self, key):
+        row = self._db.execute("SELECT id FROM docs WHERE path = ?", (key,)).fetchone()
+        if row:
+            rowids = self._db.execute("SELECT rowid FROM page_rows WHERE doc_id = ?", (row[0],)).fetchall()
+            self._db.executemany("DELETE FROM pages WHERE rowid = ?", rowids)
+            self._db.execute("DELETE FROM page_rows WHERE doc_id = ?", (row[0],))
+            self._db.execute("DELETE FROM docs WHERE id = ?", (row[0],))
+
+    def remove(self, path):
+        with self._lock, self._db:
+            self._remove(os.path.abspath(path))
+
+    def refresh(self, paths, progress=None):
+        """Index new or changed files; returns how many were (re)indexed."""
+        indexed = 0
+        paths = list(dict.fromkeys(paths))
+        for idx, path in enumerate(paths, 1):
+            try:
+                if not self.is_current(path):
+                    self.index_file(path)
+                    indexed += 1
+            except Exception:
+                pass  # missing or unreadable files are skipped
+            if progress is not None:
+                progress(idx, len(paths))
+        return indexed
+
+    def search(self, phrase, limit=200):
+        """Return [(path, page, snippet)] for pages containing ``phrase``."""
+        phrase = phrase.strip()
+        if not phrase:
+            return []
+        query = '"' + phrase.replace('"', '""') + '"'
+        with self._lock:
+            return self._db.execute(
+                "SELECT docs.path, pages.page, snippet(pages, 0, '[', ']', '…', 12) "
+                "FROM pages JOIN docs ON docs.id = pages.doc_id "
+                "WHERE pages MATCH ? ORDER BY rank LIMIT ?", (query, limit)).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,40 @@
+"""
+Input layer: PDF sources are opened as read-only memory maps, so parsing
+seeks through the OS page cache instead of issuing buffered reads (or, as
+``PdfReader(path)`` does, copying the whole file into memory first).
+
+Every caller gets its own map, and with it its own file position, while
+the pages underneath are shared by all maps of the same file. Files that
+cannot be mapped (empty files, pipes, some network filesystems) fall back
+to buffered I/O. Set PDF_TOOLKIT_MMAP=0 to always use buffered I/O.
+"""
+
+import mmap
+import os
+
+from PyPDF2 import PdfReader
+
+USE_MMAP = os.environ.get("PDF_TOOLKIT_MMAP", "1") != "0"
+
+
+def open_source(path, use_mmap=None):
+    """Return a readable, seekable binary stream over ``path`` (a context manager)."""
+    fh = open(path, "rb")
+    if not (USE_MMAP if use_mmap is None else use_mmap):
+        return fh
+    try:
+        mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return fh
+    fh.close()  # the map keeps its own handle
+    return mapped
+
+
+def open_reader(path, use_mmap=None):
+    """A PdfReader over ``open_source(path)``; the source is released with the reader."""
+    return PdfReader(open_source(path, use_mmap))
+
+
+def close_reader(reader):
+    """Release the source behind a reader from ``open_reader``."""
+    reader.stream.close()
@@ -1,24 +1,155 @@
-import os
-import json
-
-STORAGE_FILE = "recent_files.json"
-
-
-class RecentStorage:
-    def __init__(self):
-        if not os.path.exists(STORAGE_FILE):
-            with open(STORAGE_FILE, "w") as f:
-                json.dump([], f)
-
-    def save_recent(self, file):
-        with open(STORAGE_FILE, "r+") as f:
-            data = json.load(f)
-            if file not in data:
-                data.append(file)
-            f.seek(0)
-            json.dump(data[-10:], f, indent=2)
-            f.truncate()
-
-    def get_recent(self):
-        with open(STORAGE_FILE, "r") as f:
-            return json.load(f)
+"""
+Recent files and per-file usage counts, kept in a small SQLite database in
+the user's data folder (not the working directory). Calls only update memory;
+the changes are written in one transaction once no call has come in for
+``flush_delay`` seconds, or on ``flush``/``close``. WAL mode and a busy
+timeout let several running copies of the app share the file.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+APP_NAME = "pdf-toolkit-plus"
+STORAGE_FILE = "recent.sqlite3"
+LEGACY_FILE = "recent_files.json"  # where earlier versions kept the list, in the working directory
+HISTORY = 200      # files whose usage is remembered
+RECENT_COUNT = 10  # files get_recent returns by default
+FLUSH_DELAY = 1.0  # seconds of quiet before pending changes are written
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recent (
+    path TEXT PRIMARY KEY,
+    first_used REAL NOT NULL,
+    last_used REAL NOT NULL,
+    uses INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+def data_dir():
+    """Per-user folder for the toolkit's own files (PDF_TOOLKIT_HOME overrides it)."""
+    if os.environ.get("PDF_TOOLKIT_HOME"):
+        return os.environ["PDF_TOOLKIT_HOME"]
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, APP_NAME)
+
+
+class RecentStorage:
+    def __init__(self, path=None, history=HISTORY, flush_delay=FLUSH_DELAY):
+        if path is None:
+            os.makedirs(data_dir(), exist_ok=True)
+            path = os.path.join(data_dir(), STORAGE_FILE)
+        self.path = path
+        self.history = history
+        self.flush_delay = flush_delay
+        self._lock = threading.Lock()
+        self._pending = {}  # path -> [first used, last used, uses] not yet written
+        self._timer = None
+        self._touched = 0.0  # monotonic time of the last change
+        self._last = 0.0
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(SCHEMA)
+        self._db.commit()
+        self._import_legacy()
+
+    def _import_legacy(self):
+        if not os.path.exists(LEGACY_FILE) or self._db.execute("SELECT 1 FROM recent LIMIT 1").fetchone():
+            return
+        try:
+            with open(LEGACY_FILE) as f:
+                files = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.save_many([f for f in files if isinstance(f, str)])
+        self.flush()
+
+    def _now(self):
+        # strictly increasing, so files recorded in one batch keep their order
+        self._last = max(time.time(), self._last + 1e-6)
+        return self._last
+
+    def save_recent(self, file):
+        self.save_many([file])
+
+    def save_many(self, files):
+        """Record a use of each file, oldest first."""
+        with self._lock:
+            for file in files[-self.history:]:  # anything earlier would be trimmed at once
+                now = self._now()
+                entry = self._pending.setdefault(os.path.abspath(file), [now, now, 0])
+                entry[1] = now
+                entry[2] += 1
+            self._touched = time.monotonic()
+            if self._timer is None:
+                self._schedule(self.flush_delay)
+
+    def _schedule(self, delay):
+        self._timer = threading.Timer(delay, self._flush_when_quiet)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_when_quiet(self):
+        # one timer per burst: while calls keep coming it re-arms for the remaining quiet time
+        with self._lock:
+            wait = self._touched + self.flush_delay - time.monotonic()
+            if wait > 0 and self._timer is not None:
+                self._schedule(wait)
+                return
+        self.flush()
+
+    def flush(self):
+        """Write pending changes in one transaction and trim the history."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            rows = [(path, *entry) for path, entry in self._pending.items()]
+            with self._db:  # commits, or rolls back on error
+                self._db.executemany(
+                    "INSERT INTO recent (path, first_used, last_used, uses) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(path) DO UPDATE SET last_used = max(last_used, excluded.last_used), "
+                    "uses = uses + excluded.uses", rows)
+                self._db.execute(
+                    "DELETE FROM recent WHERE path NOT IN "
+                    "(SELECT path FROM recent ORDER BY last_used DESC LIMIT ?)", (self.history,))
+            self._pending.clear()
+
+    def get_recent(self, count=RECENT_COUNT):
+        """The ``count`` most recently used files, oldest first."""
+        self.flush()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path FROM recent ORDER BY last_used DESC LIMIT ?", (count,)).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def stats(self, file):
+        """{"uses", "first_used", "last_used"} for ``file``, or None if it is not in the history."""
+        self.flush()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT uses, first_used, last_used FROM recent WHERE path = ?", (os.path.abspath(file),)).fetchone()
+        return None if row is None else {"uses": row[0], "first_used": row[1], "last_used": row[2]}
+
+    def most_used(self, count=RECENT_COUNT):
+        """[(path, uses)] for the ``count`` most used files."""
+        self.flush()
+        with self._lock:
+            return self._db.execute(
+                "SELECT path, uses FROM recent ORDER BY uses DESC, last_used DESC LIMIT ?", (count,)).fetchall()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._db.close()
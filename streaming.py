@@ -0,0 +1,269 @@
+"""
+Streaming PDF writer: pages are serialized to disk as soon as they are
+added, and each source document is released once its pages are written.
+Only object offsets and the page list are kept in memory.
+
+With ``dedupe`` every stream (fonts, images, ICC profiles, forms) and every
+font, font descriptor and graphics state is fingerprinted by content, and a
+resource identical to one already written - from any earlier source - is
+referenced instead of written again.
+"""
+
+import hashlib
+import os
+import threading
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import (
+    ArrayObject, DictionaryObject, IndirectObject, NameObject, NullObject,
+    NumberObject, StreamObject,
+)
+
+from sources import open_source
+
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024  # bytes of source data cached per document
+
+CATALOG_NUM, PAGES_NUM = 1, 2
+DEDUPE_TYPES = ("/Font", "/FontDescriptor", "/ExtGState")
+
+
+def temp_path(output, stage="tmp"):
+    """A private name beside ``output`` to write to before moving it into place."""
+    folder, name = os.path.split(os.path.abspath(output))
+    return os.path.join(folder, f".{name}.{os.getpid()}.{threading.get_ident()}.{stage}")
+
+
+class StreamingWriter:
+    def __init__(self, output, memory_limit=DEFAULT_MEMORY_LIMIT, dedupe=False):
+        self.memory_limit = memory_limit
+        self.dedupe = dedupe
+        self.duplicates = 0         # resources referenced instead of written again
+        self.bytes_saved = 0        # stream bytes those duplicates would have added
+        self.output = output
+        self._tmp = temp_path(output)  # moved over output on close, so inputs can be overwritten
+        self._f = open(self._tmp, "wb")
+        self._f.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        self._offsets = [0, None, None]  # object number -> file offset
+        self._kids = []
+        self._reader = None
+        self._map = {}          # source (idnum, generation) -> output number
+        self._pending = []      # (output number, source reference) waiting to be written
+        self._deferred = {}     # output number -> source page referenced before being added
+        self._cached_bytes = 0
+        self._written = {}      # content fingerprint -> output number (kept across sources)
+        self._fingerprints = {} # source (idnum, generation) -> fingerprint, per source
+        self._counted = set()   # source objects already included in bytes_saved, per source
+        self._unique = 0
+
+    # ---------- sources ----------
+    def append(self, path, progress=None):
+        """Stream every page of ``path``; returns the number of pages written."""
+        with open_source(path) as fh:
+            reader = PdfReader(fh)
+            self._reader = reader
+            try:
+                count = 0
+                for page in reader.pages:
+                    self.add_page(page)
+                    count += 1
+                    if progress is not None:
+                        progress(count)
+            finally:
+                self.end_source()
+        return count
+
+    def add_page(self, page):
+        ref = page.indirect_reference
+        if ref is not None and (ref.idnum, ref.generation) in self._map:
+            num = self._map[(ref.idnum, ref.generation)]
+            if self._offsets[num] is not None:
+                num = self._alloc()  # same page added twice: give the copy its own number
+            self._deferred.pop(num, None)
+        else:
+            num = self._alloc()
+            if ref is not None:
+                self._map[(ref.idnum, ref.generation)] = num
+        copy = DictionaryObject()
+        for key, value in page.items():
+            if key not in ("/Parent", "/StructParents"):
+                copy[NameObject(key)] = self._translate(value)
+        copy[NameObject("/Parent")] = IndirectObject(PAGES_NUM, 0, self)
+        self._write_object(num, copy)
+        self._kids.append(num)
+        self._drain()
+        if self._cached_bytes > self.memory_limit:
+            self._release_cache()
+
+    def end_source(self):
+        # pages that were only linked to (never added) become null objects
+        for num in list(self._deferred):
+            self._write_object(num, NullObject())
+        self._deferred.clear()
+        self._map.clear()
+        self._fingerprints.clear()
+        self._counted.clear()
+        self._release_cache()
+        self._reader = None
+
+    # ---------- object copying ----------
+    def _alloc(self):
+        self._offsets.append(None)
+        return len(self._offsets) - 1
+
+    def _ref(self, ref):
+        key = (ref.idnum, ref.generation)
+        num = self._map.get(key)
+        if num is None:
+            fingerprint = self._fingerprint(ref) if self.dedupe else None
+            if fingerprint is not None and fingerprint in self._written:
+                num = self._written[fingerprint]
+                self.duplicates += 1
+                self.bytes_saved += self._stream_bytes(ref)
+            else:
+                num = self._alloc()
+                self._pending.append((num, ref))
+                if fingerprint is not None:
+                    self._written[fingerprint] = num
+            self._map[key] = num
+        return IndirectObject(num, 0, self)
+
+    # ---------- deduplication ----------
+    def _fingerprint(self, ref):
+        """Content hash of a shareable resource, or None for anything else (pages, ...)."""
+        obj = ref.get_object()
+        if not (isinstance(obj, StreamObject) or
+                isinstance(obj, DictionaryObject) and obj.get("/Type") in DEDUPE_TYPES):
+            return None
+        return self._digest(ref, set())
+
+    def _stream_bytes(self, obj):
+        """Stream data reachable from a skipped duplicate (not counting pages or anything counted before)."""
+        if isinstance(obj, IndirectObject):
+            key = (obj.idnum, obj.generation)
+            if key in self._counted or key in self._map:
+                return 0
+            self._counted.add(key)
+            obj = obj.get_object()
+        if isinstance(obj, DictionaryObject) and obj.get("/Type") in ("/Page", "/Pages"):
+            return 0
+        total = len(obj._data or b"") if isinstance(obj, StreamObject) else 0
+        if isinstance(obj, DictionaryObject):
+            total += sum(self._stream_bytes(v) for v in obj.values())
+        elif isinstance(obj, ArrayObject):
+            total += sum(self._stream_bytes(v) for v in obj)
+        return total
+
+    def _digest(self, ref, visiting):
+        key = (ref.idnum, ref.generation)
+        if key in self._fingerprints:
+            return self._fingerprints[key]
+        if key in visiting:
+            return b"cycle"
+        visiting.add(key)
+        obj = ref.get_object()
+        h = hashlib.sha256()
+        if isinstance(obj, DictionaryObject) and obj.get("/Type") in ("/Page", "/Pages"):
+            self._unique += 1
+            h.update(b"page %d" % self._unique)  # never equal to anything; keeps page trees out
+        else:
+            self._hash_value(h, obj, visiting)
+        visiting.discard(key)
+        self._fingerprints[key] = digest = h.digest()
+        return digest
+
+    def _hash_value(self, h, obj, visiting):
+        if isinstance(obj, IndirectObject):
+            h.update(b"R" + self._digest(obj, visiting))
+        elif isinstance(obj, StreamObject):
+            h.update(b"S%d:" % len(obj._data or b"") + (obj._data or b""))
+            self._hash_value(h, DictionaryObject({k: v for k, v in obj.items() if k != "/Length"}), visiting)
+        elif isinstance(obj, DictionaryObject):
+            h.update(b"<<")
+            for k in sorted(obj):
+                h.update(k.encode("utf-8", "surrogateescape"))
+                self._hash_value(h, obj.raw_get(k), visiting)
+            h.update(b">>")
+        elif isinstance(obj, ArrayObject):
+            h.update(b"[")
+            for v in obj:
+                self._hash_value(h, v, visiting)
+            h.update(b"]")
+        else:
+            h.update(type(obj).__name__.encode() + b":" + repr(obj).encode("utf-8", "surrogateescape") + b";")
+
+    def _translate(self, obj):
+        if isinstance(obj, IndirectObject):
+            return self._ref(obj)
+        if isinstance(obj, StreamObject):
+            copy = type(obj)()
+            for key, value in obj.items():
+                if key != "/Length":
+                    copy[NameObject(key)] = self._translate(value)
+            copy._data = obj._data
+            self._cached_bytes += len(obj._data or b"")
+            return copy
+        if isinstance(obj, DictionaryObject):
+            if obj.get("/Type") == "/Pages":
+                return NullObject()  # never pull in the source page tree
+            return DictionaryObject({NameObject(k): self._translate(v) for k, v in obj.items()})
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(self._translate(v) for v in obj)
+        return obj
+
+    def _drain(self):
+        while self._pending:
+            num, ref = self._pending.pop()
+            obj = ref.get_object()
+            if isinstance(obj, DictionaryObject) and obj.get("/Type") == "/Page":
+                self._deferred[num] = ref  # written when (if) the page itself is added
+                continue
+            self._write_object(num, self._translate(obj))
+
+    def _release_cache(self):
+        if self._reader is not None:
+            self._reader.resolved_objects.clear()
+        self._cached_bytes = 0
+
+    def _write_object(self, num, obj):
+        self._offsets[num] = self._f.tell()
+        self._f.write(f"{num} 0 obj\n".encode())
+        obj.write_to_stream(self._f, None)
+        self._f.write(b"\nendobj\n")
+
+    # ---------- output ----------
+    def close(self):
+        pages = DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(IndirectObject(n, 0, self) for n in self._kids),
+            NameObject("/Count"): NumberObject(len(self._kids)),
+        })
+        self._write_object(PAGES_NUM, pages)
+        catalog = DictionaryObject({
+            NameObject("/Type"): NameObject("/Catalog"),
+            NameObject("/Pages"): IndirectObject(PAGES_NUM, 0, self),
+        })
+        self._write_object(CATALOG_NUM, catalog)
+
+        xref = self._f.tell()
+        self._f.write(f"xref\n0 {len(self._offsets)}\n".encode())
+        self._f.write(b"0000000000 65535 f \n")
+        for offset in self._offsets[1:]:
+            self._f.write(f"{offset:010d} 00000 n \n".encode())
+        self._f.write(f"trailer\n<< /Size {len(self._offsets)} /Root {CATALOG_NUM} 0 R >>\n".encode())
+        self._f.write(f"startxref\n{xref}\n%%EOF\n".encode())
+        self._f.close()
+        os.replace(self._tmp, self.output)
+
+    @property
+    def page_count(self):
+        return len(self._kids)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._f.close()
+            os.remove(self._tmp)
@@ -0,0 +1,117 @@
+import itertools
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from pdf_engine import Cancelled
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "Queued", "Running", "Done", "Failed", "Cancelled"
+
+
+class JobSignals(QObject):
+    progress = pyqtSignal(int, int)  # done, total
+    finished = pyqtSignal(object)    # operation result
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class Relay(QObject):
+    """Hands values from a pool thread to slots in the GUI thread (e.g. batches of results)."""
+
+    emitted = pyqtSignal(object)
+
+
+class Job(QRunnable):
+    """Runs ``func(*args, progress=..., **kwargs)`` on a pool thread."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, label, func, *args, **kwargs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.id = next(self._ids)
+        self.label = label
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.state = QUEUED
+        self.done = 0
+        self.total = 0
+        self.error = ""
+        self.signals = JobSignals()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _progress(self, done, total):
+        if self._cancel.is_set():
+            raise Cancelled()
+        self.done, self.total = done, total
+        self.signals.progress.emit(done, total)
+
+    def run(self):
+        if self._cancel.is_set():
+            self.state = CANCELLED
+            self.signals.cancelled.emit()
+            return
+        self.state = RUNNING
+        self.signals.progress.emit(0, 0)
+        try:
+            result = self.func(*self.args, progress=self._progress, **self.kwargs)
+        except Cancelled:
+            self.state = CANCELLED
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.state = FAILED
+            self.error = str(e)
+            self.signals.failed.emit(self.error)
+        else:
+            self.state = DONE
+            self.signals.finished.emit(result)
+
+
+class JobQueue(QObject):
+    """Dispatches jobs to a QThreadPool and reports their state changes."""
+
+    changed = pyqtSignal(object)  # job
+
+    def __init__(self, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        if max_workers:
+            self.pool.setMaxThreadCount(max_workers)
+        self.jobs = {}
+
+    def submit(self, label, func, *args, on_finished=None, on_failed=None, **kwargs):
+        job = Job(label, func, *args, **kwargs)
+        self.jobs[job.id] = job
+        for sig in (job.signals.progress, job.signals.finished, job.signals.failed, job.signals.cancelled):
+            sig.connect(lambda *_, j=job: self.changed.emit(j))
+        # connect before starting so a fast job cannot finish unobserved
+        if on_finished:
+            job.signals.finished.connect(on_finished)
+        if on_failed:
+            job.signals.failed.connect(on_failed)
+        self.pool.start(job)
+        self.changed.emit(job)
+        return job
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+        job.cancel()
+        if job.state == QUEUED and self.pool.tryTake(job):
+            job.state = CANCELLED
+            job.signals.cancelled.emit()
+
+    def active(self):
+        return [j for j in self.jobs.values() if j.state in (QUEUED, RUNNING)]
+
+    def clear_finished(self):
+        for job_id in [i for i, j in self.jobs.items() if j.state not in (QUEUED, RUNNING)]:
+            del self.jobs[job_id]
+
+    def wait(self, msecs=-1):
+        return self.pool.waitForDone(msecs)